@@ -0,0 +1,8 @@
+"""
+benchmarks - benchmarki projektu Asystent Doboru Nart
+Syntetyczne dane w formacie NOWABAZA_final.csv i rez.csv z FireSnow
+oraz runnery zapisujące wyniki w JSON i porównujące je z bazowymi (raport)
+
+Uruchomienie (z katalogu python):
+    python -m benchmarks.uruchom_benchmarki --rozmiary 100 1000 10000
+"""
@@ -0,0 +1,123 @@
+"""
+Benchmark opóźnień interfejsu SkiApp (Qt bez ekranu, QT_QPA_PLATFORM=offscreen)
+Dla każdego rozmiaru syntetycznej bazy wypełnia formularz, klika "Znajdź",
+otwiera przegląd nart, wpisuje tekst w wyszukiwarkę przeglądu i odświeża
+rezerwacje - mierzy czas ściany każdej akcji (z przetworzeniem zdarzeń Qt)
+
+Przykłady (z katalogu python):
+    python -m benchmarks.benchmark_interfejsu --rozmiary 100 1000 5000 --wyjscie ui.json
+    python -m benchmarks.benchmark_interfejsu --baseline benchmarks/baseline_interfejsu.json
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import statistics
+import tempfile
+from unittest import mock
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import Qt, QT_VERSION_STR
+from PyQt5.QtTest import QTest
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.generatory import generuj_narty, zapisz_narty_csv, zapisz_rezerwacje_csv
+from benchmarks.raport import dodaj_argumenty, zakoncz
+from dane import wczytywanie_danych, archiwum_rezerwacji, magazyn_danych
+from dane.magazyn_danych import magazyn
+from interfejs import okno_glowne
+from interfejs.okno_glowne import SkiApp
+
+# Dane formularza (pole -> tekst) i tekst wpisywany w wyszukiwarkę przeglądu
+FORMULARZ = {
+    'wzrost_entry': '175', 'waga_entry': '70', 'poziom_entry': '4', 'plec_entry': 'M',
+    'od_dzien': '10', 'od_miesiac': '01', 'od_rok': '26',
+    'do_dzien': '17', 'do_miesiac': '01', 'do_rok': '26',
+}
+TEKST_WYSZUKIWANIA = 'atomic cloud'
+
+def zmierz(akcja):
+    """Czas ściany akcji łącznie z obsługą zaległych zdarzeń Qt (sekundy)"""
+    start = time.perf_counter()
+    akcja()
+    QApplication.processEvents()
+    return time.perf_counter() - start
+
+def wypelnij_formularz(okno):
+    """Wpisuje dane klienta i daty w pola formularza (jak z klawiatury)"""
+    for pole, tekst in FORMULARZ.items():
+        widget = getattr(okno, pole)
+        widget.clear()
+        QTest.keyClicks(widget, tekst)
+
+def wpisz_wyszukiwanie(okno):
+    """Wpisuje tekst znak po znaku - zwraca czasy poszczególnych naciśnięć klawiszy"""
+    okno.search_entry.clear()
+    QApplication.processEvents()
+    return [zmierz(lambda znak=znak: QTest.keyClick(okno.search_entry, znak)) for znak in TEKST_WYSZUKIWANIA]
+
+def zmierz_okno(okno, powtorzenia):
+    """Mierzy akcje w oknie - zwraca słownik akcja -> lista czasów"""
+    czasy = {}
+    def dodaj(nazwa, czas):
+        czasy.setdefault(nazwa, []).append(czas)
+
+    for _ in range(powtorzenia):
+        dodaj('wypelnienie_formularza', zmierz(lambda: wypelnij_formularz(okno)))
+        dodaj('znajdz_i_wyswietl', zmierz(lambda: QTest.mouseClick(okno.znajdz_button, Qt.LeftButton)))
+        dodaj('otwarcie_przegladu', zmierz(lambda: QTest.mouseClick(okno.przegladaj_button, Qt.LeftButton)))
+        klawisze = wpisz_wyszukiwanie(okno)
+        dodaj('wyszukiwarka_znak', statistics.mean(klawisze))
+        dodaj('wyszukiwarka_znak_max', max(klawisze))
+        dodaj('wyczyszczenie_filtrow', zmierz(okno.clear_filters))
+        okno.narty_window.close()
+        dodaj('odswiez_rezerwacje', zmierz(lambda: QTest.mouseClick(okno.odswiez_rezerwacje_button, Qt.LeftButton)))
+    return czasy
+
+def uruchom(rozmiary, powtorzenia):
+    """Uruchamia benchmark interfejsu dla wszystkich rozmiarów - zwraca słownik wyników"""
+    app = QApplication.instance() or QApplication(sys.argv)
+    wyniki = {}
+    for rozmiar in rozmiary:
+        with tempfile.TemporaryDirectory() as katalog:
+            narty = generuj_narty(rozmiar)
+            zapisz_narty_csv(narty, os.path.join(katalog, 'NOWABAZA_final.csv'))
+            zapisz_rezerwacje_csv(rozmiar, narty, os.path.join(katalog, 'rez.csv'))
+
+            # Okno, magazyn i jego obserwator plików używają syntetycznych plików zamiast pliki_danych
+            # (archiwum rezerwacji też tam)
+            with mock.patch.object(wczytywanie_danych, 'katalog_danych', lambda: katalog), \
+                 mock.patch.object(archiwum_rezerwacji, 'katalog_danych', lambda: katalog), \
+                 mock.patch.object(magazyn_danych, 'katalog_danych', lambda: katalog), \
+                 mock.patch.object(okno_glowne, 'katalog_danych', lambda: katalog):
+                magazyn.przeladuj()
+                start = time.perf_counter()
+                okno = SkiApp()
+                okno.show()
+                app.processEvents()
+                czasy = {'uruchomienie_okna': [time.perf_counter() - start]}
+                czasy.update(zmierz_okno(okno, powtorzenia))
+                okno.close()
+
+            for akcja, lista in czasy.items():
+                wyniki[f"ui.{akcja}@{rozmiar}"] = {'min_s': min(lista), 'mediana_s': statistics.median(lista)}
+                print(f"{akcja:25s} {rozmiar:>7d}  min {min(lista) * 1000:10.3f} ms  mediana {statistics.median(lista) * 1000:10.3f} ms")
+    return wyniki
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark opóźnień interfejsu Asystenta Doboru Nart")
+    parser.add_argument('--rozmiary', type=int, nargs='+', default=[100, 1000, 5000], help="liczby wierszy bazy i rezerwacji")
+    parser.add_argument('--powtorzenia', type=int, default=3, help="liczba powtórzeń każdej akcji")
+    dodaj_argumenty(parser)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+
+    return zakoncz(args, uruchom(args.rozmiary, args.powtorzenia),
+                   qt=QT_VERSION_STR, qpa=os.environ.get('QT_QPA_PLATFORM'))
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Generatory syntetycznych danych do benchmarków
+Baza nart w formacie NOWABAZA_final.csv i eksport rezerwacji w formacie rez.csv
+z FireSnow (wiersz "Unnamed", nagłówek, wiersze grupujące, sprzęt inny niż narty)
+"""
+import csv
+import random
+from datetime import datetime, timedelta
+
+KOLUMNY_NART = ['ID', 'MARKA', 'MODEL', 'DLUGOSC', 'ILOSC', 'POZIOM', 'PLEC', 'WAGA_MIN', 'WAGA_MAX',
+                'WZROST_MIN', 'WZROST_MAX', 'PRZEZNACZENIE', 'ROK', 'UWAGI']
+
+KOLUMNY_REZERWACJI = ['Od', 'Do', 'Użytkownik', 'Klient', 'Sprzęt', 'Uwagi', 'Kod', 'Cena', 'Zapłacono',
+                      'Cennik', 'Rabat', 'Rabat %', 'Czas', 'Do Startu', 'Numer']
+
+MARKI_MODELE = {
+    'KNEISSL': ['MY STAR XC', 'MY STAR XT', 'WHITE STAR'],
+    'ATOMIC': ['CLOUD Q14 REVOSHOCK', 'CLOUD C14 REVOSHOCK', 'REDSTER X9S'],
+    'HEAD': ['WC REBELS e.XSR', 'SHAPE e.V8', 'SUPERSHAPE e-TITAN'],
+    'VOLKL': ['RACETIGER SRC', 'DEACON 76', 'FLAIR 76'],
+    'AK': ['PINK', 'BLACK'],
+}
+
+# Poziomy, płeć i przeznaczenie w proporcjach zbliżonych do prawdziwej bazy
+POZIOMY_PLEC = [('4M/5D', 'U'), ('5M/6D', 'U'), ('4M/6D', 'U'), ('6M', 'M'), ('5M', 'M'), ('4M', 'M'),
+                ('6D', 'K'), ('5D', 'K'), ('4D', 'K'), ('3M 4D', 'U'), ('5', 'U')]
+PRZEZNACZENIA = ['SLG', 'SL', 'C', 'SLG,C', 'SL,SLG', 'OFF', 'G']
+
+def generuj_narty(liczba, ziarno=0):
+    """Zwraca listę liczba słowników w formacie wierszy NOWABAZA_final.csv"""
+    los = random.Random(ziarno)
+    narty = []
+    for i in range(1, liczba + 1):
+        marka = los.choice(list(MARKI_MODELE))
+        poziom, plec = los.choice(POZIOMY_PLEC)
+        dlugosc = los.randrange(140, 186)
+        waga_min = los.randrange(40, 75, 5)
+        wzrost_min = dlugosc + los.randrange(5, 15)
+        narty.append({
+            'ID': str(i),
+            'MARKA': marka,
+            'MODEL': los.choice(MARKI_MODELE[marka]),
+            'DLUGOSC': str(dlugosc),
+            'ILOSC': str(los.choice([1, 1, 2, 2, 3])),
+            'POZIOM': poziom,
+            'PLEC': plec,
+            'WAGA_MIN': str(waga_min),
+            'WAGA_MAX': str(waga_min + los.randrange(20, 50, 5)),
+            'WZROST_MIN': str(wzrost_min),
+            'WZROST_MAX': str(wzrost_min + 10),
+            'PRZEZNACZENIE': los.choice(PRZEZNACZENIA),
+            'ROK': str(los.choice([2023, 2024, 2025])),
+            'UWAGI': '',
+        })
+    return narty
+
+def zapisz_narty_csv(narty, sciezka):
+    """Zapisuje bazę nart jak NOWABAZA_final.csv (UTF-8 z BOM)"""
+    with open(sciezka, 'w', newline='', encoding='utf-8-sig') as plik:
+        writer = csv.DictWriter(plik, fieldnames=KOLUMNY_NART)
+        writer.writeheader()
+        writer.writerows(narty)
+
+def zapisz_rezerwacje_csv(liczba, narty, sciezka, ziarno=0, poczatek_sezonu=datetime(2025, 12, 1)):
+    """Zapisuje liczba rezerwacji nart z bazy narty w formacie rez.csv z FireSnow
+
+    Co kilka rezerwacji dodawane są wiersze grupujące klientów oraz buty i kijki,
+    które przetworz_dane_narty musi odfiltrować.
+    """
+    los = random.Random(ziarno)
+    with open(sciezka, 'w', newline='', encoding='utf-8-sig') as plik:
+        writer = csv.writer(plik)
+        writer.writerow([f"Unnamed: {i}" for i in range(len(KOLUMNY_REZERWACJI))])
+        writer.writerow(KOLUMNY_REZERWACJI)
+        writer.writerow(['', '', '', '', f"Wszyscy klienci [{liczba}]"] + [''] * 10)
+
+        for i in range(liczba):
+            narta = los.choice(narty)
+            od = poczatek_sezonu + timedelta(days=los.randrange(120), hours=los.choice([8, 9, 10, 11]))
+            do = od + timedelta(days=los.randrange(1, 10), hours=8)
+            numer = los.randrange(1, int(narta['ILOSC']) + 1)
+            klient = f"KLIENT {i % 997}"
+            daty = [od.strftime('%Y-%m-%d %H:%M:%S'), do.strftime('%Y-%m-%d %H:%M:%S'), 'KUBA', klient]
+
+            if i % 5 == 0:
+                writer.writerow(['', '', '', '', klient] + [''] * 10)
+            writer.writerow(daty + [f"NARTY {narta['MARKA']} {narta['MODEL']} {narta['DLUGOSC']}cm /{narta['ROK']} //{numer:02d}",
+                                    '', f"A{i:05d}", '300', '0', 'NARTY VIP KOMPLET', '', '', '806400000', str(i), ''])
+            if i % 3 == 0:
+                writer.writerow(daty + ['BUTY ATOMIC HAWX PRIME 85 W rozm23 /2024 //01', '', '', '0', '0',
+                                        'BUTY KOMPLET', '', '', '806400000', str(i), ''])
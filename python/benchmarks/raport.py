@@ -0,0 +1,44 @@
+"""
+Wspólna obsługa raportu benchmarków
+Argumenty wyjścia i porównania, zapis wyników w JSON, porównanie z wynikami
+bazowymi i kod wyjścia - używane przez uruchom_benchmarki i benchmark_interfejsu
+"""
+import json
+import platform
+
+def dodaj_argumenty(parser):
+    """Dodaje do parsera argumenty --wyjscie, --baseline, --prog i --zapisz-baseline"""
+    parser.add_argument('--wyjscie', help="plik JSON z wynikami")
+    parser.add_argument('--baseline', help="plik JSON z wynikami bazowymi do porównania")
+    parser.add_argument('--prog', type=float, default=0.25, help="dopuszczalny wzrost czasu (0.25 = 25%%)")
+    parser.add_argument('--zapisz-baseline', help="zapisz wyniki jako nowe wyniki bazowe")
+
+def porownaj(wyniki, baseline, prog):
+    """Zwraca listę regresji (nazwa, czas bazowy, czas obecny) przekraczających prog"""
+    regresje = []
+    for nazwa, pomiar in wyniki.items():
+        bazowy = baseline.get('wyniki', {}).get(nazwa)
+        if bazowy and pomiar['min_s'] > bazowy['min_s'] * (1 + prog):
+            regresje.append((nazwa, bazowy['min_s'], pomiar['min_s']))
+    return regresje
+
+def zakoncz(args, wyniki, **srodowisko):
+    """Zapisuje raport (wyniki i środowisko), porównuje z --baseline i zwraca kod wyjścia (1 przy regresji)"""
+    raport = {
+        'srodowisko': {'python': platform.python_version(), 'platforma': platform.platform(), **srodowisko},
+        'wyniki': wyniki,
+    }
+    for sciezka in (args.wyjscie, args.zapisz_baseline):
+        if sciezka:
+            with open(sciezka, 'w', encoding='utf-8') as plik:
+                json.dump(raport, plik, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as plik:
+            regresje = porownaj(wyniki, json.load(plik), args.prog)
+        for nazwa, bazowy, obecny in regresje:
+            print(f"REGRESJA {nazwa}: {bazowy * 1000:.3f} ms -> {obecny * 1000:.3f} ms ({obecny / bazowy - 1:+.0%})")
+        if regresje:
+            return 1
+        print(f"Brak regresji powyżej {args.prog:.0%}")
+    return 0
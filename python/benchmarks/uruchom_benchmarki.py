@@ -0,0 +1,147 @@
+"""
+Runner benchmarków gorących ścieżek dobierania nart i dostępności
+Dla każdego rozmiaru generuje syntetyczną bazę nart i rez.csv, mierzy czas
+wywołań i zapisuje wyniki w JSON; z --baseline zgłasza regresje (kod wyjścia 1)
+
+Przykłady (z katalogu python):
+    python -m benchmarks.uruchom_benchmarki --rozmiary 100 1000 10000 --wyjscie wyniki.json
+    python -m benchmarks.uruchom_benchmarki --baseline benchmarks/baseline.json
+    python -m benchmarks.uruchom_benchmarki --zapisz-baseline benchmarks/baseline.json
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import statistics
+import tempfile
+from datetime import date
+from unittest import mock
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.raport import dodaj_argumenty, zakoncz
+from benchmarks.generatory import generuj_narty, zapisz_narty_csv, zapisz_rezerwacje_csv
+from dane import wczytywanie_danych
+from dane.walidacja_bazy import waliduj_narty
+from dane.analiza_wykorzystania import AnalizaWykorzystania
+from dane.archiwum_rezerwacji import zapisz_archiwum_rezerwacji
+from dane.wczytywanie_danych import (wczytaj_narty, przetworz_dane_narty, sprawdz_czy_narta_zarezerwowana)
+from logika.dobieranie_nart import sprawdz_dopasowanie_narty, dobierz_narty
+from logika.parsowanie_poziomow import parsuj_poziom
+from logika.ocena_dopasowania import compatibility_scorer
+from logika.profil_oceny import aktywny_profil
+
+# Profile klientów używane w benchmarkach dobierania
+PROFILE = [
+    (175, 70, 4, 'Mężczyzna', 'Wszystkie'),
+    (165, 58, 3, 'Kobieta', 'SL'),
+    (182, 85, 5, 'Wszyscy', 'SLG'),
+]
+PLCI = ('Mężczyzna', 'Kobieta', 'Wszyscy')
+OKRES = (date(2026, 1, 10), date(2026, 1, 17))
+
+# Minimalny czas jednej serii pomiarowej (sekundy) i liczba serii
+CZAS_SERII = 0.2
+LICZBA_SERII = 3
+
+def zmierz(funkcja):
+    """Mierzy czas jednego wywołania funkcji - zwraca (minimum, mediana) z serii"""
+    start = time.perf_counter()
+    funkcja()
+    pierwszy = time.perf_counter() - start
+    powtorzenia = max(1, int(CZAS_SERII / pierwszy)) if pierwszy > 0 else 1000
+
+    czasy = []
+    for _ in range(LICZBA_SERII):
+        start = time.perf_counter()
+        for _ in range(powtorzenia):
+            funkcja()
+        czasy.append((time.perf_counter() - start) / powtorzenia)
+    return min(czasy), statistics.median(czasy)
+
+def przygotuj_benchmarki(katalog, narty):
+    """Zwraca słownik nazwa -> funkcja bez argumentów dla danych w katalogu"""
+    surowe_rezerwacje = pd.read_csv(os.path.join(katalog, 'rez.csv'), encoding='utf-8-sig', header=1)
+    # Dobieranie dostaje wiersze po walidacji (jak z wczytaj_narty)
+    narty = waliduj_narty(narty).narty
+    poziomy = [row['POZIOM'] for row in narty]
+
+    wzrost, waga, poziom, plec, styl = PROFILE[0]
+    dopasowania = [info['dopasowanie'] for info in
+                   (sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl) for row in narty) if info]
+    # Ocena jak w wyszukiwaniu: profil raz na wyszukiwanie, wektory zakresów raz na nartę
+    profil = aktywny_profil()
+    wektory = [(compatibility_scorer.wektor_zakresu('waga', waga, *dopasowanie['waga'][2:], profil),
+                compatibility_scorer.wektor_zakresu('wzrost', wzrost, *dopasowanie['wzrost'][2:], profil))
+               for dopasowanie in dopasowania]
+    narta = narty[len(narty) // 2]
+    # Analiza wykorzystania czyta archiwum rezerwacji (jak w aplikacji) zapisane w katalogu danych
+    archiwum = zapisz_archiwum_rezerwacji(przetworz_dane_narty(surowe_rezerwacje), os.path.join(katalog, 'archiwum'))
+
+    def parsuj_poziomy():
+        for tekst in poziomy:
+            for plec_klienta in PLCI:
+                parsuj_poziom(tekst, plec_klienta)
+
+    def sprawdz_dopasowania():
+        for row in narty:
+            sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl)
+
+    def oblicz_wspolczynniki():
+        for dopasowanie, (wektor_wagi, wektor_wzrostu) in zip(dopasowania, wektory):
+            compatibility_scorer.oblicz_wspolczynnik_idealnosci(dopasowanie, wzrost, waga, poziom, plec, styl, profil,
+                                                                wektor_wagi, wektor_wzrostu)
+
+    def dobierz():
+        for profil in PROFILE:
+            dobierz_narty(*profil, narty=narty)
+
+    return {
+        'wczytaj_narty': wczytaj_narty,
+        'parsuj_poziom': parsuj_poziomy,
+        'sprawdz_dopasowanie_narty': sprawdz_dopasowania,
+        'oblicz_wspolczynnik_idealnosci': oblicz_wspolczynniki,
+        'dobierz_narty': dobierz,
+        'przetworz_dane_narty': lambda: przetworz_dane_narty(surowe_rezerwacje),
+        'analiza_wykorzystania': lambda: AnalizaWykorzystania.z_archiwum(archiwum, narty).raporty(),
+        'sprawdz_czy_narta_zarezerwowana': lambda: sprawdz_czy_narta_zarezerwowana(
+            narta['MARKA'], narta['MODEL'], narta['DLUGOSC'], *OKRES),
+    }
+
+def uruchom(rozmiary, wybrane=None):
+    """Uruchamia benchmarki dla wszystkich rozmiarów - zwraca słownik wyników"""
+    wyniki = {}
+    for rozmiar in rozmiary:
+        with tempfile.TemporaryDirectory() as katalog:
+            narty = generuj_narty(rozmiar)
+            zapisz_narty_csv(narty, os.path.join(katalog, 'NOWABAZA_final.csv'))
+            zapisz_rezerwacje_csv(rozmiar, narty, os.path.join(katalog, 'rez.csv'))
+
+            # Funkcje wczytujące czytają syntetyczne pliki zamiast pliki_danych
+            with mock.patch.object(wczytywanie_danych, 'katalog_danych', lambda: katalog):
+                for nazwa, funkcja in przygotuj_benchmarki(katalog, narty).items():
+                    if wybrane and nazwa not in wybrane:
+                        continue
+                    minimum, mediana = zmierz(funkcja)
+                    wyniki[f"{nazwa}@{rozmiar}"] = {'min_s': minimum, 'mediana_s': mediana}
+                    print(f"{nazwa:35s} {rozmiar:>7d}  min {minimum * 1000:10.3f} ms  mediana {mediana * 1000:10.3f} ms")
+    return wyniki
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarki Asystenta Doboru Nart")
+    parser.add_argument('--rozmiary', type=int, nargs='+', default=[100, 1000, 10000],
+                        help="liczby wierszy bazy i rezerwacji (100 - 100000)")
+    parser.add_argument('--tylko', nargs='+', help="nazwy wybranych benchmarków")
+    dodaj_argumenty(parser)
+    args = parser.parse_args(argv)
+
+    # Logowanie z funkcji wczytujących zaburzałoby pomiary
+    logging.disable(logging.WARNING)
+
+    return zakoncz(args, uruchom(args.rozmiary, args.tylko), pandas=pd.__version__)
+
+if __name__ == '__main__':
+    sys.exit(main())
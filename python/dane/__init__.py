@@ -3,6 +3,19 @@ dane - moduł projektu Asystent Doboru Nart
 Zawiera funkcje obsługi danych i plików
 """
 
-from dane.wczytywanie_danych import wczytaj_narty, wczytaj_rezerwacje_firesnow, sprawdz_czy_narta_zarezerwowana
+from dane.wczytywanie_danych import (wczytaj_narty, wczytaj_baze_nart, wczytaj_surowa_baze_nart, zapisz_baze_nart,
+                                      wczytaj_rezerwacje_firesnow, sprawdz_czy_narta_zarezerwowana, klucz_narty, numer_sztuki)
+from dane.walidacja_bazy import WynikWalidacji, ProblemWiersza, waliduj_narty
+from dane.archiwum_rezerwacji import ArchiwumRezerwacji, zapisz_archiwum_rezerwacji, zarchiwizuj_rezerwacje_firesnow
+from dane.kalendarz_dostepnosci import KalendarzDostepnosci, zbuduj_kalendarz_dostepnosci
+from dane.lista_grupy import wczytaj_liste_grupy, zapisz_przydzial_grupy
+from dane.analiza_wykorzystania import AnalizaWykorzystania, zapisz_raporty_csv
+from dane.magazyn_danych import MagazynDanych, MigawkaDanych, magazyn
 
-__all__ = ['wczytaj_narty', 'wczytaj_rezerwacje_firesnow', 'sprawdz_czy_narta_zarezerwowana']
+__all__ = ['wczytaj_narty', 'wczytaj_baze_nart', 'wczytaj_surowa_baze_nart', 'zapisz_baze_nart',
+           'WynikWalidacji', 'ProblemWiersza', 'waliduj_narty',
+           'wczytaj_rezerwacje_firesnow', 'sprawdz_czy_narta_zarezerwowana', 'klucz_narty', 'numer_sztuki',
+           'ArchiwumRezerwacji', 'zapisz_archiwum_rezerwacji', 'zarchiwizuj_rezerwacje_firesnow',
+           'KalendarzDostepnosci', 'zbuduj_kalendarz_dostepnosci', 'wczytaj_liste_grupy', 'zapisz_przydzial_grupy',
+           'AnalizaWykorzystania', 'zapisz_raporty_csv',
+           'MagazynDanych', 'MigawkaDanych', 'magazyn']
@@ -0,0 +1,239 @@
+"""
+Moduł analizy wykorzystania nart
+Wykorzystanie modeli i sztuk, obłożenie dzienne ze szczytem oraz popyt wobec stanu
+według długości i poziomu - liczone z indeksu rezerwacji (kolumny archiwum albo
+kalendarz dostępności). Rezerwacje rozwijane są na dni tablicą różnicową
+(+1 w pierwszym dniu, -1 po ostatnim) i np.cumsum po dniach - bez pętli po rezerwacjach.
+Raporty można zapisać do plików CSV.
+"""
+import os
+import csv
+import logging
+from datetime import date
+import numpy as np
+
+from dane.wczytywanie_danych import klucz_narty
+from dane.kalendarz_dostepnosci import dzien
+from logika.parsowanie_poziomow import parsuj_poziom
+from narzedzia.instrumentacja import mierzony
+
+logger = logging.getLogger(__name__)
+
+# Szerokość przedziału długości w raporcie popytu (cm)
+PRZEDZIAL_DLUGOSCI = 10
+
+# Pliki raportów zapisywanych przez zapisz_raporty_csv i ich kolumny
+RAPORTY_CSV = {
+    'wykorzystanie_modeli.csv': ['MARKA', 'MODEL', 'DLUGOSC', 'ILOSC', 'REZERWACJE', 'DNI_WYPOZYCZEN',
+                                 'SZCZYT', 'DZIEN_SZCZYTU', 'WYKORZYSTANIE'],
+    'wykorzystanie_sztuk.csv': ['MARKA', 'MODEL', 'DLUGOSC', 'NUMER', 'DNI_ZAJETE', 'WYKORZYSTANIE'],
+    'oblozenie_dzienne.csv': ['DATA', 'WYPOZYCZONE', 'STAN', 'OBLOZENIE'],
+    'popyt_dlugosc_poziom.csv': ['DLUGOSC', 'POZIOM', 'MODELE', 'ILOSC', 'SREDNI_POPYT', 'SZCZYT_POPYTU',
+                                 'NIEDOBOR', 'WYKORZYSTANIE'],
+}
+
+def oblozenie_dzienne(grupy, liczba_grup, dzien_od, dzien_do, dni):
+    """Liczba rezerwacji każdej grupy w każdym dniu (grupy x dni)
+
+    Dni to indeksy od początku okresu (dzien_od <= dzien_do < dni). Różnice +1/-1
+    zliczane są jednym np.bincount, a np.cumsum po dniach daje obłożenie.
+    """
+    szerokosc = dni + 1
+    roznice = (np.bincount(grupy * szerokosc + dzien_od, minlength=liczba_grup * szerokosc) -
+               np.bincount(grupy * szerokosc + dzien_do + 1, minlength=liczba_grup * szerokosc))
+    return np.cumsum(roznice.reshape(liczba_grup, szerokosc)[:, :dni], axis=1)
+
+def _procent(licznik, mianownik):
+    return round(100 * float(licznik) / float(mianownik), 1) if mianownik else None
+
+class AnalizaWykorzystania:
+    """Wykorzystanie floty nart w okresie na podstawie kolumn rezerwacji
+
+    Rezerwacja bez numeru sztuki (0) liczy się jako jedna wypożyczona sztuka modelu,
+    ale nie trafia do wykorzystania sztuk. Stan modelu to ILOSC z bazy nart; model
+    spoza bazy ma stan oszacowany z numerów sztuk i szczytu obłożenia.
+    """
+
+    def __init__(self, klucze, klucz, numer, dzien_od, dzien_do, narty=(), data_od=None, data_do=None):
+        """klucze: modele (marka, model, długość); klucz, numer, dzien_od, dzien_do: kolumny rezerwacji"""
+        klucz = np.asarray(klucz, dtype=np.int64)
+        numer = np.asarray(numer, dtype=np.int64)
+        dzien_od = np.asarray(dzien_od, dtype=np.int64)
+        dzien_do = np.asarray(dzien_do, dtype=np.int64)
+
+        # Okres analizy: podany albo od pierwszej do ostatniej rezerwacji
+        pusta = not len(dzien_od)
+        self.poczatek = dzien(data_od) if data_od is not None else (0 if pusta else int(dzien_od.min()))
+        koniec = dzien(data_do) if data_do is not None else (self.poczatek - 1 if pusta else int(dzien_do.max()))
+        self.dni = max(koniec - self.poczatek + 1, 0)
+        dzien_od = np.maximum(dzien_od, self.poczatek) - self.poczatek
+        dzien_do = np.minimum(dzien_do, koniec) - self.poczatek
+        w_okresie = dzien_od <= dzien_do
+        klucz, numer, dzien_od, dzien_do = klucz[w_okresie], numer[w_okresie], dzien_od[w_okresie], dzien_do[w_okresie]
+
+        # Stan, długość i poziom modeli z bazy nart (ten sam model w kilku wierszach - suma sztuk)
+        katalog = {}
+        for row in narty:
+            klucz_modelu = klucz_narty(row.get('MARKA', ''), row.get('MODEL', ''), row.get('DLUGOSC', ''))
+            ilosc, poziom = katalog.get(klucz_modelu, (0, None))
+            katalog[klucz_modelu] = (ilosc + int(row.get('ILOSC') or 1),
+                                     poziom or parsuj_poziom(str(row.get('POZIOM', '')), 'Wszyscy')[0])
+
+        # Modele z rezerwacji, a po nich modele z bazy bez rezerwacji (też są częścią floty)
+        self.klucze = list(klucze)
+        znane = set(self.klucze)
+        self.klucze += [k for k in katalog if k not in znane]
+        self.rezerwacje = np.bincount(klucz, minlength=len(self.klucze))
+        self.oblozenie_modeli = oblozenie_dzienne(klucz, len(self.klucze), dzien_od, dzien_do, self.dni)
+
+        # Sztuki: unikalne pary (model, numer) z numerem; dni zajęte to dni z obłożeniem > 0
+        z_numerem = numer > 0
+        mnoznik = int(numer.max(initial=0)) + 1
+        kody_sztuk, sztuka = np.unique(klucz[z_numerem] * mnoznik + numer[z_numerem], return_inverse=True)
+        self.sztuki = [(self.klucze[kod // mnoznik], kod % mnoznik) for kod in kody_sztuk.tolist()]
+        self.dni_zajete_sztuk = (oblozenie_dzienne(sztuka.reshape(-1), len(kody_sztuk), dzien_od[z_numerem],
+                                                   dzien_do[z_numerem], self.dni) > 0).sum(axis=1)
+
+        numery = np.zeros(len(self.klucze), dtype=np.int64)
+        np.maximum.at(numery, klucz, numer)
+        self.szczyt_modeli = self.oblozenie_modeli.max(axis=1, initial=0)
+        self.stan = np.array([katalog[k][0] if k in katalog else max(int(numery[i]), int(self.szczyt_modeli[i]))
+                              for i, k in enumerate(self.klucze)], dtype=np.int64)
+        self.w_bazie = np.array([k in katalog for k in self.klucze], dtype=bool)
+        self.poziomy = [katalog[k][1] if k in katalog else None for k in self.klucze]
+
+        logger.info(f"Analiza wykorzystania: {int(w_okresie.sum())} rezerwacji, {len(self.klucze)} modeli, "
+                    f"{len(self.sztuki)} sztuk, {self.dni} dni")
+
+    @classmethod
+    @mierzony('analiza_wykorzystania')
+    def z_archiwum(cls, archiwum, narty=(), data_od=None, data_do=None):
+        """Analiza z kolumnowego archiwum rezerwacji (cała historia albo okres)"""
+        return cls(archiwum.klucze, archiwum.kolumna('klucz'), archiwum.kolumna('numer'),
+                   archiwum.kolumna('dzien_od'), archiwum.kolumna('dzien_do'), narty, data_od, data_do)
+
+    @classmethod
+    @mierzony('analiza_wykorzystania')
+    def z_kalendarza(cls, kalendarz, narty=(), data_od=None, data_do=None):
+        """Analiza z kalendarza dostępności (rezerwacje bieżącego eksportu FireSnow)"""
+        klucze = list(kalendarz.rezerwacje)
+        listy = list(kalendarz.rezerwacje.values())
+        klucz = np.repeat(np.arange(len(klucze)), [len(lista) for lista in listy])
+        kolumny = np.array([r for lista in listy for r in lista], dtype=np.int64).reshape(-1, 3)
+        return cls(klucze, klucz, kolumny[:, 0], kolumny[:, 1], kolumny[:, 2], narty, data_od, data_do)
+
+    def data(self, indeks_dnia):
+        return date.fromordinal(self.poczatek + int(indeks_dnia))
+
+    def wykorzystanie_modeli(self):
+        """Wiersze raportu modeli: dni wypożyczeń, szczyt i wykorzystanie (% sztukodni), od najwyższego"""
+        dni_wypozyczen = self.oblozenie_modeli.sum(axis=1)
+        dzien_szczytu = self.oblozenie_modeli.argmax(axis=1) if self.dni else np.zeros(len(self.klucze), dtype=int)
+        wiersze = []
+        for i, (marka, model, dlugosc) in enumerate(self.klucze):
+            wiersze.append({
+                'MARKA': marka, 'MODEL': model, 'DLUGOSC': dlugosc,
+                'ILOSC': int(self.stan[i]) if self.w_bazie[i] else f"~{int(self.stan[i])}",
+                'REZERWACJE': int(self.rezerwacje[i]),
+                'DNI_WYPOZYCZEN': int(dni_wypozyczen[i]),
+                'SZCZYT': int(self.szczyt_modeli[i]),
+                'DZIEN_SZCZYTU': self.data(dzien_szczytu[i]).isoformat() if self.szczyt_modeli[i] else '',
+                'WYKORZYSTANIE': _procent(dni_wypozyczen[i], self.stan[i] * self.dni),
+            })
+        return sorted(wiersze, key=lambda w: -(w['WYKORZYSTANIE'] or 0))
+
+    def wykorzystanie_sztuk(self):
+        """Wiersze raportu sztuk: dni zajęte (nakładające się rezerwacje liczone raz) i wykorzystanie"""
+        wiersze = [{'MARKA': marka, 'MODEL': model, 'DLUGOSC': dlugosc, 'NUMER': f"//{numer:02d}",
+                    'DNI_ZAJETE': int(dni), 'WYKORZYSTANIE': _procent(dni, self.dni)}
+                   for ((marka, model, dlugosc), numer), dni in zip(self.sztuki, self.dni_zajete_sztuk.tolist())]
+        return sorted(wiersze, key=lambda w: -(w['WYKORZYSTANIE'] or 0))
+
+    def oblozenie_floty(self):
+        """Wypożyczone sztuki całej floty w każdym dniu okresu"""
+        return self.oblozenie_modeli.sum(axis=0)
+
+    def oblozenie_dni(self):
+        """Wiersze raportu dziennego: wypożyczone sztuki i obłożenie floty (%)"""
+        stan = int(self.stan.sum())
+        return [{'DATA': self.data(i).isoformat(), 'WYPOZYCZONE': int(n), 'STAN': stan, 'OBLOZENIE': _procent(n, stan)}
+                for i, n in enumerate(self.oblozenie_floty().tolist())]
+
+    def szczyt(self):
+        """Dzień największego obłożenia floty: (data, wypożyczone sztuki, obłożenie %) albo None"""
+        if not self.dni:
+            return None
+        flota = self.oblozenie_floty()
+        dzien = int(flota.argmax())
+        return self.data(dzien), int(flota[dzien]), _procent(flota[dzien], self.stan.sum())
+
+    def popyt_wg_dlugosci_i_poziomu(self):
+        """Wiersze raportu popytu: obłożenie grup (przedział długości, poziom) wobec ich stanu
+
+        Szczyt popytu to największa liczba sztuk grupy wypożyczonych jednego dnia -
+        niedobór to jego nadwyżka nad stanem grupy (rezerwacje przyjęte ponad stan z bazy).
+        """
+        grupy, grupa_modelu = {}, np.zeros(len(self.klucze), dtype=np.int64)
+        for i, (_, _, dlugosc) in enumerate(self.klucze):
+            try:
+                od = int(float(dlugosc)) // PRZEDZIAL_DLUGOSCI * PRZEDZIAL_DLUGOSCI
+                przedzial = f"{od}-{od + PRZEDZIAL_DLUGOSCI - 1}"
+            except ValueError:
+                przedzial = '?'
+            grupa_modelu[i] = grupy.setdefault((przedzial, self.poziomy[i] or '?'), len(grupy))
+
+        oblozenie = np.zeros((len(grupy), self.dni), dtype=np.int64)
+        np.add.at(oblozenie, grupa_modelu, self.oblozenie_modeli)
+        stan = np.bincount(grupa_modelu, weights=self.stan, minlength=len(grupy)).astype(np.int64)
+        modele = np.bincount(grupa_modelu, minlength=len(grupy))
+        szczyt = oblozenie.max(axis=1, initial=0)
+        wiersze = []
+        for (przedzial, poziom), g in grupy.items():
+            wiersze.append({
+                'DLUGOSC': przedzial, 'POZIOM': poziom, 'MODELE': int(modele[g]), 'ILOSC': int(stan[g]),
+                'SREDNI_POPYT': round(float(oblozenie[g].mean()), 2) if self.dni else 0.0,
+                'SZCZYT_POPYTU': int(szczyt[g]),
+                'NIEDOBOR': max(int(szczyt[g]) - int(stan[g]), 0),
+                'WYKORZYSTANIE': _procent(oblozenie[g].sum(), stan[g] * self.dni),
+            })
+        # Przedziały rosnąco według długości (nie tekstu: 90-99 przed 100-109), nieznana długość na końcu
+        return sorted(wiersze, key=lambda w: (w['DLUGOSC'] == '?', int(w['DLUGOSC'].split('-')[0]) if w['DLUGOSC'] != '?' else 0,
+                                              str(w['POZIOM'])))
+
+    def raporty(self):
+        """Wszystkie raporty: nazwa pliku CSV -> wiersze"""
+        return dict(zip(RAPORTY_CSV, (self.wykorzystanie_modeli(), self.wykorzystanie_sztuk(),
+                                      self.oblozenie_dni(), self.popyt_wg_dlugosci_i_poziomu())))
+
+    def podsumowanie(self, najwiecej=5):
+        """Krótkie podsumowanie tekstowe (linie) do okna aplikacji"""
+        if not self.dni:
+            return ["Brak rezerwacji w okresie"]
+        linie = [f"Okres: {self.data(0)} - {self.data(self.dni - 1)} ({self.dni} dni), "
+                 f"flota {int(self.stan.sum())} szt., wykorzystanie "
+                 f"{_procent(self.oblozenie_modeli.sum(), self.stan.sum() * self.dni)}%"]
+        dzien, wypozyczone, obl = self.szczyt()
+        linie.append(f"Szczyt: {dzien} - {wypozyczone} szt. wypożyczonych ({obl}% floty)")
+        linie.append("Najczęściej wypożyczane modele:")
+        for w in [w for w in self.wykorzystanie_modeli() if w['REZERWACJE']][:najwiecej]:
+            linie.append(f"   {w['MARKA']} {w['MODEL']} ({w['DLUGOSC']} cm): {w['WYKORZYSTANIE']}%, "
+                         f"szczyt {w['SZCZYT']}/{w['ILOSC']}")
+        niedobory = [w for w in self.popyt_wg_dlugosci_i_poziomu() if w['NIEDOBOR']]
+        if niedobory:
+            linie.append("Popyt ponad stan (długość, poziom): " +
+                         ", ".join(f"{w['DLUGOSC']} cm P{w['POZIOM']} +{w['NIEDOBOR']}" for w in niedobory))
+        return linie
+
+def zapisz_raporty_csv(analiza, katalog):
+    """Zapisuje raporty analizy do plików CSV w katalogu - zwraca listę ścieżek"""
+    os.makedirs(katalog, exist_ok=True)
+    sciezki = []
+    for nazwa, wiersze in analiza.raporty().items():
+        sciezka = os.path.join(katalog, nazwa)
+        with open(sciezka, 'w', newline='', encoding='utf-8-sig') as file:
+            writer = csv.DictWriter(file, fieldnames=RAPORTY_CSV[nazwa])
+            writer.writeheader()
+            writer.writerows(wiersze)
+        sciezki.append(sciezka)
+    logger.info(f"Zapisano raporty wykorzystania do {katalog}")
+    return sciezki
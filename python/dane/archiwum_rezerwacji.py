@@ -0,0 +1,340 @@
+"""
+Moduł archiwum rezerwacji w formacie kolumnowym
+Przechowuje historię rezerwacji nart jako tablice NumPy o stałej szerokości,
+czytane przez numpy.memmap - zapytania wczytują tylko potrzebne kolumny.
+
+Archiwum to niezmienne segmenty (katalogi z kolumnami) i manifest z listą segmentów
+i słownikiem modeli. Zapis tworzy segmenty tylko ze zmienionych rezerwacji i podmienia
+manifest jednym os.replace - czytający widzą zawsze spójną wersję bez blokady.
+"""
+import os
+import json
+import shutil
+import logging
+import threading
+from datetime import date
+import numpy as np
+import pandas as pd
+
+from dane.wczytywanie_danych import (wczytaj_rezerwacje_firesnow, klucz_narty, numer_sztuki, katalog_danych)
+
+logger = logging.getLogger(__name__)
+
+# Kolumny archiwum i ich typy
+KOLUMNY_ARCHIWUM = {
+    'klucz': np.int32,       # Indeks modelu narty w słowniku kluczy
+    'numer': np.int16,       # Numer sztuki (//01 -> 1), 0 gdy nieznany
+    'dzien_od': np.int32,    # Pierwszy dzień rezerwacji (date.toordinal())
+    'dzien_do': np.int32,    # Ostatni dzień rezerwacji (date.toordinal())
+}
+
+# Kolumny rez.csv potrzebne do archiwum (bez danych klienta i cen)
+KOLUMNY_ZRODLOWE = ['Od', 'Do', 'Sprzęt', 'Data_Od', 'Data_Do', 'Sprzet']
+
+PLIK_KLUCZY = 'klucze.json'
+PLIK_MANIFESTU = 'manifest.json'
+
+# Powyżej tylu segmentów segmenty spoza okresu eksportu są scalane w jeden
+MAKS_SEGMENTOW = 16
+
+# Szereguje zapisy archiwum (przeładowanie magazynu i dobieranie bez kalendarza mogą zapisywać naraz)
+_blokada_zapisu = threading.Lock()
+ORDINAL_EPOKI = date(1970, 1, 1).toordinal()
+
+def domyslny_katalog_archiwum():
+    """Zwraca domyślny katalog archiwum w pliki_danych"""
+    return os.path.join(katalog_danych(), 'archiwum')
+
+def daty_na_dni(kolumna):
+    """Zamienia kolumnę dat na numery dni (date.toordinal()) i maskę poprawnych dat"""
+    daty = pd.to_datetime(pd.Series(kolumna), errors='coerce')
+    poprawne = daty.notna().values
+    dni = np.zeros(len(daty), dtype=np.int64)
+    dni[poprawne] = daty[poprawne].values.astype('datetime64[D]').astype(np.int64) + ORDINAL_EPOKI
+    return dni, poprawne
+
+def kolumny_z_rezerwacji(df_narty, klucze):
+    """Zamienia przetworzone rezerwacje nart na kolumny archiwum
+
+    Lista klucze jest słownikiem modeli - nowe modele są dopisywane na końcu.
+    """
+    if df_narty is None or df_narty.empty:
+        return {nazwa: np.empty(0, dtype=typ) for nazwa, typ in KOLUMNY_ARCHIWUM.items()}
+
+    indeksy = {klucz: i for i, klucz in enumerate(klucze)}
+    kolumna_klucza = []
+    for marka, model, dlugosc in zip(df_narty['Marka'], df_narty['Model'], df_narty['Dlugosc']):
+        klucz = klucz_narty(marka, model, dlugosc)
+        if klucz not in indeksy:
+            indeksy[klucz] = len(klucze)
+            klucze.append(klucz)
+        kolumna_klucza.append(indeksy[klucz])
+
+    dzien_od, od_ok = daty_na_dni(df_narty['Od'])
+    dzien_do, do_ok = daty_na_dni(df_narty['Do'])
+    poprawne = od_ok & do_ok
+
+    kolumny = {
+        'klucz': np.asarray(kolumna_klucza, dtype=np.int32),
+        'numer': np.asarray([numer_sztuki(n) for n in df_narty['Numer_Narty']], dtype=np.int16),
+        'dzien_od': dzien_od.astype(np.int32),
+        'dzien_do': dzien_do.astype(np.int32),
+    }
+    return {nazwa: tablica[poprawne] for nazwa, tablica in kolumny.items()}
+
+def wczytaj_manifest(katalog):
+    """Manifest archiwum: wersja, słownik modeli i segmenty (None gdy archiwum nie ma)
+
+    Archiwum zapisane przed wprowadzeniem segmentów (kolumny wprost w katalogu)
+    traktowane jest jak jeden segment '.'.
+    """
+    try:
+        with open(os.path.join(katalog, PLIK_MANIFESTU), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        pass
+    if not all(os.path.exists(os.path.join(katalog, f"{n}.npy")) for n in KOLUMNY_ARCHIWUM):
+        return None
+    with open(os.path.join(katalog, PLIK_KLUCZY), 'r', encoding='utf-8') as file:
+        klucze = json.load(file)
+    dzien_od = np.load(os.path.join(katalog, 'dzien_od.npy'))
+    return {'wersja': 0, 'klucze': klucze, 'do_usuniecia': [], 'segmenty': [_opis_segmentu('.', dzien_od)]}
+
+def _opis_segmentu(nazwa, dzien_od):
+    """Opis segmentu w manifeście: liczba rezerwacji i zakres pierwszych dni (do wyboru segmentów)"""
+    pusty = not len(dzien_od)
+    return {'nazwa': nazwa, 'wiersze': len(dzien_od), 'od_min': 0 if pusty else int(dzien_od.min()),
+            'od_max': 0 if pusty else int(dzien_od.max())}
+
+class ArchiwumRezerwacji:
+    """Kolumnowe archiwum rezerwacji nart mapowane z dysku (numpy.memmap)
+
+    Przy pierwszym odczycie obiekt ustala wersję archiwum (manifest) i mapuje jej
+    segmenty - późniejsze zapisy nie zmieniają tego, co widzi.
+    """
+
+    def __init__(self, katalog=None):
+        self.katalog = katalog or domyslny_katalog_archiwum()
+        self._manifest = None
+        self._segmenty = None
+        self._kolumny = {}
+        self._klucze = None
+        self._indeksy = None
+
+    def sciezka_segmentu(self, nazwa):
+        return os.path.join(self.katalog, nazwa)
+
+    def istnieje(self):
+        """Sprawdza czy archiwum zostało zapisane na dysku"""
+        return wczytaj_manifest(self.katalog) is not None
+
+    def _wersja(self):
+        """Manifest i mapowania segmentów ustalonej wersji (wczytywane raz)"""
+        if self._manifest is None:
+            for proba in range(2):
+                manifest = wczytaj_manifest(self.katalog) or {'wersja': 0, 'klucze': [], 'segmenty': []}
+                try:
+                    self._segmenty = [{nazwa: np.load(os.path.join(self.sciezka_segmentu(segment['nazwa']), f"{nazwa}.npy"),
+                                                      mmap_mode='r') for nazwa in KOLUMNY_ARCHIWUM}
+                                      for segment in manifest['segmenty'] if segment['wiersze']]
+                    break
+                except FileNotFoundError:
+                    # Segment usunięty przez równoległy zapis - nowsza wersja jest już w manifeście
+                    if proba:
+                        raise
+            self._manifest = manifest
+        return self._manifest
+
+    @property
+    def wersja(self):
+        return self._wersja()['wersja']
+
+    def kolumna(self, nazwa):
+        """Zwraca kolumnę archiwum - przy jednym segmencie mapowaną z dysku (czytaną leniwie)"""
+        if nazwa not in self._kolumny:
+            self._wersja()
+            czesci = [segment[nazwa] for segment in self._segmenty]
+            if not czesci:
+                return np.empty(0, dtype=KOLUMNY_ARCHIWUM[nazwa])
+            self._kolumny[nazwa] = czesci[0] if len(czesci) == 1 else np.concatenate(czesci)
+        return self._kolumny[nazwa]
+
+    @property
+    def klucze(self):
+        """Słownik modeli nart (lista kluczy marka, model, długość)"""
+        if self._klucze is None:
+            self._klucze = [tuple(k) for k in self._wersja()['klucze']]
+            self._indeksy = {klucz: i for i, klucz in enumerate(self._klucze)}
+        return self._klucze
+
+    def indeks_klucza(self, marka, model, dlugosc):
+        """Zwraca indeks modelu w słowniku kluczy lub None"""
+        self.klucze
+        return self._indeksy.get(klucz_narty(marka, model, dlugosc))
+
+    def __len__(self):
+        return sum(segment['wiersze'] for segment in self._wersja()['segmenty'])
+
+    def zamknij(self):
+        """Zwalnia mapowania plików - kolejny odczyt ustala najnowszą wersję archiwum"""
+        self._manifest = None
+        self._segmenty = None
+        self._kolumny.clear()
+        self._klucze = None
+        self._indeksy = None
+
+    def maska_okresu(self, data_od, data_do):
+        """Maska rezerwacji nakładających się na okres (czyta tylko kolumny dat)"""
+        dzien_od = pd.to_datetime(data_od).date().toordinal()
+        dzien_do = pd.to_datetime(data_do).date().toordinal()
+        return (self.kolumna('dzien_od') <= dzien_do) & (self.kolumna('dzien_do') >= dzien_od)
+
+    def zajete_sztuki(self, marka, model, dlugosc, data_od, data_do):
+        """Zwraca zbiór numerów sztuk zarezerwowanych w okresie (0 = sztuka nieznana)"""
+        indeks = self.indeks_klucza(marka, model, dlugosc)
+        if indeks is None or len(self) == 0:
+            return set()
+
+        maska = self.kolumna('klucz') == indeks
+        maska &= self.maska_okresu(data_od, data_do)
+        return set(int(n) for n in self.kolumna('numer')[maska])
+
+    def dni_wypozyczen(self, data_od=None, data_do=None):
+        """Zwraca liczbę dni wypożyczeń dla każdego modelu (indeks = indeks klucza)
+
+        Rezerwacje przycinane są do podanego okresu; bez okresu liczona jest cała historia.
+        """
+        dzien_od = self.kolumna('dzien_od').astype(np.int64)
+        dzien_do = self.kolumna('dzien_do').astype(np.int64)
+        if data_od is not None:
+            dzien_od = np.maximum(dzien_od, pd.to_datetime(data_od).date().toordinal())
+        if data_do is not None:
+            dzien_do = np.minimum(dzien_do, pd.to_datetime(data_do).date().toordinal())
+
+        dni = np.clip(dzien_do - dzien_od + 1, 0, None)
+        return np.bincount(self.kolumna('klucz'), weights=dni, minlength=len(self.klucze)).astype(np.int64)
+
+def zapisz_archiwum_rezerwacji(df_narty, katalog=None, zastap_okres=False):
+    """Dopisuje przetworzone rezerwacje nart do archiwum (bez duplikatów) - zwraca archiwum
+
+    Z zastap_okres eksport jest źródłem prawdy dla swojego zakresu dat: zarchiwizowane
+    rezerwacje zaczynające się między pierwszym a ostatnim początkiem rezerwacji
+    eksportu, których w nim nie ma (np. anulowane), są usuwane. Przepisywane są tylko
+    segmenty nakładające się na ten zakres; eksport bez zmian nie zapisuje niczego.
+    """
+    katalog = katalog or domyslny_katalog_archiwum()
+    with _blokada_zapisu:
+        _zapisz_archiwum(df_narty, katalog, zastap_okres)
+    return ArchiwumRezerwacji(katalog)
+
+def _wiersze(kolumny):
+    """Rezerwacje jako krotki (klucz, numer, dzien_od, dzien_do)"""
+    return list(zip(*(kolumny[n].tolist() for n in KOLUMNY_ARCHIWUM)))
+
+def _z_wierszy(wiersze):
+    """Kolumny archiwum z listy krotek rezerwacji"""
+    tablica = np.array(wiersze, dtype=np.int64).reshape(-1, len(KOLUMNY_ARCHIWUM))
+    return {nazwa: tablica[:, i].astype(typ) for i, (nazwa, typ) in enumerate(KOLUMNY_ARCHIWUM.items())}
+
+def _wczytaj_segment(katalog, segment):
+    return {nazwa: np.load(os.path.join(katalog, segment['nazwa'], f"{nazwa}.npy")) for nazwa in KOLUMNY_ARCHIWUM}
+
+def _zapisz_segment(katalog, nazwa, kolumny):
+    """Zapisuje nowy (niezmienny) segment - zwraca jego opis do manifestu"""
+    tymczasowy = os.path.join(katalog, nazwa + '.tmp')
+    os.makedirs(tymczasowy, exist_ok=True)
+    for kolumna, typ in KOLUMNY_ARCHIWUM.items():
+        np.save(os.path.join(tymczasowy, f"{kolumna}.npy"), kolumny[kolumna].astype(typ))
+    os.replace(tymczasowy, os.path.join(katalog, nazwa))
+    return _opis_segmentu(nazwa, kolumny['dzien_od'])
+
+def _usun_segmenty(katalog, nazwy):
+    """Usuwa segmenty, których nie ma już w manifeście - zwraca te, których nie dało się usunąć
+
+    (np. w Windows, gdy czytający nadal mapuje pliki - zostaną usunięte przy kolejnym zapisie)
+    """
+    zostaja = []
+    for nazwa in nazwy:
+        try:
+            if nazwa == '.':
+                for plik in [f"{n}.npy" for n in KOLUMNY_ARCHIWUM] + [PLIK_KLUCZY]:
+                    sciezka = os.path.join(katalog, plik)
+                    if os.path.exists(sciezka):
+                        os.remove(sciezka)
+            else:
+                shutil.rmtree(os.path.join(katalog, nazwa))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            zostaja.append(nazwa)
+    return zostaja
+
+def _zapisz_archiwum(df_narty, katalog, zastap_okres):
+    os.makedirs(katalog, exist_ok=True)
+    manifest = wczytaj_manifest(katalog) or {'wersja': 0, 'klucze': [], 'segmenty': [], 'do_usuniecia': []}
+    klucze = [tuple(k) for k in manifest['klucze']]
+    liczba_kluczy = len(klucze)
+    nowe = kolumny_z_rezerwacji(df_narty, klucze)
+    if not len(nowe['dzien_od']):
+        return
+
+    # Rezerwacje eksportu bez powtórzeń (w kolejności eksportu)
+    nowe_wiersze = list(dict.fromkeys(_wiersze(nowe)))
+    poczatek, koniec = int(nowe['dzien_od'].min()), int(nowe['dzien_od'].max())
+    segmenty = manifest['segmenty']
+    dotkniete = [s for s in segmenty if s['wiersze'] and s['od_min'] <= koniec and s['od_max'] >= poczatek]
+    zostaja = [s for s in segmenty if s not in dotkniete and s['wiersze']]
+    wersja = manifest['wersja'] + 1
+
+    # Tylko segmenty nakładające się na zakres eksportu są czytane
+    stare_wiersze = [w for s in dotkniete for w in _wiersze(_wczytaj_segment(katalog, s))]
+    if zastap_okres:
+        w_zakresie = [w for w in stare_wiersze if poczatek <= w[2] <= koniec]
+        if set(w_zakresie) == set(nowe_wiersze) and len(klucze) == liczba_kluczy:
+            logger.info("Archiwum rezerwacji: eksport bez zmian - bez zapisu")
+            return
+        poza_zakresem = [w for w in stare_wiersze if not poczatek <= w[2] <= koniec]
+        zapisywane = [poza_zakresem, nowe_wiersze]
+    else:
+        znane = set(stare_wiersze)
+        nowe_wiersze = [w for w in nowe_wiersze if w not in znane]
+        if not nowe_wiersze:
+            return
+        zostaja, zapisywane = zostaja + dotkniete, [nowe_wiersze]
+
+    # Wiele małych segmentów spoza zakresu eksportu - scalenie w jeden
+    if len(zostaja) + len(zapisywane) > MAKS_SEGMENTOW:
+        scalane = [w for s in zostaja for w in _wiersze(_wczytaj_segment(katalog, s))]
+        zostaja, zapisywane = [], [scalane] + zapisywane
+
+    nowe_segmenty = [_zapisz_segment(katalog, f"segment_{wersja:06d}_{i}", _z_wierszy(wiersze))
+                     for i, wiersze in enumerate(zapisywane) if wiersze]
+    segmenty_wersji = sorted(zostaja + nowe_segmenty, key=lambda s: s['od_min'])
+    uzywane = {s['nazwa'] for s in segmenty_wersji}
+
+    # Segmenty usunięte z tej wersji kasowane są dopiero przy następnym zapisie -
+    # czytający, który właśnie wczytał poprzedni manifest, zdąży je zmapować
+    pozostale = _usun_segmenty(katalog, [n for n in manifest.get('do_usuniecia', []) if n not in uzywane])
+    do_usuniecia = pozostale + [s['nazwa'] for s in segmenty if s['nazwa'] not in uzywane]
+
+    sciezka = os.path.join(katalog, PLIK_MANIFESTU)
+    with open(sciezka + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump({'wersja': wersja, 'klucze': [list(k) for k in klucze], 'segmenty': segmenty_wersji,
+                   'do_usuniecia': do_usuniecia}, file, ensure_ascii=False)
+    os.replace(sciezka + '.tmp', sciezka)
+
+    logger.info(f"Archiwum rezerwacji (wersja {wersja}): {sum(s['wiersze'] for s in segmenty_wersji)} rezerwacji, "
+                f"{len(klucze)} modeli, zapisano {sum(s['wiersze'] for s in nowe_segmenty)} w "
+                f"{len(nowe_segmenty)} segmentach")
+
+def zarchiwizuj_rezerwacje_firesnow(katalog=None):
+    """Wczytuje rez.csv/rez.xlsx (tylko potrzebne kolumny) i dopisuje je do archiwum
+
+    Eksport zastępuje archiwum w swoim zakresie dat (zapisz_archiwum_rezerwacji z zastap_okres).
+    """
+    try:
+        df_narty = wczytaj_rezerwacje_firesnow(kolumny=KOLUMNY_ZRODLOWE)
+        return zapisz_archiwum_rezerwacji(df_narty, katalog, zastap_okres=True)
+    except Exception as e:
+        logger.error(f"Błąd podczas archiwizacji rezerwacji: {e}")
+        return None
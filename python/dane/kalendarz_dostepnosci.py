@@ -0,0 +1,167 @@
+"""
+Moduł kalendarza dostępności nart
+Każda fizyczna sztuka narty ma mapę bitową sezonu (jeden bit = jeden dzień),
+więc sprawdzanie nakładania się terminów to operacje bitowe
+"""
+import logging
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+
+from narzedzia.instrumentacja import mierzony
+from dane.wczytywanie_danych import wczytaj_rezerwacje_firesnow, klucz_narty, numer_sztuki
+from dane.archiwum_rezerwacji import KOLUMNY_ZRODLOWE, daty_na_dni, zarchiwizuj_rezerwacje_firesnow
+
+logger = logging.getLogger(__name__)
+
+# Kalendarz obejmuje rezerwacje kończące się najwyżej tyle dni temu - starsza historia zostaje w archiwum
+DNI_HISTORII_KALENDARZA = 730
+
+def dzien(data):
+    """Zamienia datę (date, datetime lub tekst) na numer dnia (date.toordinal())"""
+    if isinstance(data, int):
+        return data
+    if isinstance(data, date):
+        return data.toordinal()
+    return pd.to_datetime(data).date().toordinal()
+
+class KalendarzDostepnosci:
+    """Mapy bitowe zajętości dla każdej sztuki narty w sezonie
+
+    Sztuka o numerze 0 oznacza rezerwację bez numeru - blokuje wszystkie sztuki modelu.
+    Dni poza sezonem (przed pierwszą i po ostatniej rezerwacji) są zawsze wolne.
+    """
+
+    def __init__(self, rezerwacje=()):
+        """rezerwacje: iterowalne krotki (klucz, numer, dzien_od, dzien_do)"""
+        rezerwacje = [r for r in rezerwacje if r[2] <= r[3]]
+        self.poczatek = min((r[2] for r in rezerwacje), default=0)
+        koniec = max((r[3] for r in rezerwacje), default=-1)
+        self.dni = koniec - self.poczatek + 1
+
+        self.mapy = {}          # (klucz, numer) -> mapa bitowa dni
+        self.rezerwacje = {}    # klucz -> lista (numer, dzien_od, dzien_do)
+        for klucz, numer, dzien_od, dzien_do in rezerwacje:
+            bity = ((1 << (dzien_do - dzien_od + 1)) - 1) << (dzien_od - self.poczatek)
+            self.mapy[(klucz, numer)] = self.mapy.get((klucz, numer), 0) | bity
+            self.rezerwacje.setdefault(klucz, []).append((numer, dzien_od, dzien_do))
+
+        logger.info(f"Kalendarz dostępności: {len(rezerwacje)} rezerwacji, {len(self.mapy)} sztuk, {max(self.dni, 0)} dni")
+
+    @classmethod
+    @mierzony('indeks_rezerwacji')
+    def z_rezerwacji(cls, df_narty):
+        """Buduje kalendarz z przetworzonych rezerwacji (wynik przetworz_dane_narty)"""
+        if df_narty is None or df_narty.empty:
+            return cls()
+
+        dzien_od, od_ok = daty_na_dni(df_narty['Od'])
+        dzien_do, do_ok = daty_na_dni(df_narty['Do'])
+        rezerwacje = []
+        for i, (marka, model, dlugosc, numer) in enumerate(zip(df_narty['Marka'], df_narty['Model'],
+                                                               df_narty['Dlugosc'], df_narty['Numer_Narty'])):
+            if od_ok[i] and do_ok[i]:
+                rezerwacje.append((klucz_narty(marka, model, dlugosc), numer_sztuki(numer),
+                                   int(dzien_od[i]), int(dzien_do[i])))
+        return cls(rezerwacje)
+
+    @classmethod
+    @mierzony('indeks_rezerwacji')
+    def z_archiwum(cls, archiwum, data_od=None, data_do=None):
+        """Buduje kalendarz z archiwum rezerwacji (opcjonalnie tylko rezerwacje nakładające się na okres)
+
+        Każda z granic okresu może być pominięta - wtedy okres jest z tej strony otwarty.
+        Czytane są tylko wybrane wiersze kolumn mapowanych z dysku.
+        """
+        if len(archiwum) == 0:
+            return cls()
+
+        maska = np.ones(len(archiwum), dtype=bool)
+        if data_od is not None:
+            maska &= archiwum.kolumna('dzien_do') >= dzien(data_od)
+        if data_do is not None:
+            maska &= archiwum.kolumna('dzien_od') <= dzien(data_do)
+        klucze = archiwum.klucze
+        kolumny = zip(archiwum.kolumna('klucz')[maska], archiwum.kolumna('numer')[maska],
+                      archiwum.kolumna('dzien_od')[maska], archiwum.kolumna('dzien_do')[maska])
+        return cls((klucze[k], int(n), int(od), int(do)) for k, n, od, do in kolumny)
+
+    def maska_zakresu(self, data_od, data_do):
+        """Zwraca mapę bitową dni okresu przyciętą do sezonu"""
+        start = max(dzien(data_od) - self.poczatek, 0)
+        koniec = min(dzien(data_do) - self.poczatek, self.dni - 1)
+        if koniec < start:
+            return 0
+        return ((1 << (koniec - start + 1)) - 1) << start
+
+    def zajete_dni(self, klucz, numer):
+        """Mapa bitowa dni, w których sztuka jest zajęta (z rezerwacjami bez numeru)"""
+        return self.mapy.get((klucz, numer), 0) | self.mapy.get((klucz, 0), 0)
+
+    def czy_wolna(self, marka, model, dlugosc, numer, data_od, data_do):
+        """Sprawdza czy sztuka jest wolna przez cały okres"""
+        klucz = klucz_narty(marka, model, dlugosc)
+        return not (self.zajete_dni(klucz, numer) & self.maska_zakresu(data_od, data_do))
+
+    def wolne_sztuki(self, marka, model, dlugosc, ilosc, data_od, data_do):
+        """Zwraca numery sztuk (1..ilosc) wolnych każdego dnia okresu"""
+        klucz = klucz_narty(marka, model, dlugosc)
+        if klucz not in self.rezerwacje:
+            return list(range(1, ilosc + 1))
+
+        maska = self.maska_zakresu(data_od, data_do)
+        return [numer for numer in range(1, ilosc + 1) if not (self.zajete_dni(klucz, numer) & maska)]
+
+    def rezerwacje_w_okresie(self, marka, model, dlugosc, data_od, data_do):
+        """Zwraca rezerwacje modelu nakładające się na okres: lista (numer, data_od, data_do)"""
+        klucz = klucz_narty(marka, model, dlugosc)
+        od, do = dzien(data_od), dzien(data_do)
+        return [(numer, date.fromordinal(r_od), date.fromordinal(r_do))
+                for numer, r_od, r_do in self.rezerwacje.get(klucz, [])
+                if r_od <= do and r_do >= od]
+
+    def pierwsze_wolne_okno(self, marka, model, dlugosc, numer, liczba_dni, od_daty):
+        """Zwraca pierwszy dzień (date) od od_daty, od którego sztuka jest wolna przez liczba_dni dni"""
+        klucz = klucz_narty(marka, model, dlugosc)
+        start = dzien(od_daty) - self.poczatek
+        liczba_dni = max(liczba_dni, 1)
+        zajete = self.zajete_dni(klucz, numer)
+        if not zajete or start >= self.dni:
+            return date.fromordinal(self.poczatek + start)
+
+        # Dziedzina: od startu (lub początku sezonu) do końca sezonu + liczba_dni wolnych dni zapasu
+        baza = min(start, 0)
+        dlugosc_dziedziny = max(self.dni, start) + liczba_dni - baza
+        wolne = ~(zajete << -baza) & ((1 << dlugosc_dziedziny) - 1)
+
+        # Bit i zostaje ustawiony tylko gdy dni i..i+liczba_dni-1 są wolne
+        ciagi, dlugosc_ciagu = wolne, 1
+        while dlugosc_ciagu < liczba_dni:
+            krok = min(dlugosc_ciagu, liczba_dni - dlugosc_ciagu)
+            ciagi &= ciagi >> krok
+            dlugosc_ciagu += krok
+
+        ciagi >>= start - baza
+        najnizszy = (ciagi & -ciagi).bit_length() - 1
+        return date.fromordinal(self.poczatek + start + najnizszy)
+
+def zbuduj_kalendarz_dostepnosci(katalog_archiwum=None):
+    """Archiwizuje bieżący eksport FireSnow i buduje kalendarz z archiwum rezerwacji
+
+    W pamięci są tylko rezerwacje z ostatnich DNI_HISTORII_KALENDARZA dni i przyszłe -
+    starsza historia zostaje na dysku. Gdy archiwum nie da się zapisać, kalendarz
+    budowany jest wprost z eksportu (tylko potrzebne kolumny).
+    """
+    archiwum = zarchiwizuj_rezerwacje_firesnow(katalog_archiwum)
+    if archiwum is not None:
+        try:
+            return KalendarzDostepnosci.z_archiwum(archiwum, data_od=date.today() - timedelta(days=DNI_HISTORII_KALENDARZA))
+        except Exception as e:
+            logger.error(f"Błąd podczas budowania kalendarza z archiwum: {e}")
+        finally:
+            archiwum.zamknij()
+    try:
+        return KalendarzDostepnosci.z_rezerwacji(wczytaj_rezerwacje_firesnow(kolumny=KOLUMNY_ZRODLOWE))
+    except Exception as e:
+        logger.error(f"Błąd podczas budowania kalendarza dostępności: {e}")
+        return KalendarzDostepnosci()
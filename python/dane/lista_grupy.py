@@ -0,0 +1,88 @@
+"""
+Moduł listy grupy (szkoły, obozy)
+Wczytuje listę uczestników z CSV i zapisuje przydział nart dla całej grupy
+"""
+import csv
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Kolumny pliku z listą grupy
+KOLUMNY_LISTY = ['IMIE', 'WZROST', 'WAGA', 'POZIOM', 'PLEC', 'STYL']
+
+# Kolumny pliku z przydziałem nart
+KOLUMNY_PRZYDZIALU = KOLUMNY_LISTY + ['KATEGORIA', 'MARKA', 'MODEL', 'DLUGOSC', 'NUMER', 'WSPOLCZYNNIK']
+
+PLEC_Z_SKROTU = {'M': 'Mężczyzna', 'K': 'Kobieta', 'U': 'Wszyscy'}
+SKROT_PLCI = {pelna: skrot for skrot, pelna in PLEC_Z_SKROTU.items()}
+STYLE_JAZDY = ['Wszystkie', 'SL', 'G', 'SLG', 'C', 'OFF']
+
+def profil_z_wiersza(row):
+    """Zamienia wiersz listy grupy na profil klienta (None gdy dane są niepoprawne)"""
+    try:
+        wzrost = int(row['WZROST'])
+        waga = int(row['WAGA'])
+        poziom = int(row['POZIOM'])
+        plec = PLEC_Z_SKROTU[row['PLEC'].strip().upper()]
+    except (KeyError, ValueError, AttributeError):
+        return None
+
+    if not (100 <= wzrost <= 250 and 20 <= waga <= 200 and 1 <= poziom <= 6):
+        return None
+
+    styl = (row.get('STYL') or '').strip() or 'Wszystkie'
+    if styl not in STYLE_JAZDY:
+        styl = 'Wszystkie'
+
+    return {
+        'imie': (row.get('IMIE') or '').strip(),
+        'wzrost': wzrost,
+        'waga': waga,
+        'poziom': poziom,
+        'plec': plec,
+        'styl': styl,
+    }
+
+def wczytaj_liste_grupy(sciezka):
+    """Wczytuje listę grupy z pliku CSV (kolumny IMIE, WZROST, WAGA, POZIOM, PLEC, STYL)"""
+    profile = []
+    with open(sciezka, 'r', newline='', encoding='utf-8-sig') as file:
+        for nr, row in enumerate(csv.DictReader(file), 2):
+            profil = profil_z_wiersza(row)
+            if profil is None:
+                logger.warning(f"Pominięto wiersz {nr} listy grupy - niepoprawne dane: {row}")
+                continue
+            profile.append(profil)
+
+    logger.info(f"Wczytano listę grupy: {len(profile)} osób z {sciezka}")
+    return profile
+
+def zapisz_przydzial_grupy(przydzial, sciezka):
+    """Zapisuje przydział nart dla grupy do pliku CSV"""
+    with open(sciezka, 'w', newline='', encoding='utf-8-sig') as file:
+        writer = csv.DictWriter(file, fieldnames=KOLUMNY_PRZYDZIALU)
+        writer.writeheader()
+        for pozycja in przydzial:
+            profil = pozycja['profil']
+            wiersz = {
+                'IMIE': profil.get('imie', ''),
+                'WZROST': profil['wzrost'],
+                'WAGA': profil['waga'],
+                'POZIOM': profil['poziom'],
+                'PLEC': SKROT_PLCI.get(profil['plec'], profil['plec']),
+                'STYL': profil.get('styl') or 'Wszystkie',
+                'KATEGORIA': pozycja['kategoria'] or 'BRAK',
+            }
+            narta_info = pozycja['narta_info']
+            if narta_info:
+                narta = narta_info['dane']
+                wiersz.update({
+                    'MARKA': narta.get('MARKA', ''),
+                    'MODEL': narta.get('MODEL', ''),
+                    'DLUGOSC': narta.get('DLUGOSC', ''),
+                    'NUMER': f"//{pozycja['numer_sztuki']:02d}",
+                    'WSPOLCZYNNIK': narta_info['wspolczynnik_idealnosci'],
+                })
+            writer.writerow(wiersz)
+
+    logger.info(f"Zapisano przydział nart dla {len(przydzial)} osób do {sciezka}")
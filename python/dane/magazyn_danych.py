@@ -0,0 +1,116 @@
+"""
+Moduł magazynu danych
+Trzyma wczytaną bazę nart i kalendarz dostępności w pamięci, aby kolejne
+wyszukiwania nie parsowały ponownie plików CSV. Dane udostępniane są jako
+niezmienne migawki - przeładowanie buduje nową migawkę i podmienia ją
+jednym przypisaniem, a trwające wyszukiwania używają migawki, od której zaczęły.
+Obserwator plików przeładowuje też profil oceny (profil_oceny.json).
+Każdy nowy eksport rezerwacji trafia do archiwum rezerwacji, z którego budowany
+jest kalendarz (zbuduj_kalendarz_dostepnosci).
+"""
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from dane.wczytywanie_danych import wczytaj_baze_nart, katalog_danych
+from dane.walidacja_bazy import WynikWalidacji
+from dane.kalendarz_dostepnosci import KalendarzDostepnosci, zbuduj_kalendarz_dostepnosci
+from logika.profil_oceny import PLIK_PROFILU, aktywny_profil, przeladuj_profil
+from narzedzia.obserwator_plikow import ObserwatorPlikow
+from narzedzia.instrumentacja import trafienie
+
+logger = logging.getLogger(__name__)
+
+# Pliki w pliki_danych, których zmiana wymaga przeładowania
+PLIK_NART = 'NOWABAZA_final.csv'
+PLIKI_REZERWACJI = ('rez.csv', 'rez.xlsx')
+
+@dataclass(frozen=True)
+class MigawkaDanych:
+    """Niezmienna migawka bazy nart i kalendarza (kalendarz nie jest modyfikowany po zbudowaniu)"""
+    narty: tuple = ()
+    walidacja: WynikWalidacji = field(default_factory=WynikWalidacji)
+    kalendarz: KalendarzDostepnosci = field(default_factory=KalendarzDostepnosci)
+    wczytano: datetime = None
+    wersja: int = 0
+
+    def status(self):
+        """Podstawowe informacje o migawce"""
+        return {
+            'wersja': self.wersja,
+            'narty': len(self.narty),
+            'odrzucone_wiersze': len(self.walidacja.odrzucone),
+            'sztuki_z_rezerwacjami': len(self.kalendarz.mapy),
+            'wczytano': self.wczytano.isoformat(timespec='seconds') if self.wczytano else None,
+        }
+
+class MagazynDanych:
+    """Ciepła pamięć bazy nart i rezerwacji współdzielona przez wyszukiwania
+
+    Odczyt (migawka, dane) nie używa blokady; blokada szereguje tylko przeładowania.
+    """
+
+    def __init__(self):
+        self._blokada_przeladowania = threading.Lock()
+        self.migawka = MigawkaDanych()
+
+    def przeladuj(self, narty=True, rezerwacje=True):
+        """Wczytuje ponownie bazę nart i/lub rezerwacje i podmienia migawkę"""
+        with self._blokada_przeladowania:
+            return self._przeladuj(narty, rezerwacje)
+
+    def _przeladuj(self, narty, rezerwacje):
+        """Przeładowanie właściwe - wywoływane z założoną blokadą przeładowania"""
+        stara = self.migawka
+        walidacja = wczytaj_baze_nart() if narty else stara.walidacja
+        if not walidacja.narty and stara.narty:
+            # Pusta baza to błąd odczytu (np. plik w trakcie zapisu) - zostaje poprzednia
+            logger.warning("Wczytano pustą bazę nart - pozostaje poprzednia")
+            walidacja = stara.walidacja
+        nowa = MigawkaDanych(
+            narty=walidacja.narty,
+            walidacja=walidacja,
+            kalendarz=zbuduj_kalendarz_dostepnosci() if rezerwacje else stara.kalendarz,
+            wczytano=datetime.now(),
+            wersja=stara.wersja + 1,
+        )
+        self.migawka = nowa
+        logger.info(f"Magazyn danych przeładowany (wersja {nowa.wersja}): {len(nowa.narty)} nart")
+        return nowa
+
+    def dane(self):
+        """Zwraca spójną parę (narty, kalendarz) do jednego wyszukiwania (przy pierwszym użyciu wczytuje dane)"""
+        migawka = self.migawka
+        trafienie('magazyn', migawka.wersja != 0)
+        if migawka.wersja == 0:
+            migawka = self.wczytaj_jesli_brak()
+        return migawka.narty, migawka.kalendarz
+
+    def wczytaj_jesli_brak(self):
+        """Wczytuje dane, jeśli nie były jeszcze wczytane (czeka na trwające wczytywanie)"""
+        with self._blokada_przeladowania:
+            if self.migawka.wersja:
+                return self.migawka
+            return self._przeladuj(narty=True, rezerwacje=True)
+
+    def przeladuj_zmienione(self, nazwy):
+        """Przeładowuje dane po zmianie wskazanych plików (callback obserwatora)"""
+        if PLIK_PROFILU in nazwy:
+            przeladuj_profil()
+        narty = PLIK_NART in nazwy
+        rezerwacje = any(nazwa in PLIKI_REZERWACJI for nazwa in nazwy)
+        if narty or rezerwacje:
+            self.przeladuj(narty=narty, rezerwacje=rezerwacje)
+
+    def obserwuj(self, katalog=None):
+        """Uruchamia obserwatora pliki_danych - nowe eksporty są wczytywane w tle"""
+        return ObserwatorPlikow(katalog or katalog_danych(), (PLIK_NART, PLIK_PROFILU) + PLIKI_REZERWACJI,
+                                self.przeladuj_zmienione).start()
+
+    def status(self):
+        """Podstawowe informacje o stanie magazynu i aktywnym profilu oceny"""
+        return {**self.migawka.status(), 'profil_oceny': aktywny_profil().opis()}
+
+# Wspólny magazyn aplikacji (okno i serwer)
+magazyn = MagazynDanych()
@@ -0,0 +1,111 @@
+"""
+Moduł walidacji bazy nart
+Sprawdza wiersze bazy raz przy wczytaniu i dzieli je na poprawne, naprawione
+(np. zbędne spacje, "160.0" zamiast 160, brak ilości, nieznana płeć) i odrzucone (brak
+wymaganych pól, niepoprawne liczby, odwrócone zakresy lub poziom). Dobieranie dostaje tylko
+poprawne wiersze z zakresami wagi i wzrostu oraz ilością zamienionymi na int.
+"""
+import logging
+from dataclasses import dataclass
+
+from logika.parsowanie_poziomow import parsuj_poziom
+
+logger = logging.getLogger(__name__)
+
+# Pola, bez których narty nie da się dopasować
+POLA_WYMAGANE = ('POZIOM', 'WAGA_MIN', 'WAGA_MAX', 'WZROST_MIN', 'WZROST_MAX', 'DLUGOSC', 'PLEC')
+POLA_LICZBOWE = ('WAGA_MIN', 'WAGA_MAX', 'WZROST_MIN', 'WZROST_MAX')
+PLCI_NART = ('M', 'K', 'D', 'U')
+
+@dataclass(frozen=True)
+class ProblemWiersza:
+    """Wiersz bazy naprawiony lub odrzucony przy walidacji"""
+    numer: int      # numer linii w pliku CSV (nagłówek to linia 1)
+    id: str
+    narta: str      # marka, model i długość do raportu
+    powod: str
+
+@dataclass(frozen=True)
+class WynikWalidacji:
+    """Poprawne narty (łącznie z naprawionymi) i raport naprawionych oraz odrzuconych wierszy"""
+    narty: tuple = ()
+    naprawione: tuple = ()
+    odrzucone: tuple = ()
+
+    def podsumowanie(self):
+        return (f"{len(self.narty)} nart ({len(self.naprawione)} naprawionych), "
+                f"{len(self.odrzucone)} odrzuconych")
+
+def _liczba_calkowita(tekst):
+    """Zamienia tekst na int - zwraca (liczba, czy_naprawiono); ValueError gdy niepoprawny"""
+    try:
+        liczba = int(float(tekst.replace(',', '.')))
+    except OverflowError:
+        raise ValueError(tekst)
+    return liczba, str(liczba) != tekst
+
+def waliduj_wiersz(row):
+    """Sprawdza jeden wiersz bazy - zwraca (wiersz z typami, poprawki); ValueError z powodem odrzucenia"""
+    brakujace = [pole for pole in POLA_WYMAGANE if not row.get(pole)]
+    if brakujace:
+        raise ValueError(f"brak pól: {', '.join(brakujace)}")
+
+    wiersz = {klucz: wartosc.strip() if isinstance(wartosc, str) else wartosc for klucz, wartosc in row.items()}
+    poprawki = [f"spacje w {klucz}" for klucz, wartosc in row.items()
+                if isinstance(wartosc, str) and wartosc != wiersz[klucz]]
+
+    for pole in POLA_LICZBOWE:
+        try:
+            wiersz[pole], naprawiono = _liczba_calkowita(wiersz[pole])
+        except ValueError:
+            raise ValueError(f"niepoprawna liczba w {pole}: {row[pole]!r}")
+        if naprawiono:
+            poprawki.append(f"{pole} {row[pole]!r} -> {wiersz[pole]}")
+    for pole_min, pole_max in (('WAGA_MIN', 'WAGA_MAX'), ('WZROST_MIN', 'WZROST_MAX')):
+        if wiersz[pole_min] > wiersz[pole_max]:
+            raise ValueError(f"odwrócony zakres {pole_min}-{pole_max}: {wiersz[pole_min]}-{wiersz[pole_max]}")
+
+    try:
+        wiersz['ILOSC'], naprawiono = _liczba_calkowita(wiersz.get('ILOSC') or '1')
+    except ValueError:
+        wiersz['ILOSC'], naprawiono = 1, True
+    if naprawiono or not row.get('ILOSC'):
+        poprawki.append(f"ILOSC {row.get('ILOSC')!r} -> {wiersz['ILOSC']}")
+
+    plec = wiersz['PLEC'].upper() or 'U'
+    if plec != wiersz['PLEC']:
+        poprawki.append(f"PLEC {row['PLEC']!r} -> {plec!r}")
+        wiersz['PLEC'] = plec
+    if plec not in PLCI_NART:
+        # Narta zostaje w bazie - dobieranie pokazuje ją z oznaczeniem "Nieznana płeć"
+        poprawki.append(f"nieznana płeć narty {row['PLEC']!r} (dopasowanie jako nieznana płeć)")
+
+    # Format poziomu nie zależy od płci klienta - wystarczy jedno parsowanie
+    if parsuj_poziom(wiersz['POZIOM'], 'Wszyscy')[0] is None:
+        raise ValueError(f"nieznany format poziomu: {row['POZIOM']!r}")
+
+    return wiersz, poprawki
+
+def waliduj_narty(wiersze):
+    """Waliduje surowe wiersze bazy (csv.DictReader) - zwraca WynikWalidacji"""
+    narty, naprawione, odrzucone = [], [], []
+    for numer, row in enumerate(wiersze, start=2):
+        opis = f"{row.get('MARKA', '')} {row.get('MODEL', '')} {row.get('DLUGOSC', '')}".strip()
+        try:
+            wiersz, poprawki = waliduj_wiersz(row)
+        except ValueError as e:
+            odrzucone.append(ProblemWiersza(numer, row.get('ID', ''), opis, str(e)))
+            continue
+        if poprawki:
+            naprawione.append(ProblemWiersza(numer, row.get('ID', ''), opis, "; ".join(poprawki)))
+        narty.append(wiersz)
+
+    wynik = WynikWalidacji(tuple(narty), tuple(naprawione), tuple(odrzucone))
+    for problem in naprawione:
+        if 'nieznana płeć' in problem.powod:
+            logger.warning(f"Wiersz {problem.numer} bazy nart (ID {problem.id}, {problem.narta}): {problem.powod}")
+    for problem in odrzucone:
+        logger.warning(f"Odrzucono wiersz {problem.numer} bazy nart (ID {problem.id}, {problem.narta}): {problem.powod}")
+    if naprawione or odrzucone:
+        logger.info(f"Walidacja bazy nart: {wynik.podsumowanie()}")
+    return wynik
@@ -1,51 +1,87 @@
 """
 Moduł wczytywania danych z plików CSV
-Obsługuje bazę nart i rezerwacje z FireSnow
+Obsługuje bazę nart i rezerwacje z FireSnow - wspólny dla aplikacji (main.py)
+i edytora bazy (nowabaza.py)
 """
 import csv
 import pandas as pd
 import os
 import logging
 
+from dane.walidacja_bazy import WynikWalidacji, waliduj_narty
+from narzedzia.instrumentacja import mierzony
+
 logger = logging.getLogger(__name__)
 
-def wczytaj_narty():
-    """Wczytuje wszystkie narty z bazy danych"""
+def katalog_danych():
+    """Katalog pliki_danych programu (baza nart i eksporty FireSnow)"""
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pliki_danych')
+
+def sciezka_bazy_nart():
+    """Ścieżka pliku bazy nart"""
+    return os.path.join(katalog_danych(), 'NOWABAZA_final.csv')
+
+def wczytaj_surowa_baze_nart():
+    """Wczytuje bazę nart bez walidacji (przegląd i edycja) - zwraca (kolumny, wiersze)"""
+    with open(sciezka_bazy_nart(), 'r', newline='', encoding='utf-8-sig') as file:
+        reader = csv.DictReader(file)
+        return reader.fieldnames or [], list(reader)
+
+def zapisz_baze_nart(wiersze, kolumny):
+    """Zapisuje bazę nart przez plik tymczasowy - czytający nigdy nie widzą połowy pliku"""
+    sciezka = sciezka_bazy_nart()
+    tymczasowy = f"{sciezka}.tmp"
+    with open(tymczasowy, 'w', newline='', encoding='utf-8-sig') as file:
+        writer = csv.DictWriter(file, fieldnames=kolumny, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(wiersze)
+    os.replace(tymczasowy, sciezka)
+    logger.info(f"Zapisano {len(wiersze)} nart do {sciezka}")
+
+@mierzony('wczytanie_bazy')
+def wczytaj_baze_nart():
+    """Wczytuje i waliduje bazę nart - zwraca WynikWalidacji (poprawne narty i raport wierszy)"""
     try:
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        csv_file = os.path.join(current_dir, 'pliki_danych', 'NOWABAZA_final.csv')
-        
-        with open(csv_file, 'r', newline='', encoding='utf-8-sig') as file:
-            reader = csv.DictReader(file)
-            return list(reader)
+        _, wiersze = wczytaj_surowa_baze_nart()
+        return waliduj_narty(wiersze)
     except Exception as e:
         logger.error(f"Błąd podczas wczytywania nart: {e}")
-        return []
+        return WynikWalidacji()
 
-def wczytaj_rezerwacje_firesnow():
-    """Wczytuje rezerwacje z pliku rez.csv (sprawdzony format)"""
+def wczytaj_narty():
+    """Wczytuje wszystkie poprawne narty z bazy danych (po walidacji)"""
+    return list(wczytaj_baze_nart().narty)
+
+@mierzony('wczytanie_rezerwacji')
+def wczytaj_rezerwacje_firesnow(kolumny=None):
+    """Wczytuje rezerwacje z pliku rez.csv (sprawdzony format)
+
+    Opcjonalna lista kolumny ogranicza wczytywane kolumny (np. bez danych klienta).
+    """
     try:
         # Sprawdź w katalogu programu
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        rez_csv = os.path.join(current_dir, 'pliki_danych', 'rez.csv')
-        rez_xlsx = os.path.join(current_dir, 'pliki_danych', 'rez.xlsx')
+        rez_csv = os.path.join(katalog_danych(), 'rez.csv')
+        rez_xlsx = os.path.join(katalog_danych(), 'rez.xlsx')
+        
+        # Wczytuj tylko wskazane kolumny, jeśli podano
+        usecols = (lambda kolumna: kolumna in kolumny) if kolumny else None
         
         # Użyj sprawdzonego pliku rez.csv
         if os.path.exists(rez_csv):
             # Użyj pliku CSV - header=1 bo pierwszy wiersz to "Unnamed", ale sprawdź strukturę
             try:
-                df = pd.read_csv(rez_csv, encoding='utf-8-sig', header=1)
+                df = pd.read_csv(rez_csv, encoding='utf-8-sig', header=1, usecols=usecols)
                 logger.info("Wczytano dane z rez.csv")
                 return przetworz_dane_narty(df)
             except Exception as e:
                 logger.warning(f"Błąd parsowania z header=1, próbuję header=0: {e}")
                 # Fallback: spróbuj z header=0
-                df = pd.read_csv(rez_csv, encoding='utf-8-sig', header=0)
+                df = pd.read_csv(rez_csv, encoding='utf-8-sig', header=0, usecols=usecols)
                 logger.info("Wczytano dane z rez.csv (header=0)")
                 return przetworz_dane_narty(df)
         elif os.path.exists(rez_xlsx):
             # Wczytaj dane z Excel
-            df = pd.read_excel(rez_xlsx, header=1)
+            df = pd.read_excel(rez_xlsx, header=1, usecols=usecols)
             logger.info("Wczytano dane z rez.xlsx")
             return przetworz_dane_narty(df)
         else:
@@ -133,6 +169,17 @@ def przetworz_dane_narty(df):
         logger.error(f"Błąd podczas przetwarzania danych nart: {e}")
         return pd.DataFrame()
 
+def klucz_narty(marka, model, dlugosc):
+    """Zwraca klucz identyfikujący model narty o danej długości"""
+    return (str(marka).strip(), str(model).strip(), str(dlugosc).strip())
+
+def numer_sztuki(numer_narty):
+    """Zamienia oznaczenie sztuki z FireSnow (np. "//02") na numer (2), 0 gdy brak"""
+    if not isinstance(numer_narty, str):
+        return 0
+    cyfry = numer_narty.strip().lstrip('/')
+    return int(cyfry) if cyfry.isdigit() else 0
+
 def sprawdz_czy_narta_zarezerwowana(marka, model, dlugosc, data_od=None, data_do=None):
     """Sprawdza czy narta jest zarezerwowana w danym terminie"""
     try:
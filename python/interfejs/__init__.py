@@ -4,5 +4,7 @@ Zawiera komponenty interfejsu użytkownika
 """
 
 from interfejs.okno_glowne import SkiApp, DatePickerDialog
+from interfejs.okno_diagnostyki import OknoDiagnostyki
+from interfejs.okno_walidacji import OknoWalidacji
 
-__all__ = ['SkiApp', 'DatePickerDialog']
+__all__ = ['SkiApp', 'DatePickerDialog', 'OknoDiagnostyki', 'OknoWalidacji']
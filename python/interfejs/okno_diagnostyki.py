@@ -0,0 +1,91 @@
+"""
+Ukryte okno diagnostyki (Ctrl+Shift+D w oknie głównym)
+Pokazuje czasy etapów, trafienia pamięci podręcznych i raporty (np. plan dopasowania)
+zebrane przez instrumentację
+"""
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QCheckBox, QHeaderView)
+from PyQt5.QtCore import QTimer
+
+from narzedzia import instrumentacja
+from styl.motyw_kolorow import ModernTheme, get_button_style
+
+class OknoDiagnostyki(QDialog):
+    """Dialog ze statystykami wydajności, odświeżany co sekundę"""
+
+    KOLUMNY_ETAPOW = ["Etap", "Liczba", "Średnio [ms]", "p50 [ms]", "p95 [ms]", "Max [ms]", "Suma [ms]"]
+    KOLUMNY_PAMIECI = ["Pamięć", "Trafienia", "Chybienia", "Współczynnik"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("🩺 Diagnostyka wydajności")
+        self.resize(700, 450)
+
+        layout = QVBoxLayout(self)
+
+        self.pomiary_checkbox = QCheckBox("Zbieraj pomiary")
+        self.pomiary_checkbox.setChecked(instrumentacja.wlaczona())
+        self.pomiary_checkbox.toggled.connect(instrumentacja.wlacz)
+        layout.addWidget(self.pomiary_checkbox)
+
+        layout.addWidget(QLabel("⏱️ Czasy etapów"))
+        self.tabela_etapow = self.utworz_tabele(self.KOLUMNY_ETAPOW)
+        layout.addWidget(self.tabela_etapow)
+
+        layout.addWidget(QLabel("📦 Pamięć podręczna"))
+        self.tabela_pamieci = self.utworz_tabele(self.KOLUMNY_PAMIECI)
+        layout.addWidget(self.tabela_pamieci)
+
+        self.raporty_label = QLabel()
+        self.raporty_label.setWordWrap(True)
+        layout.addWidget(self.raporty_label)
+
+        btn_layout = QHBoxLayout()
+        wyczysc_btn = QPushButton("🗑️ Wyczyść")
+        wyczysc_btn.clicked.connect(self.wyczysc)
+        wyczysc_btn.setStyleSheet(get_button_style(ModernTheme.WARNING))
+        zamknij_btn = QPushButton("Zamknij")
+        zamknij_btn.clicked.connect(self.accept)
+        zamknij_btn.setStyleSheet(get_button_style(ModernTheme.ACCENT))
+        btn_layout.addStretch()
+        btn_layout.addWidget(wyczysc_btn)
+        btn_layout.addWidget(zamknij_btn)
+        layout.addLayout(btn_layout)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.odswiez)
+        self.timer.start(1000)
+        self.odswiez()
+
+    @staticmethod
+    def utworz_tabele(kolumny):
+        tabela = QTableWidget(0, len(kolumny))
+        tabela.setHorizontalHeaderLabels(kolumny)
+        tabela.setEditTriggers(QTableWidget.NoEditTriggers)
+        tabela.verticalHeader().setVisible(False)
+        tabela.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        return tabela
+
+    @staticmethod
+    def wypelnij(tabela, wiersze):
+        tabela.setRowCount(len(wiersze))
+        for i, wiersz in enumerate(wiersze):
+            for j, wartosc in enumerate(wiersz):
+                tabela.setItem(i, j, QTableWidgetItem(wartosc))
+
+    def odswiez(self):
+        """Wczytuje aktualne statystyki do tabel"""
+        dane = instrumentacja.statystyki()
+        self.wypelnij(self.tabela_etapow, [
+            [etap, str(s['liczba'])] + [f"{s[k]:.2f}" for k in ('srednia_ms', 'p50_ms', 'p95_ms', 'max_ms', 'suma_ms')]
+            for etap, s in sorted(dane['etapy'].items())
+        ])
+        self.wypelnij(self.tabela_pamieci, [
+            [nazwa, str(s['trafienia']), str(s['chybienia']), f"{s['wspolczynnik']:.0%}"]
+            for nazwa, s in sorted(dane['pamiec'].items())
+        ])
+        self.raporty_label.setText("\n".join(f"🧭 {nazwa}: {opis}" for nazwa, opis in sorted(dane['raporty'].items())))
+
+    def wyczysc(self):
+        instrumentacja.wyczysc()
+        self.odswiez()
@@ -4,20 +4,30 @@ Zawiera interfejs użytkownika i logikę obsługi zdarzeń
 """
 import os
 import sys
-import csv
+import threading
 from datetime import datetime, timedelta
-from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QPushButton, QLineEdit, QRadioButton, 
                              QTextEdit, QGroupBox, QMessageBox, QCalendarWidget, QDialog, QFrame,
-                             QTableWidget, QTableWidgetItem, QComboBox)
-from PyQt5.QtCore import Qt, QRegExp
-from PyQt5.QtGui import QFont, QPixmap, QRegExpValidator
+                             QTableWidget, QTableWidgetItem, QComboBox, QCheckBox, QFileDialog, QShortcut, QInputDialog)
+from PyQt5.QtCore import Qt, QRegExp, pyqtSlot
+from PyQt5.QtGui import QFont, QPixmap, QRegExpValidator, QKeySequence
 
 # Import modułów
-from logika.dobieranie_nart import dobierz_narty
-from dane.wczytywanie_danych import sprawdz_czy_narta_zarezerwowana
+from logika.dobieranie_nart import dobierz_narty_strumien, klucz_sortowania, KATEGORIE
+from logika.wyniki_doboru import WynikiDoboru
+from dane.magazyn_danych import magazyn
+from dane.wczytywanie_danych import katalog_danych, wczytaj_surowa_baze_nart
+from dane.lista_grupy import wczytaj_liste_grupy, zapisz_przydzial_grupy
+from dane.analiza_wykorzystania import AnalizaWykorzystania, zapisz_raporty_csv
+from dane.archiwum_rezerwacji import ArchiwumRezerwacji
+from logika.dobieranie_grupowe import dobierz_narty_batch, bez_nart
 from styl.motyw_kolorow import ModernTheme, get_application_stylesheet, get_button_style, get_results_text_style
 from narzedzia.konfiguracja_logowania import get_logger
+from narzedzia.instrumentacja import pomiar, mierzony
+from narzedzia import profiler
+from interfejs.okno_diagnostyki import OknoDiagnostyki
+from interfejs.okno_walidacji import OknoWalidacji
 
 logger = get_logger(__name__)
 
@@ -57,13 +67,59 @@ class DatePickerDialog(QDialog):
 class SkiApp(QMainWindow):
     """Główne okno aplikacji"""
     
+    # Liczba nart pokazywanych na stronę w każdej kategorii
+    LIMIT_WYNIKOW = 10
+    
+    # Nagłówki kategorii wyników w kolejności wyświetlania
+    NAGLOWKI_KATEGORII = {
+        'idealne': "✅ IDEALNE DOPASOWANIA:",
+        'poziom_za_nisko': "🟡 POZIOM ZA NISKO:",
+        'alternatywy': "⚠️ ALTERNATYWY:",
+        'inna_plec': "👥 INNA PŁEĆ:",
+    }
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("🎿 Asystent Doboru Nart v6.0 - Modularna")
         self.setGeometry(100, 100, 1100, 650)  # Poszerzone okno
+        self.wyszukiwanie_trwa = False
         self.setup_ui()
         self.setup_styles()
+        
+        # Baza i rezerwacje wczytywane w tle; nowe eksporty FireSnow wykrywa obserwator plików
+        threading.Thread(target=magazyn.wczytaj_jesli_brak, daemon=True).start()
+        self.obserwator = magazyn.obserwuj()
+        
+        # Ukryte okno diagnostyki wydajności
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.pokaz_diagnostyke)
+        # Ukryty przełącznik profilowania
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, self.przelacz_profilowanie)
         logger.info("Aplikacja uruchomiona")
+    
+    def pokaz_diagnostyke(self):
+        """Pokazuje okno ze statystykami wydajności"""
+        OknoDiagnostyki(self).exec_()
+    
+    def przelacz_profilowanie(self):
+        """Włącza profilowanie kolejnych wyszukiwań lub kończy trwające i zapisuje pliki"""
+        if profiler.aktywne():
+            sciezki = profiler.zakoncz()
+            QMessageBox.information(self, "Profilowanie", "Zapisano profil:\n" + "\n".join(sciezki))
+            return
+        
+        liczba, ok = QInputDialog.getInt(self, "Profilowanie",
+                                         "Liczba wyszukiwań do profilowania (0 = cała sesja):", 5, 0, 1000)
+        if not ok:
+            return
+        if liczba == 0:
+            profiler.profiluj_sesje()
+        else:
+            profiler.profiluj_wyszukiwania(liczba)
+    
+    def closeEvent(self, event):
+        """Zatrzymuje obserwatora plików przy zamykaniu okna"""
+        self.obserwator.zatrzymaj()
+        super().closeEvent(event)
         
     def setup_ui(self):
         """Konfiguruje interfejs użytkownika"""
@@ -304,6 +360,11 @@ class SkiApp(QMainWindow):
         styl_container_layout.addLayout(styl_line2)
         przeznaczenie_layout.addWidget(styl_group_widget)
         
+        # Pokazuj tylko narty z wolną sztuką w wybranym terminie
+        self.tylko_dostepne_checkbox = QCheckBox("📦 Tylko dostępne w terminie")
+        self.tylko_dostepne_checkbox.setToolTip("Pomija narty, których wszystkie sztuki są zarezerwowane")
+        przeznaczenie_layout.addWidget(self.tylko_dostepne_checkbox)
+        
         # Przyciski 2x2 pod przeznaczeniem (wyrównane długością)
         button_layout = QVBoxLayout()
         button_layout.setSpacing(1)  # Jeszcze bardziej zmniejszony odstęp między rzędami przycisków
@@ -342,8 +403,28 @@ class SkiApp(QMainWindow):
         row2_buttons.addWidget(self.przegladaj_button)
         row2_buttons.addWidget(self.odswiez_rezerwacje_button)
         
+        # Trzeci rząd - dobieranie dla grupy z pliku CSV
+        row3_buttons = QHBoxLayout()
+        row3_buttons.setSpacing(8)
+        
+        self.grupa_button = QPushButton("👥 Grupa (CSV)")
+        self.grupa_button.setStyleSheet(get_button_style(ModernTheme.ACCENT_LIGHT))
+        self.grupa_button.setToolTip("Dobierz narty dla całej grupy z listy CSV (IMIE, WZROST, WAGA, POZIOM, PLEC, STYL)")
+        self.grupa_button.clicked.connect(self.dopasuj_grupe)
+        self.grupa_button.setMinimumWidth(120)
+        
+        self.wykorzystanie_button = QPushButton("📊 Wykorzystanie")
+        self.wykorzystanie_button.setStyleSheet(get_button_style(ModernTheme.ACCENT_LIGHT))
+        self.wykorzystanie_button.setToolTip("Zapisz raporty wykorzystania floty (modele, sztuki, obłożenie dzienne, popyt) do CSV")
+        self.wykorzystanie_button.clicked.connect(self.eksportuj_wykorzystanie)
+        self.wykorzystanie_button.setMinimumWidth(120)
+        
+        row3_buttons.addWidget(self.grupa_button)
+        row3_buttons.addWidget(self.wykorzystanie_button)
+        
         button_layout.addLayout(row1_buttons)
         button_layout.addLayout(row2_buttons)
+        button_layout.addLayout(row3_buttons)
         
         # Dodaj przeznaczenie i przyciski do prawej strony
         right_form_layout.addLayout(przeznaczenie_layout)
@@ -396,6 +477,13 @@ class SkiApp(QMainWindow):
         
         layout.addWidget(self.wyniki_text)
         
+        # Kolejna strona wyników bez ponownego dobierania
+        self.pokaz_wiecej_button = QPushButton("➕ Pokaż więcej")
+        self.pokaz_wiecej_button.setStyleSheet(get_button_style(ModernTheme.ACCENT))
+        self.pokaz_wiecej_button.clicked.connect(self.pokaz_wiecej_wynikow)
+        self.pokaz_wiecej_button.setVisible(False)
+        layout.addWidget(self.pokaz_wiecej_button)
+        
         return group
         
     def setup_styles(self):
@@ -532,8 +620,52 @@ class SkiApp(QMainWindow):
                 self.do_miesiac.setText(month)
                 self.do_rok.setText(year_suffix)
     
+    def odczytaj_daty_rezerwacji(self):
+        """Odczytuje i sprawdza daty rezerwacji z formularza - zwraca (data_od, data_do) lub None"""
+        od_dzien = self.od_dzien.text().strip()
+        od_miesiac = self.od_miesiac.text().strip()
+        od_rok = self.od_rok.text().strip()
+        
+        do_dzien = self.do_dzien.text().strip()
+        do_miesiac = self.do_miesiac.text().strip()
+        do_rok = self.do_rok.text().strip()
+        
+        if not all([od_dzien, od_miesiac, od_rok, do_dzien, do_miesiac, do_rok]):
+            QMessageBox.warning(self, "Uwaga", "Wypełnij wszystkie pola dat rezerwacji!")
+            return None
+            
+        try:
+            # Konwertuj na pełne daty
+            if len(od_rok) == 4:
+                od_full_year = od_rok
+            else:
+                od_full_year = f"20{od_rok}"
+                
+            if len(do_rok) == 4:
+                do_full_year = do_rok
+            else:
+                do_full_year = f"20{do_rok}"
+            
+            import pandas as pd
+            data_od = pd.to_datetime(f"{od_full_year}-{od_miesiac}-{od_dzien}").date()
+            data_do = pd.to_datetime(f"{do_full_year}-{do_miesiac}-{do_dzien}").date()
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Błąd Danych", f"Nieprawidłowa data: {e}")
+            return None
+            
+        if data_od > data_do:
+            QMessageBox.critical(self, "Błąd Danych", "Data rozpoczęcia musi być wcześniejsza niż data zakończenia!")
+            return None
+        
+        return data_od, data_do
+    
+    @pyqtSlot()
+    @profiler.profilowane
     def znajdz_i_wyswietl(self):
         """Główna funkcja wyszukiwania nart"""
+        if self.wyszukiwanie_trwa:
+            return
         logger.info("Rozpoczęto wyszukiwanie nart")
         
         # Walidacja danych
@@ -593,41 +725,10 @@ class SkiApp(QMainWindow):
         plec_klienta = plec_mapping[plec_text]
         
         # Pobierz daty rezerwacji
-        od_dzien = self.od_dzien.text().strip()
-        od_miesiac = self.od_miesiac.text().strip()
-        od_rok = self.od_rok.text().strip()
-        
-        do_dzien = self.do_dzien.text().strip()
-        do_miesiac = self.do_miesiac.text().strip()
-        do_rok = self.do_rok.text().strip()
-        
-        if not all([od_dzien, od_miesiac, od_rok, do_dzien, do_miesiac, do_rok]):
-            QMessageBox.warning(self, "Uwaga", "Wypełnij wszystkie pola dat rezerwacji!")
-            return
-            
-        try:
-            # Konwertuj na pełne daty
-            if len(od_rok) == 4:
-                od_full_year = od_rok
-            else:
-                od_full_year = f"20{od_rok}"
-                
-            if len(do_rok) == 4:
-                do_full_year = do_rok
-            else:
-                do_full_year = f"20{do_rok}"
-            
-            import pandas as pd
-            data_od = pd.to_datetime(f"{od_full_year}-{od_miesiac}-{od_dzien}").date()
-            data_do = pd.to_datetime(f"{do_full_year}-{do_miesiac}-{do_dzien}").date()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Błąd Danych", f"Nieprawidłowa data: {e}")
-            return
-            
-        if data_od > data_do:
-            QMessageBox.critical(self, "Błąd Danych", "Data rozpoczęcia musi być wcześniejsza niż data zakończenia!")
+        daty = self.odczytaj_daty_rezerwacji()
+        if daty is None:
             return
+        data_od, data_do = daty
         
         # Pobierz styl jazdy
         styl = "Wszystkie"
@@ -639,56 +740,95 @@ class SkiApp(QMainWindow):
         
         logger.info(f"Wywołuję dobierz_narty z parametrami: wzrost={wzrost_klienta}, waga={waga_klienta}, poziom={poziom_klienta}, plec={plec_klienta}, styl={styl}")
         
-        idealne, poziom_za_nisko, alternatywy, inna_plec = dobierz_narty(wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, styl)
+        # Baza i kalendarz dostępności z magazynu (wczytane wcześniej w tle)
+        narty, kalendarz = magazyn.dane()
         
-        # Wyczyść pole tekstowe
+        # Strumieniowe dobieranie - pierwsze idealne dopasowania pokazywane od razu,
+        # pełne posortowane wyniki po przejściu całej bazy
+        wyniki = WynikiDoboru(klucz_sortowania(True), self.LIMIT_WYNIKOW, KATEGORIE)
         self.wyniki_text.clear()
-        
-        if idealne is None:
-            logger.error("dobierz_narty zwróciło None - błąd w funkcji")
+        self.pokaz_wiecej_button.setVisible(False)
+        self.wyniki_text.append("⏳ Wyszukiwanie... pierwsze dopasowania:")
+        self.wyniki_text.append("=" * 50)
+        wstepnie_pokazane = 0
+        
+        # processEvents() w pętli obsługuje kliknięcia - blokada przycisków do końca strumienia,
+        # żeby kolejne wyszukiwanie, czyszczenie czy "Pokaż więcej" nie wpadły w jego środek
+        self.ustaw_wyszukiwanie_trwa(True)
+        try:
+            strumien = dobierz_narty_strumien(
+                wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, styl,
+                data_od=data_od, data_do=data_do, kalendarz=kalendarz,
+                tylko_dostepne=self.tylko_dostepne_checkbox.isChecked(), narty=narty
+            )
+            with pomiar('wyszukiwanie_strumieniowe'):
+                for kategoria, narta_info in strumien:
+                    wyniki.dodaj(kategoria, narta_info)
+                    if kategoria == 'idealne' and wstepnie_pokazane < self.LIMIT_WYNIKOW:
+                        self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do, kalendarz)
+                        wstepnie_pokazane += 1
+                        QApplication.processEvents()
+        except Exception as e:
+            self.wyniki_text.clear()
+            logger.error(f"Błąd podczas dobierania nart: {e}")
             QMessageBox.critical(self, "Błąd", "Wystąpił błąd podczas dobierania nart. Sprawdź logi.")
             return
+        finally:
+            self.ustaw_wyszukiwanie_trwa(False)
+        
+        # Zapamiętaj wyszukiwanie dla stronicowania ("Pokaż więcej")
+        self.ostatnie_wyszukiwanie = (wyniki, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do, kalendarz)
+        self.wyswietl_wyniki()
+    
+    @mierzony('wyswietlanie')
+    def wyswietl_wyniki(self):
+        """Wyświetla pokazane strony wyników ostatniego wyszukiwania"""
+        wyniki, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do, kalendarz = self.ostatnie_wyszukiwanie
+        
+        # Wyczyść pole tekstowe
+        self.wyniki_text.clear()
         
         # Sprawdź czy są jakieś wyniki
-        if not idealne and not poziom_za_nisko and not alternatywy and not inna_plec:
+        if not any(wyniki.liczba(kategoria) for kategoria in self.NAGLOWKI_KATEGORII):
+            self.pokaz_wiecej_button.setVisible(False)
             self.wyniki_text.append("❌ BRAK DOPASOWANYCH NART")
             self.wyniki_text.append("=" * 50)
             self.wyniki_text.append("Nie znaleziono nart spełniających kryteria wyszukiwania.")
             return
 
         # Wyświetl wyniki
-        if idealne:
-            self.wyniki_text.append("✅ IDEALNE DOPASOWANIA:")
+        for kategoria, naglowek in self.NAGLOWKI_KATEGORII.items():
+            if not wyniki.liczba(kategoria):
+                continue
+            self.wyniki_text.append(naglowek)
             self.wyniki_text.append("=" * 50)
-            for narta_info in idealne:
-                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do)
+            for narta_info in wyniki.pokazane(kategoria):
+                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do, kalendarz)
+            if wyniki.ukryte(kategoria):
+                self.wyniki_text.append(f"   … i jeszcze {wyniki.ukryte(kategoria)} (➕ Pokaż więcej)")
             self.wyniki_text.append("")
         
-        if poziom_za_nisko:
-            self.wyniki_text.append("🟡 POZIOM ZA NISKO:")
-            self.wyniki_text.append("=" * 50)
-            for narta_info in poziom_za_nisko:
-                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do)
-            self.wyniki_text.append("")
-        
-        if alternatywy:
-            self.wyniki_text.append("⚠️ ALTERNATYWY:")
-            self.wyniki_text.append("=" * 50)
-            for narta_info in alternatywy:
-                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do)
-            self.wyniki_text.append("")
-        
-        if inna_plec:
-            self.wyniki_text.append("👥 INNA PŁEĆ:")
-            self.wyniki_text.append("=" * 50)
-            for narta_info in inna_plec:
-                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do)
-            self.wyniki_text.append("")
+        self.pokaz_wiecej_button.setVisible(any(wyniki.ukryte(kategoria) for kategoria in self.NAGLOWKI_KATEGORII))
         
         # Przewiń do początku wyników
         self.wyniki_text.moveCursor(self.wyniki_text.textCursor().Start)
     
-    def wyswietl_jedna_narte(self, narta_info, w, s, p, plec_klienta, data_od=None, data_do=None):
+    def ustaw_wyszukiwanie_trwa(self, trwa):
+        """Blokuje wyszukiwanie, czyszczenie i stronicowanie na czas strumienia wyników"""
+        self.wyszukiwanie_trwa = trwa
+        for przycisk in (self.znajdz_button, self.wyczysc_button, self.pokaz_wiecej_button):
+            przycisk.setEnabled(not trwa)
+    
+    def pokaz_wiecej_wynikow(self):
+        """Pokazuje kolejną stronę w każdej kategorii (bez ponownego dobierania)"""
+        if self.wyszukiwanie_trwa or not getattr(self, 'ostatnie_wyszukiwanie', None):
+            return
+        wyniki = self.ostatnie_wyszukiwanie[0]
+        for kategoria in self.NAGLOWKI_KATEGORII:
+            wyniki.pokaz_wiecej(kategoria)
+        self.wyswietl_wyniki()
+    
+    def wyswietl_jedna_narte(self, narta_info, w, s, p, plec_klienta, data_od=None, data_do=None, kalendarz=None):
         """Wyświetla informacje o jednej narcie"""
         narta = narta_info['dane']
         dopasowanie = narta_info['dopasowanie']
@@ -709,32 +849,33 @@ class SkiApp(QMainWindow):
         # Nazwa narty i długość z współczynnikiem
         self.wyniki_text.append(f"► {narta['MARKA']} {narta['MODEL']} ({narta['DLUGOSC']} cm) {wspolczynnik_emoji} {wspolczynnik}%")
         
-        # Sprawdź rezerwacje
-        ilosc_sztuk = int(narta.get('ILOSC', '1') or '1')
+        # Sprawdź rezerwacje w kalendarzu dostępności
+        if kalendarz is None:
+            kalendarz = magazyn.dane()[1]
+        ilosc_sztuk = narta.get('ILOSC', 1)
         dostepnosc_text = "   📦 Dostępność: "
         
-        for i in range(ilosc_sztuk):
-            jest_zarezerwowana, okres_rezerwacji, numer_narty = sprawdz_czy_narta_zarezerwowana(
-                narta['MARKA'], narta['MODEL'], narta['DLUGOSC'], data_od, data_do
-            )
-            
-            if jest_zarezerwowana and numer_narty:
-                if f"//{i+1:02d}" in numer_narty or f"//{i+1}" in numer_narty:
-                    dostepnosc_text += f"🔴{i+1} "
-                else:
-                    dostepnosc_text += f"🟩{i+1} "
-            elif jest_zarezerwowana and not numer_narty:
-                dostepnosc_text += f"🔴{i+1} "
-            else:
-                dostepnosc_text += f"🟩{i+1} "
+        if 'wolne_sztuki' in narta_info:
+            wolne = set(narta_info['wolne_sztuki'])
+            rezerwacje = kalendarz.rezerwacje_w_okresie(narta['MARKA'], narta['MODEL'], narta['DLUGOSC'], data_od, data_do)
+        elif data_od and data_do:
+            wolne = set(kalendarz.wolne_sztuki(narta['MARKA'], narta['MODEL'], narta['DLUGOSC'], ilosc_sztuk, data_od, data_do))
+            rezerwacje = kalendarz.rezerwacje_w_okresie(narta['MARKA'], narta['MODEL'], narta['DLUGOSC'], data_od, data_do)
+        else:
+            wolne = set(range(1, ilosc_sztuk + 1))
+            rezerwacje = []
+        
+        for i in range(1, ilosc_sztuk + 1):
+            dostepnosc_text += f"🟩{i} " if i in wolne else f"🔴{i} "
         
         self.wyniki_text.append(dostepnosc_text)
         
         # Informacje o rezerwacjach
-        if jest_zarezerwowana and okres_rezerwacji:
-            rezerwacja_text = f"   🚫 Zarezerwowana: {okres_rezerwacji}"
-            if numer_narty:
-                rezerwacja_text += f" (Nr: {numer_narty})"
+        if rezerwacje:
+            numer, od_rez, do_rez = rezerwacje[0]
+            rezerwacja_text = f"   🚫 Zarezerwowana: {od_rez} - {do_rez}"
+            if numer:
+                rezerwacja_text += f" (Nr: //{numer:02d})"
             self.wyniki_text.append(rezerwacja_text)
         
         # Dopasowanie
@@ -789,8 +930,57 @@ class SkiApp(QMainWindow):
         
         self.wyniki_text.append("   " + "─" * 80)
     
+    def dopasuj_grupe(self):
+        """Dobiera narty dla całej grupy z listy CSV i zapisuje przydział do pliku"""
+        daty = self.odczytaj_daty_rezerwacji()
+        if daty is None:
+            return
+        
+        sciezka, _ = QFileDialog.getOpenFileName(self, "Wybierz listę grupy", "", "Pliki CSV (*.csv)")
+        if not sciezka:
+            return
+        
+        try:
+            profile = wczytaj_liste_grupy(sciezka)
+            narty, kalendarz = magazyn.dane()
+            przydzial = dobierz_narty_batch(profile, daty, narty=narty, kalendarz=kalendarz)
+        except Exception as e:
+            logger.error(f"Błąd podczas dobierania nart dla grupy: {e}")
+            QMessageBox.critical(self, "Błąd", f"Nie można dobrać nart dla grupy: {e}")
+            return
+        
+        self.wyniki_text.clear()
+        self.pokaz_wiecej_button.setVisible(False)
+        self.wyniki_text.append(f"👥 PRZYDZIAŁ NART DLA GRUPY ({len(przydzial)} osób)")
+        self.wyniki_text.append("=" * 50)
+        for i, pozycja in enumerate(przydzial, 1):
+            profil = pozycja['profil']
+            opis = f"{i}. {profil['imie'] or 'Bez imienia'} ({profil['wzrost']} cm, {profil['waga']} kg, P{profil['poziom']})"
+            narta_info = pozycja['narta_info']
+            if narta_info:
+                narta = narta_info['dane']
+                self.wyniki_text.append(f"{opis} → 🎿 {narta['MARKA']} {narta['MODEL']} ({narta['DLUGOSC']} cm) "
+                                        f"//{pozycja['numer_sztuki']:02d} - {narta_info['wspolczynnik_idealnosci']}%")
+            else:
+                self.wyniki_text.append(f"{opis} → ❌ Brak wolnej narty")
+        
+        niedopasowani = bez_nart(przydzial)
+        if niedopasowani:
+            self.wyniki_text.append("")
+            self.wyniki_text.append(f"⚠️ Bez nart: {len(niedopasowani)} osób - {', '.join(p['imie'] or '?' for p in niedopasowani)}")
+        
+        sciezka_zapisu, _ = QFileDialog.getSaveFileName(self, "Zapisz przydział nart", "przydzial_grupy.csv", "Pliki CSV (*.csv)")
+        if sciezka_zapisu:
+            try:
+                zapisz_przydzial_grupy(przydzial, sciezka_zapisu)
+            except Exception as e:
+                logger.error(f"Błąd podczas zapisu przydziału: {e}")
+                QMessageBox.critical(self, "Błąd", f"Nie można zapisać przydziału: {e}")
+    
     def wyczysc_formularz(self):
         """Czyści formularz"""
+        if self.wyszukiwanie_trwa:
+            return
         self.wzrost_entry.clear()
         self.waga_entry.clear()
         self.poziom_entry.clear()
@@ -810,6 +1000,8 @@ class SkiApp(QMainWindow):
         self.do_rok.setText(future.strftime("%y"))
         
         self.wyniki_text.clear()
+        self.ostatnie_wyszukiwanie = None
+        self.pokaz_wiecej_button.setVisible(False)
         logger.info("Formularz wyczyszczony")
     
     def odswiez_rezerwacje(self):
@@ -819,12 +1011,14 @@ class SkiApp(QMainWindow):
         try:
             self.wyniki_text.clear()
             
-            current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            rez_file = os.path.join(current_dir, 'pliki_danych', 'rez.csv')
+            # Wymuś przeładowanie kalendarza dostępności (niezależnie od obserwatora plików)
+            magazyn.przeladuj(narty=False)
+            
+            rez_file = os.path.join(katalog_danych(), 'rez.csv')
             
             if not os.path.exists(rez_file):
                 self.wyniki_text.append("❌ BŁĄD: Plik rez.csv nie istnieje!")
-                self.wyniki_text.append(f"Szukam w: {current_dir}")
+                self.wyniki_text.append(f"Szukam w: {katalog_danych()}")
                 return
             
             self.wyniki_text.append("🔄 REZERWACJE Z FIRESNOW")
@@ -857,6 +1051,11 @@ class SkiApp(QMainWindow):
             self.wyniki_text.append(f"📊 Znaleziono {len(df_narty)} rezerwacji nart")
             self.wyniki_text.append("")
             
+            self.wyniki_text.append("📈 WYKORZYSTANIE FLOTY")
+            for linia in self.analiza_wykorzystania().podsumowanie():
+                self.wyniki_text.append(linia)
+            self.wyniki_text.append("")
+            
             for i, (_, rez) in enumerate(df_narty.iterrows(), 1):
                 sprzet = rez.get('Sprzęt', '')
                 if 'NARTY' in sprzet:
@@ -908,6 +1107,36 @@ class SkiApp(QMainWindow):
             self.wyniki_text.append("")
             self.wyniki_text.append("Sprawdź czy plik rez.csv istnieje i ma poprawny format.")
     
+    def analiza_wykorzystania(self):
+        """Analiza wykorzystania nart z archiwum rezerwacji (cała historia) i bazy z magazynu
+
+        Bez archiwum (np. nie dało się go zapisać) - z kalendarza bieżącego eksportu.
+        """
+        narty, kalendarz = magazyn.dane()
+        archiwum = ArchiwumRezerwacji()
+        try:
+            if archiwum.istnieje():
+                return AnalizaWykorzystania.z_archiwum(archiwum, narty)
+        except Exception as e:
+            logger.error(f"Błąd analizy archiwum rezerwacji: {e}")
+        finally:
+            archiwum.zamknij()
+        return AnalizaWykorzystania.z_kalendarza(kalendarz, narty)
+    
+    def eksportuj_wykorzystanie(self):
+        """Zapisuje raporty wykorzystania floty do plików CSV w wybranym katalogu"""
+        katalog = QFileDialog.getExistingDirectory(self, "Katalog raportów wykorzystania", katalog_danych())
+        if not katalog:
+            return
+        
+        try:
+            sciezki = zapisz_raporty_csv(self.analiza_wykorzystania(), katalog)
+        except Exception as e:
+            logger.error(f"Błąd podczas zapisu raportów wykorzystania: {e}")
+            QMessageBox.critical(self, "Błąd", f"Nie można zapisać raportów: {e}")
+            return
+        QMessageBox.information(self, "Wykorzystanie", "Zapisano raporty:\n" + "\n".join(sciezki))
+    
     def pokaz_wszystkie_narty(self):
         """Pokazuje okno przeglądania wszystkich nart z tabelą"""
         logger.info("Otwieranie okna przeglądania nart")
@@ -937,6 +1166,14 @@ class SkiApp(QMainWindow):
         header_layout.addStretch()
         header_layout.addWidget(self.count_label)
         
+        # Raport walidacji bazy (wiersze odrzucone i naprawione przy wczytaniu)
+        walidacja = magazyn.wczytaj_jesli_brak().walidacja
+        walidacja_button = QPushButton(f"⚠️ Odrzucone wiersze: {len(walidacja.odrzucone)}")
+        walidacja_button.setToolTip(f"Walidacja bazy: {walidacja.podsumowanie()}")
+        walidacja_button.clicked.connect(self.pokaz_walidacje)
+        walidacja_button.setStyleSheet(get_button_style(ModernTheme.WARNING if walidacja.odrzucone else ModernTheme.SUCCESS))
+        header_layout.addWidget(walidacja_button)
+        
         main_layout.addLayout(header_layout)
         
         # Panel filtrów
@@ -1009,34 +1246,33 @@ class SkiApp(QMainWindow):
         # Pokaż okno
         self.narty_window.show()
     
+    def pokaz_walidacje(self):
+        """Pokazuje raport walidacji bazy nart z bieżącej migawki"""
+        OknoWalidacji(magazyn.wczytaj_jesli_brak().walidacja, self.narty_window).exec_()
+    
     def load_data(self):
         """Ładuje dane z CSV do tabeli"""
         try:
-            # Sprawdź w katalogu programu
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            csv_file = os.path.join(current_dir, '..', 'pliki_danych', 'NOWABAZA_final.csv')
+            # Surowe wiersze bazy (przegląd pokazuje też wiersze odrzucone przy walidacji)
+            _, self.all_data = wczytaj_surowa_baze_nart()
+            
+            # Wypełnij comboboxy filtrów
+            marki = sorted(set(item.get('MARKA', '') for item in self.all_data if item.get('MARKA')))
+            poziomy = sorted(set(item.get('POZIOM', '') for item in self.all_data if item.get('POZIOM')))
+            plcie = sorted(set(item.get('PLEC', '') for item in self.all_data if item.get('PLEC')))
+            
+            self.marka_combo.addItems(['Wszystkie'] + marki)
+            self.poziom_combo.addItems(['Wszystkie'] + poziomy)
+            self.plec_combo.addItems(['Wszystkie'] + plcie)
+            
+            # Ustaw domyślne wartości
+            self.marka_combo.setCurrentText('Wszystkie')
+            self.poziom_combo.setCurrentText('Wszystkie')
+            self.plec_combo.setCurrentText('Wszystkie')
+            
+            self.apply_filters()
+            logger.info(f"Załadowano {len(self.all_data)} nart")
             
-            with open(csv_file, 'r', newline='', encoding='utf-8-sig') as file:
-                reader = csv.DictReader(file)
-                self.all_data = list(reader)
-                
-                # Wypełnij comboboxy filtrów
-                marki = sorted(set(item.get('MARKA', '') for item in self.all_data if item.get('MARKA')))
-                poziomy = sorted(set(item.get('POZIOM', '') for item in self.all_data if item.get('POZIOM')))
-                plcie = sorted(set(item.get('PLEC', '') for item in self.all_data if item.get('PLEC')))
-                
-                self.marka_combo.addItems(['Wszystkie'] + marki)
-                self.poziom_combo.addItems(['Wszystkie'] + poziomy)
-                self.plec_combo.addItems(['Wszystkie'] + plcie)
-                
-                # Ustaw domyślne wartości
-                self.marka_combo.setCurrentText('Wszystkie')
-                self.poziom_combo.setCurrentText('Wszystkie')
-                self.plec_combo.setCurrentText('Wszystkie')
-                
-                self.apply_filters()
-                logger.info(f"Załadowano {len(self.all_data)} nart")
-                
         except Exception as e:
             logger.error(f"Błąd podczas ładowania danych: {e}")
             QMessageBox.critical(self.narty_window, "Błąd", f"Nie można załadować danych: {e}")
@@ -1074,6 +1310,7 @@ class SkiApp(QMainWindow):
         self.plec_combo.setCurrentText('Wszystkie')
         self.apply_filters()
     
+    @mierzony('tabela_przegladu')
     def update_table(self):
         """Aktualizuje tabelę z przefiltrowanymi danymi"""
         if not hasattr(self, 'filtered_data'):
@@ -0,0 +1,47 @@
+"""
+Okno raportu walidacji bazy nart (z okna przeglądania nart)
+Pokazuje wiersze bazy odrzucone przy wczytaniu oraz naprawione automatycznie
+"""
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView)
+
+from styl.motyw_kolorow import ModernTheme, get_button_style
+
+class OknoWalidacji(QDialog):
+    """Dialog z raportem WynikWalidacji"""
+
+    KOLUMNY = ["Wiersz", "ID", "Narta", "Powód"]
+
+    def __init__(self, walidacja, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("⚠️ Walidacja bazy nart")
+        self.resize(900, 500)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"Baza nart: {walidacja.podsumowanie()}"))
+
+        layout.addWidget(QLabel(f"❌ Odrzucone wiersze (pominięte przy dobieraniu): {len(walidacja.odrzucone)}"))
+        layout.addWidget(self.utworz_tabele(walidacja.odrzucone))
+
+        layout.addWidget(QLabel(f"🔧 Naprawione wiersze: {len(walidacja.naprawione)}"))
+        layout.addWidget(self.utworz_tabele(walidacja.naprawione))
+
+        btn_layout = QHBoxLayout()
+        zamknij_btn = QPushButton("Zamknij")
+        zamknij_btn.clicked.connect(self.accept)
+        zamknij_btn.setStyleSheet(get_button_style(ModernTheme.ACCENT))
+        btn_layout.addStretch()
+        btn_layout.addWidget(zamknij_btn)
+        layout.addLayout(btn_layout)
+
+    def utworz_tabele(self, problemy):
+        tabela = QTableWidget(len(problemy), len(self.KOLUMNY))
+        tabela.setHorizontalHeaderLabels(self.KOLUMNY)
+        tabela.setEditTriggers(QTableWidget.NoEditTriggers)
+        tabela.verticalHeader().setVisible(False)
+        tabela.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        tabela.horizontalHeader().setStretchLastSection(True)
+        for i, problem in enumerate(problemy):
+            for j, wartosc in enumerate((problem.numer, problem.id, problem.narta, problem.powod)):
+                tabela.setItem(i, j, QTableWidgetItem(str(wartosc)))
+        return tabela
@@ -3,8 +3,15 @@ logika - moduł projektu Asystent Doboru Nart
 Zawiera logikę biznesową aplikacji
 """
 
-from logika.dobieranie_nart import dobierz_narty
+from logika.dobieranie_nart import dobierz_narty, dobierz_narty_wyniki, dobierz_narty_strumien
+from logika.wyniki_doboru import WynikiDoboru
+from logika.dobieranie_grupowe import dobierz_narty_batch
+from logika.przydzial_optymalny import przydziel_optymalnie
 from logika.ocena_dopasowania import compatibility_scorer
 from logika.parsowanie_poziomow import parsuj_poziom
+from logika.profil_oceny import ProfilOceny, aktywny_profil, przeladuj_profil, wersja_profilu
+from logika.indeks_klientow import IndeksKlientow, indeks_klientow, rozklad_z_profili
+from logika.tablica_odpowiedzi import TablicaOdpowiedzi
+from logika.dobieranie_rownolegle import RownolegleDobieranie
 
-__all__ = ['dobierz_narty', 'compatibility_scorer', 'parsuj_poziom']
+__all__ = ['dobierz_narty', 'dobierz_narty_wyniki', 'dobierz_narty_strumien', 'WynikiDoboru', 'dobierz_narty_batch', 'przydziel_optymalnie', 'compatibility_scorer', 'parsuj_poziom', 'ProfilOceny', 'aktywny_profil', 'przeladuj_profil', 'wersja_profilu', 'IndeksKlientow', 'indeks_klientow', 'rozklad_z_profili', 'TablicaOdpowiedzi', 'RownolegleDobieranie']
@@ -0,0 +1,125 @@
+"""
+Moduł grupowego dobierania nart (szkoły, obozy)
+Wczytuje bazę i rezerwacje raz dla całej grupy, wstępnie filtruje bazę
+wektorowo (NumPy) i przydziela fizyczne sztuki tak, by się nie powtarzały
+"""
+import logging
+import numpy as np
+
+from logika.dobieranie_nart import iteruj_dopasowania, KATEGORIE
+from logika.profil_oceny import aktywny_profil
+from logika.przydzial_optymalny import przydziel_optymalnie
+
+logger = logging.getLogger(__name__)
+
+class PrefiltrKatalogu:
+    """Wektorowy filtr wstępny bazy nart po wadze i wzroście
+
+    Odrzuca narty, dla których waga lub wzrost klienta wypada poza tolerancję
+    (czerwone kryterium). Narty to wiersze po walidacji bazy (zakresy jako int).
+    """
+
+    def __init__(self, narty):
+        self.narty = narty
+        kolumny = ['WAGA_MIN', 'WAGA_MAX', 'WZROST_MIN', 'WZROST_MAX']
+        tablica = np.array([[row[k] for k in kolumny] for row in narty], dtype=float).reshape(-1, 4)
+        self.waga_min, self.waga_max, self.wzrost_min, self.wzrost_max = tablica.T
+
+    def maska(self, wzrost, waga):
+        """Maska nart, które mogą pasować do klienta (tolerancje z aktywnego profilu oceny)"""
+        ocena = aktywny_profil()
+        tol_wagi, tol_wzrostu = ocena.tolerancja_wagi, ocena.tolerancja_wzrostu
+        return ((waga >= self.waga_min - tol_wagi) & (waga <= self.waga_max + tol_wagi) &
+                (wzrost >= self.wzrost_min - tol_wzrostu) & (wzrost <= self.wzrost_max + tol_wzrostu))
+
+    def kandydaci(self, wzrost, waga):
+        """Zwraca narty, które przeszły filtr wstępny (w kolejności z bazy)"""
+        return [self.narty[i] for i in np.flatnonzero(self.maska(wzrost, waga))]
+
+def kandydaci_profilu(profil, prefiltr, data_od, data_do, kalendarz):
+    """Zwraca dostępne dopasowania dla profilu: od najlepszej kategorii i współczynnika"""
+    wolne_wymagane = kalendarz is not None
+    dopasowania = iteruj_dopasowania(
+        prefiltr.kandydaci(profil['wzrost'], profil['waga']),
+        profil['wzrost'], profil['waga'], profil['poziom'], profil['plec'], profil.get('styl'),
+        data_od, data_do, kalendarz, tylko_dostepne=wolne_wymagane
+    )
+
+    kandydaci = []
+    for kategoria, narta_info in dopasowania:
+        if 'wolne_sztuki' not in narta_info:
+            ilosc_sztuk = narta_info['dane'].get('ILOSC', 1)
+            narta_info['wolne_sztuki'] = list(range(1, ilosc_sztuk + 1))
+        kandydaci.append((kategoria, narta_info))
+
+    kandydaci.sort(key=lambda k: (KATEGORIE.index(k[0]), -k[1]['wspolczynnik_idealnosci']))
+    return kandydaci
+
+def klucz_sztuki(narta_info, numer):
+    """Identyfikator fizycznej sztuki narty"""
+    narta = narta_info['dane']
+    return (narta.get('MARKA', ''), narta.get('MODEL', ''), str(narta.get('DLUGOSC', '')), numer)
+
+def przydziel_zachlannie(kandydaci):
+    """Przydział zachłanny - osoby z najmniejszym wyborem sztuk dostają najlepszą wolną nartę"""
+    def liczba_sztuk(i):
+        return sum(len(narta_info['wolne_sztuki']) for _, narta_info in kandydaci[i])
+
+    przydzial = [None] * len(kandydaci)
+    zajete = set()
+    for i in sorted(range(len(kandydaci)), key=liczba_sztuk):
+        for kategoria, narta_info in kandydaci[i]:
+            numer = next((n for n in narta_info['wolne_sztuki'] if klucz_sztuki(narta_info, n) not in zajete), None)
+            if numer is not None:
+                zajete.add(klucz_sztuki(narta_info, numer))
+                przydzial[i] = (kategoria, narta_info, numer)
+                break
+    return przydzial
+
+def dobierz_narty_batch(profiles, date_range=None, narty=None, kalendarz=None, optymalnie=True):
+    """Dobiera narty dla całej grupy - baza i rezerwacje wczytywane są tylko raz
+
+    profiles: lista profili (słowniki: imie, wzrost, waga, poziom, plec, styl)
+    date_range: krotka (data_od, data_do) lub None (bez sprawdzania dostępności)
+    optymalnie: przydział maksymalizujący sumę współczynników (przepływ o minimalnym koszcie);
+    False - przydział zachłanny
+
+    Każda osoba dostaje inną fizyczną sztukę. Zwraca listę w kolejności profiles: słowniki
+    profil, kategoria, narta_info, numer_sztuki (kategoria i narta_info równe None, gdy dla
+    osoby zabrakło nart - patrz bez_nart).
+    """
+    # Import tutaj aby uniknąć cyklicznych importów
+    from dane.wczytywanie_danych import wczytaj_narty
+    from dane.kalendarz_dostepnosci import zbuduj_kalendarz_dostepnosci
+
+    data_od, data_do = date_range if date_range else (None, None)
+    if narty is None:
+        narty = wczytaj_narty()
+    if data_od and data_do and kalendarz is None:
+        kalendarz = zbuduj_kalendarz_dostepnosci()
+    if not (data_od and data_do):
+        kalendarz = None
+
+    logger.info(f"Dobieranie grupowe: {len(profiles)} osób, termin {data_od} - {data_do}")
+    prefiltr = PrefiltrKatalogu(narty)
+    kandydaci = [kandydaci_profilu(profil, prefiltr, data_od, data_do, kalendarz) for profil in profiles]
+
+    if optymalnie:
+        wybrane = przydziel_optymalnie(kandydaci, klucz_sztuki)
+    else:
+        wybrane = przydziel_zachlannie(kandydaci)
+
+    przydzial = []
+    for profil, wybor in zip(profiles, wybrane):
+        kategoria, narta_info, numer = wybor or (None, None, None)
+        przydzial.append({'profil': profil, 'kategoria': kategoria, 'narta_info': narta_info, 'numer_sztuki': numer})
+
+    niedopasowani = bez_nart(przydzial)
+    logger.info(f"Dobieranie grupowe zakończone: {len(profiles) - len(niedopasowani)} przydzielonych, {len(niedopasowani)} bez nart")
+    if niedopasowani:
+        logger.info(f"Bez nart: {', '.join(p['imie'] or '?' for p in niedopasowani)}")
+    return przydzial
+
+def bez_nart(przydzial):
+    """Zwraca profile osób, dla których zabrakło nart"""
+    return [pozycja['profil'] for pozycja in przydzial if pozycja['narta_info'] is None]
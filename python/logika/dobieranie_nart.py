@@ -3,244 +3,337 @@ Moduł głównej logiki dobierania nart
 Zawiera funkcje wyszukiwania i kategoryzacji nart
 """
 import logging
+from functools import lru_cache
 from logika.ocena_dopasowania import compatibility_scorer
 from logika.parsowanie_poziomow import parsuj_poziom
+from logika.wyniki_doboru import WynikiDoboru
+from logika.planista_dopasowania import PlanistaDopasowania
+from logika.profil_oceny import aktywny_profil
+from narzedzia import instrumentacja
+from narzedzia.instrumentacja import pomiar
 
 logger = logging.getLogger(__name__)
 
-def sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy):
-    """Sprawdza dopasowanie pojedynczej narty do kryteriów klienta"""
-    try:
-        if not all(key in row and row[key] for key in ['POZIOM', 'WAGA_MIN', 'WAGA_MAX', 'WZROST_MIN', 'WZROST_MAX', 'DLUGOSC', 'PLEC']):
-            return None
+# Poziom narty zależy tylko od tekstu w bazie i płci klienta - kilka(naście) różnych wartości
+poziom_narty = lru_cache(maxsize=1024)(parsuj_poziom)
 
-        waga_min = int(float(row['WAGA_MIN']))
-        waga_max = int(float(row['WAGA_MAX']))
-        min_wzrost_narciarza = int(float(row['WZROST_MIN']))
-        max_wzrost_narciarza = int(float(row['WZROST_MAX']))
-        narta_plec = row.get('PLEC', 'U').strip() or 'U'
+# Tolerancje dopasowania pochodzą z profilu oceny odczytanego raz na wyszukiwanie (logika.profil_oceny)
 
-        # Parsuj poziom w zależności od formatu
-        poziom_text = row.get('POZIOM', '').strip()
-        poziom_min, poziom_display = parsuj_poziom(poziom_text, plec)
-        if poziom_min is None:
-            return None
+def odrzuca_poziom(row, wzrost, waga, poziom, plec, profil):
+    """Narta odpada, gdy poziomu nie da się odczytać, narta jest za trudna albo słabsza o więcej niż tolerancja"""
+    poziom_min = poziom_narty(row['POZIOM'], plec)[0]
+    return poziom_min is None or not poziom_min <= poziom <= poziom_min + profil.tolerancja_poziomu
 
-        # Sprawdź czy poziom nie jest o 2+ za niski - wyklucz całkowicie
-        POZIOM_TOLERANCJA_W_DOL = 2
-        if poziom < poziom_min - POZIOM_TOLERANCJA_W_DOL:
-            return None
+def odrzuca_wage(row, wzrost, waga, poziom, plec, profil):
+    """Narta odpada, gdy waga klienta jest poza zakresem narty o więcej niż tolerancja"""
+    tolerancja = profil.tolerancja_wagi
+    return not row['WAGA_MIN'] - tolerancja <= waga <= row['WAGA_MAX'] + tolerancja
 
-        dopasowanie = {}
-        zielone_punkty = 0
-        poziom_niżej_kandydat = False
+def odrzuca_wzrost(row, wzrost, waga, poziom, plec, profil):
+    """Narta odpada, gdy wzrost klienta jest poza zakresem narty o więcej niż tolerancja"""
+    tolerancja = profil.tolerancja_wzrostu
+    return not row['WZROST_MIN'] - tolerancja <= wzrost <= row['WZROST_MAX'] + tolerancja
 
-        # Sprawdź poziom
-        if poziom == poziom_min:
-            dopasowanie['poziom'] = ('green', 'OK', poziom_display)
-            zielone_punkty += 1
-        elif poziom == poziom_min + 1:
-            dopasowanie['poziom'] = ('orange', f'Narta słabsza o jeden poziom', poziom_display)
-            poziom_niżej_kandydat = True
-        elif poziom > poziom_min + 1:
-            return None  # Wyklucz całkowicie
-        else:
+# Kolejność warunków odrzucających ustala planista ze statystyk wyszukiwań
+planista = PlanistaDopasowania({'poziom': odrzuca_poziom, 'waga': odrzuca_wage, 'wzrost': odrzuca_wzrost})
+instrumentacja.dodaj_raport('plan_dopasowania', planista.opis)
+
+def sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy, plan=None, profil=None):
+    """Sprawdza dopasowanie pojedynczej narty do kryteriów klienta
+
+    row to wiersz po walidacji bazy (dane.walidacja_bazy) - zakresy wagi i wzrostu jako int.
+    Najpierw sprawdzane są warunki odrzucające w kolejności planu (planista.plan() na
+    wyszukiwanie); szczegóły dopasowania budowane są tylko dla nart, które je przeszły.
+    profil to profil oceny odczytany raz na wyszukiwanie (domyślnie aktywny).
+    """
+    profil = profil or aktywny_profil()
+    for odrzuca in plan or planista.plan_biezacy:
+        if odrzuca(row, wzrost, waga, poziom, plec, profil):
             return None
 
-        # Sprawdź płeć
-        if plec == "Wszyscy":
-            dopasowanie['plec'] = ('green', 'OK', narta_plec)
-            zielone_punkty += 1
-        elif plec == "Kobieta":
-            if narta_plec in ["K", "D", "U"]:
-                dopasowanie['plec'] = ('green', 'OK', narta_plec)
-                zielone_punkty += 1
-            elif narta_plec == "M":
-                dopasowanie['plec'] = ('orange', 'Narta męska', narta_plec)
-            else:
-                dopasowanie['plec'] = ('orange', 'Nieznana płeć', narta_plec)
-        elif plec == "Mężczyzna":
-            if narta_plec in ["M", "U"]:
-                dopasowanie['plec'] = ('green', 'OK', narta_plec)
-                zielone_punkty += 1
-            elif narta_plec in ["K", "D"]:
-                dopasowanie['plec'] = ('orange', 'Narta kobieca', narta_plec)
-            else:
-                dopasowanie['plec'] = ('orange', 'Nieznana płeć', narta_plec)
+    waga_min = row['WAGA_MIN']
+    waga_max = row['WAGA_MAX']
+    min_wzrost_narciarza = row['WZROST_MIN']
+    max_wzrost_narciarza = row['WZROST_MAX']
+    narta_plec = row['PLEC']
+    poziom_min, poziom_display = poziom_narty(row['POZIOM'], plec)
+
+    dopasowanie = {}
+    zielone_punkty = 0
+    poziom_niżej_kandydat = False
 
-        # Sprawdź wagę
-        WAGA_TOLERANCJA = 5
-        if waga_min <= waga <= waga_max:
-            dopasowanie['waga'] = ('green', 'OK', waga_min, waga_max)
+    # Sprawdź poziom (klient na poziomie narty lub wyżej w granicy tolerancji)
+    if poziom == poziom_min:
+        dopasowanie['poziom'] = ('green', 'OK', poziom_display)
+        zielone_punkty += 1
+    elif poziom == poziom_min + 1:
+        dopasowanie['poziom'] = ('orange', f'Narta słabsza o jeden poziom', poziom_display)
+        poziom_niżej_kandydat = True
+    else:
+        dopasowanie['poziom'] = ('orange', f'Narta słabsza o {poziom - poziom_min} poziomy', poziom_display)
+        poziom_niżej_kandydat = True
+
+    # Sprawdź płeć
+    if plec == "Wszyscy":
+        dopasowanie['plec'] = ('green', 'OK', narta_plec)
+        zielone_punkty += 1
+    elif plec == "Kobieta":
+        if narta_plec in ["K", "D", "U"]:
+            dopasowanie['plec'] = ('green', 'OK', narta_plec)
             zielone_punkty += 1
-        elif waga > waga_max and waga <= waga_max + WAGA_TOLERANCJA:
-            dopasowanie['waga'] = ('orange', f'O {waga - waga_max} kg za duża (miększa)', waga_min, waga_max)
-        elif waga < waga_min and waga >= waga_min - WAGA_TOLERANCJA:
-            dopasowanie['waga'] = ('orange', f'O {waga_min - waga} kg za mała (sztywniejsza)', waga_min, waga_max)
+        elif narta_plec == "M":
+            dopasowanie['plec'] = ('orange', 'Narta męska', narta_plec)
         else:
-            dopasowanie['waga'] = ('red', 'Niedopasowana', waga_min, waga_max)
-
-        # Sprawdź wzrost
-        WZROST_TOLERANCJA = 5
-        if min_wzrost_narciarza <= wzrost <= max_wzrost_narciarza:
-            dopasowanie['wzrost'] = ('green', 'OK', min_wzrost_narciarza, max_wzrost_narciarza)
+            dopasowanie['plec'] = ('orange', 'Nieznana płeć', narta_plec)
+    elif plec == "Mężczyzna":
+        if narta_plec in ["M", "U"]:
+            dopasowanie['plec'] = ('green', 'OK', narta_plec)
             zielone_punkty += 1
-        elif wzrost > max_wzrost_narciarza and wzrost <= max_wzrost_narciarza + WZROST_TOLERANCJA:
-            dopasowanie['wzrost'] = ('orange', f'O {wzrost - max_wzrost_narciarza} cm za duży (zwrotniejsza)', min_wzrost_narciarza, max_wzrost_narciarza)
-        elif wzrost < min_wzrost_narciarza and wzrost >= min_wzrost_narciarza - WZROST_TOLERANCJA:
-            dopasowanie['wzrost'] = ('orange', f'O {min_wzrost_narciarza - wzrost} cm za mały (stabilniejsza)', min_wzrost_narciarza, max_wzrost_narciarza)
+        elif narta_plec in ["K", "D"]:
+            dopasowanie['plec'] = ('orange', 'Narta kobieca', narta_plec)
         else:
-            dopasowanie['wzrost'] = ('red', 'Niedopasowany', min_wzrost_narciarza, max_wzrost_narciarza)
-
-        # Sprawdź przeznaczenie
-        if styl_jazdy and styl_jazdy != "Wszystkie":
-            przeznaczenie = row.get('PRZEZNACZENIE', '')
-            if przeznaczenie:
-                przeznaczenia = [p.strip() for p in przeznaczenie.replace(',', ',').split(',')]
-                if styl_jazdy in przeznaczenia:
-                    dopasowanie['przeznaczenie'] = ('green', 'OK', przeznaczenie)
-                    zielone_punkty += 1
-                else:
-                    dopasowanie['przeznaczenie'] = ('orange', f'Inne przeznaczenie ({przeznaczenie})', przeznaczenie)
+            dopasowanie['plec'] = ('orange', 'Nieznana płeć', narta_plec)
+
+    # Sprawdź wagę
+    if waga_min <= waga <= waga_max:
+        dopasowanie['waga'] = ('green', 'OK', waga_min, waga_max)
+        zielone_punkty += 1
+    elif waga > waga_max:
+        dopasowanie['waga'] = ('orange', f'O {waga - waga_max} kg za duża (miększa)', waga_min, waga_max)
+    else:
+        dopasowanie['waga'] = ('orange', f'O {waga_min - waga} kg za mała (sztywniejsza)', waga_min, waga_max)
+
+    # Sprawdź wzrost
+    if min_wzrost_narciarza <= wzrost <= max_wzrost_narciarza:
+        dopasowanie['wzrost'] = ('green', 'OK', min_wzrost_narciarza, max_wzrost_narciarza)
+        zielone_punkty += 1
+    elif wzrost > max_wzrost_narciarza:
+        dopasowanie['wzrost'] = ('orange', f'O {wzrost - max_wzrost_narciarza} cm za duży (zwrotniejsza)', min_wzrost_narciarza, max_wzrost_narciarza)
+    else:
+        dopasowanie['wzrost'] = ('orange', f'O {min_wzrost_narciarza - wzrost} cm za mały (stabilniejsza)', min_wzrost_narciarza, max_wzrost_narciarza)
+
+    # Sprawdź przeznaczenie
+    if styl_jazdy and styl_jazdy != "Wszystkie":
+        przeznaczenie = row.get('PRZEZNACZENIE', '')
+        if przeznaczenie:
+            przeznaczenia = [p.strip() for p in przeznaczenie.replace(',', ',').split(',')]
+            if styl_jazdy in przeznaczenia:
+                dopasowanie['przeznaczenie'] = ('green', 'OK', przeznaczenie)
+                zielone_punkty += 1
             else:
-                dopasowanie['przeznaczenie'] = ('orange', 'Brak przeznaczenia', '')
+                dopasowanie['przeznaczenie'] = ('orange', f'Inne przeznaczenie ({przeznaczenie})', przeznaczenie)
         else:
-            dopasowanie['przeznaczenie'] = ('green', 'OK', row.get('PRZEZNACZENIE', ''))
+            dopasowanie['przeznaczenie'] = ('orange', 'Brak przeznaczenia', '')
+    else:
+        dopasowanie['przeznaczenie'] = ('green', 'OK', row.get('PRZEZNACZENIE', ''))
 
-        # Wyklucz narty z czerwonymi kryteriami
-        if any(v[0] == 'red' for v in dopasowanie.values()):
-            return None
+    # Oblicz współczynnik idealności - status wagi i wzrostu wynika z położenia względem zakresu,
+    # więc wynik to odczyt z wektora zakresu narty (ustalanego raz na nartę)
+    wspolczynnik, detale_oceny = compatibility_scorer.oblicz_wspolczynnik_idealnosci(
+        dopasowanie, wzrost, waga, poziom, plec, styl_jazdy, profil,
+        compatibility_scorer.wektor_zakresu('waga', waga, waga_min, waga_max, profil),
+        compatibility_scorer.wektor_zakresu('wzrost', wzrost, min_wzrost_narciarza, max_wzrost_narciarza, profil)
+    )
+
+    return {
+        'dane': row,
+        'dopasowanie': dopasowanie,
+        'wspolczynnik_idealnosci': wspolczynnik,
+        'detale_oceny': detale_oceny,
+        'zielone_punkty': zielone_punkty,
+        'poziom_niżej_kandydat': poziom_niżej_kandydat
+    }
+
+# Kategorie wyników w kolejności wyświetlania
+KATEGORIE = ('idealne', 'poziom_za_nisko', 'alternatywy', 'inna_plec')
 
-        # Oblicz współczynnik idealności
-        wspolczynnik, detale_oceny = compatibility_scorer.oblicz_wspolczynnik_idealnosci(
-            dopasowanie, wzrost, waga, poziom, plec, styl_jazdy
-        )
-
-        return {
-            'dane': row,
-            'dopasowanie': dopasowanie,
-            'wspolczynnik_idealnosci': wspolczynnik,
-            'detale_oceny': detale_oceny,
-            'zielone_punkty': zielone_punkty,
-            'poziom_niżej_kandydat': poziom_niżej_kandydat
-        }
-
-    except (ValueError, TypeError) as e:
-        logger.warning(f"Pominięto wiersz z powodu błędu danych: {row} - {e}")
+def maksymalne_punkty(styl_jazdy):
+    """Zwraca maksymalną liczbę zielonych punktów dla danego stylu jazdy"""
+    return 5 if (styl_jazdy and styl_jazdy != "Wszystkie") else 4
+
+def kategoria_narty(narta_info, max_punkty):
+    """Przypisuje dopasowaną nartę do jednej z kategorii wyników (lub None)"""
+    if not narta_info:
         return None
 
+    # Sprawdź czy to problem z płcią - takie narty trafiają tylko do "INNA PŁEĆ"
+    plec_status = narta_info['dopasowanie'].get('plec')
+    inna_plec = bool(plec_status and plec_status[1] not in ['OK'] and
+                     ('Narta męska' in plec_status[1] or 'Narta kobieca' in plec_status[1]))
+    punkty = narta_info['zielone_punkty']
+
+    if narta_info['poziom_niżej_kandydat']:
+        if not inna_plec and punkty == max_punkty - 1:
+            return 'poziom_za_nisko'
+        return None
+    if inna_plec:
+        # Płeć nie liczy się do punktów - reszta kryteriów musi być OK
+        return 'inna_plec' if punkty == max_punkty - 1 else None
+    if punkty == max_punkty:
+        return 'idealne'
+    return 'alternatywy'
+
+def znajdz_w_kategorii(kategoria, narty, wzrost, waga, poziom, plec, styl_jazdy):
+    """Zwraca narty należące do wskazanej kategorii wyników"""
+    max_punkty = maksymalne_punkty(styl_jazdy)
+    plan, profil = planista.plan(), aktywny_profil()
+    wynik = []
+    for row in narty:
+        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy, plan, profil)
+        if kategoria_narty(narta_info, max_punkty) == kategoria:
+            wynik.append(narta_info)
+    return wynik
+
 def znajdz_idealne_dopasowania(narty, wzrost, waga, poziom, plec, styl_jazdy):
     """Znajduje narty z idealnym dopasowaniem (wszystkie kryteria spełnione)"""
-    idealne = []
-    max_punkty = 5 if (styl_jazdy and styl_jazdy != "Wszystkie") else 4
-    
-    for row in narty:
-        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy)
-        if narta_info and narta_info['zielone_punkty'] == max_punkty:
-            # Sprawdź czy to nie problem z płcią
-            plec_status = narta_info['dopasowanie'].get('plec')
-            if plec_status and plec_status[1] not in ['OK']:
-                if 'Narta męska' in plec_status[1] or 'Narta kobieca' in plec_status[1]:
-                    continue  # Pomiń - to będzie w "INNA PŁEĆ"
-            idealne.append(narta_info)
-    
-    return idealne
+    return znajdz_w_kategorii('idealne', narty, wzrost, waga, poziom, plec, styl_jazdy)
 
 def znajdz_poziom_za_nisko(narty, wzrost, waga, poziom, plec, styl_jazdy):
     """Znajduje narty z poziomem za niskim (wszystkie inne kryteria OK)"""
-    poziom_za_nisko = []
-    max_punkty = 5 if (styl_jazdy and styl_jazdy != "Wszystkie") else 4
-    
-    for row in narty:
-        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy)
-        if narta_info and narta_info['poziom_niżej_kandydat']:
-            # Sprawdź czy reszta kryteriów jest OK
-            pozostałe_punkty = narta_info['zielone_punkty']
-            max_pozostałe_punkty = max_punkty - 1
-            
-            if pozostałe_punkty == max_pozostałe_punkty:
-                # Sprawdź czy to nie problem z płcią - jeśli tak, pomiń (będzie w "INNA PŁEĆ")
-                plec_status = narta_info['dopasowanie'].get('plec')
-                if plec_status and plec_status[1] not in ['OK']:
-                    if 'Narta męska' in plec_status[1] or 'Narta kobieca' in plec_status[1]:
-                        continue  # Pomiń - to będzie w "INNA PŁEĆ"
-                poziom_za_nisko.append(narta_info)
-    
-    return poziom_za_nisko
+    return znajdz_w_kategorii('poziom_za_nisko', narty, wzrost, waga, poziom, plec, styl_jazdy)
 
 def znajdz_alternatywy(narty, wzrost, waga, poziom, plec, styl_jazdy):
     """Znajduje narty alternatywne (poziom OK, ale inne kryteria nie idealne)"""
-    alternatywy = []
-    max_punkty = 5 if (styl_jazdy and styl_jazdy != "Wszystkie") else 4
-    
-    for row in narty:
-        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy)
-        if narta_info and not narta_info['poziom_niżej_kandydat'] and narta_info['zielone_punkty'] < max_punkty:
-            # Sprawdź czy to nie problem z płcią - jeśli tak, pomiń (będzie w "INNA PŁEĆ")
-            plec_status = narta_info['dopasowanie'].get('plec')
-            if plec_status and plec_status[1] not in ['OK']:
-                if 'Narta męska' in plec_status[1] or 'Narta kobieca' in plec_status[1]:
-                    continue  # Pomiń - to będzie w "INNA PŁEĆ"
-            alternatywy.append(narta_info)
-    
-    return alternatywy
+    return znajdz_w_kategorii('alternatywy', narty, wzrost, waga, poziom, plec, styl_jazdy)
 
 def znajdz_inna_plec(narty, wzrost, waga, poziom, plec, styl_jazdy):
     """Znajduje narty z niepasującą płcią (wszystkie inne kryteria OK)"""
-    inna_plec = []
-    max_punkty = 5 if (styl_jazdy and styl_jazdy != "Wszystkie") else 4
-    
+    return znajdz_w_kategorii('inna_plec', narty, wzrost, waga, poziom, plec, styl_jazdy)
+
+def wolne_sztuki_narty(row, kalendarz, data_od, data_do):
+    """Zwraca numery sztuk narty wolnych w całym okresie"""
+    ilosc_sztuk = row.get('ILOSC', 1)
+    return kalendarz.wolne_sztuki(row.get('MARKA', ''), row.get('MODEL', ''), row.get('DLUGOSC', ''),
+                                  ilosc_sztuk, data_od, data_do)
+
+def klucz_sortowania(sprawdzaj_dostepnosc=False, sortuj_po_dostepnosci=True):
+    """Zwraca klucz sortowania wyników (od najlepszej narty)"""
+    def sort_key(narta_info):
+        wspolczynnik = narta_info.get('wspolczynnik_idealnosci', 0)
+        return -wspolczynnik  # Od najwyższego do najniższego
+
+    def sort_key_dostepnosc(narta_info):
+        return (0 if narta_info['wolne_sztuki'] else 1, sort_key(narta_info))
+
+    return sort_key_dostepnosc if (sprawdzaj_dostepnosc and sortuj_po_dostepnosci) else sort_key
+
+def iteruj_dopasowania(narty, wzrost, waga, poziom, plec, styl_jazdy=None, data_od=None, data_do=None,
+                       kalendarz=None, tylko_dostepne=False):
+    """Generator (kategoria, narta_info) - jedno przejście przez bazę w kolejności wierszy
+
+    Gdy podano okres (data_od, data_do), do każdej narty dołączana jest lista wolnych sztuk
+    ('wolne_sztuki') z kalendarza dostępności, a tylko_dostepne pomija zajęte narty przed oceną.
+    """
+    # Migawka rezerwacji - budowana tylko gdy podano okres
+    sprawdzaj_dostepnosc = bool(data_od and data_do)
+    if sprawdzaj_dostepnosc and kalendarz is None:
+        from dane.kalendarz_dostepnosci import zbuduj_kalendarz_dostepnosci
+        kalendarz = zbuduj_kalendarz_dostepnosci()
+
+    max_punkty = maksymalne_punkty(styl_jazdy)
+    plan, profil = planista.plan(), aktywny_profil()
     for row in narty:
-        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy)
-        if narta_info and not narta_info['poziom_niżej_kandydat']:
-            # Sprawdź czy to problem z płcią
-            plec_status = narta_info['dopasowanie'].get('plec')
-            if plec_status and plec_status[1] not in ['OK']:
-                if 'Narta męska' in plec_status[1] or 'Narta kobieca' in plec_status[1]:
-                    # Sprawdź czy reszta kryteriów jest OK (poziom OK, waga OK, wzrost OK, przeznaczenie OK)
-                    pozostałe_punkty = narta_info['zielone_punkty']
-                    max_pozostałe_punkty = max_punkty - 1  # Płeć nie liczy się do punktów
-                    
-                    if pozostałe_punkty == max_pozostałe_punkty:
-                        inna_plec.append(narta_info)
-    
-    return inna_plec
-
-def dobierz_narty(wzrost, waga, poziom, plec, styl_jazdy=None):
-    """Główna funkcja dobierania nart - teraz z osobnymi wyszukiwaniami dla każdej kategorii"""
-    logger.info(f"Szukanie nart: wzrost={wzrost}, waga={waga}, poziom={poziom}, plec={plec}, styl={styl_jazdy}")
-    
-    try:
+        wolne = None
+        if sprawdzaj_dostepnosc:
+            wolne = wolne_sztuki_narty(row, kalendarz, data_od, data_do)
+            if tylko_dostepne and not wolne:
+                continue
+
+        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy, plan, profil)
+        kategoria = kategoria_narty(narta_info, max_punkty)
+        if kategoria is None:
+            continue
+        if wolne is not None:
+            narta_info['wolne_sztuki'] = wolne
+        yield kategoria, narta_info
+
+def dobierz_narty_strumien(wzrost, waga, poziom, plec, styl_jazdy=None, data_od=None, data_do=None,
+                           kalendarz=None, tylko_dostepne=False, narty=None):
+    """Strumieniowe dobieranie nart - zwraca (kategoria, narta_info) zaraz po ocenie narty
+
+    Pozwala wyświetlić pierwsze dopasowania przed przejściem całej bazy. Zebranie
+    strumienia do WynikiDoboru daje ten sam wynik co dobierz_narty_wyniki.
+    """
+    if narty is None:
         # Import tutaj aby uniknąć cyklicznych importów
         from dane.wczytywanie_danych import wczytaj_narty
-        
-        # Wczytaj wszystkie narty
-        wszystkie_narty = wczytaj_narty()
-        if not wszystkie_narty:
+        narty = wczytaj_narty()
+    logger.info(f"Szukanie nart: wzrost={wzrost}, waga={waga}, poziom={poziom}, plec={plec}, styl={styl_jazdy}")
+    yield from iteruj_dopasowania(narty, wzrost, waga, poziom, plec, styl_jazdy, data_od, data_do,
+                                  kalendarz, tylko_dostepne)
+
+def dopasowania_bazy(narty, wzrost, waga, poziom, plec, styl_jazdy=None, data_od=None, data_do=None,
+                     kalendarz=None, tylko_dostepne=False):
+    """(kategoria, narta_info) z całej bazy w kolejności wierszy - duże bazy bez okresu
+    dobierane w procesach roboczych (logika.dobieranie_rownolegle), pozostałe strumieniowo"""
+    from logika.dobieranie_rownolegle import pula_dla
+    pula = None if (data_od and data_do) else pula_dla(narty)
+    if pula is None:
+        return dobierz_narty_strumien(wzrost, waga, poziom, plec, styl_jazdy, data_od, data_do,
+                                      kalendarz, tylko_dostepne, narty)
+    logger.info(f"Szukanie nart: wzrost={wzrost}, waga={waga}, poziom={poziom}, plec={plec}, styl={styl_jazdy}")
+    return pula.dopasowania(wzrost, waga, poziom, plec, styl_jazdy)
+
+def dobierz_narty_wyniki(wzrost, waga, poziom, plec, styl_jazdy=None, data_od=None, data_do=None,
+                         kalendarz=None, tylko_dostepne=False, sortuj_po_dostepnosci=True, limit=None,
+                         narty=None):
+    """Dobiera narty i zwraca obiekt WynikiDoboru (None w razie błędu)
+
+    Parametry dostępności jak w iteruj_dopasowania. sortuj_po_dostepnosci stawia dostępne
+    narty przed zajętymi, a limit ogranicza pokazane wyniki do K najlepszych w każdej kategorii.
+    narty pozwala podać już wczytaną bazę. Wyszukiwania bez okresu w trybie tablicy odpowiedzi
+    czytają pierwszą stronę z tablicy, a w bazach od PROG_ROWNOLEGLOSCI wierszy liczone są
+    w procesach roboczych (ten sam wynik).
+    """
+    try:
+        if narty is None:
+            # Import tutaj aby uniknąć cyklicznych importów
+            from dane.wczytywanie_danych import wczytaj_narty
+            narty = wczytaj_narty()
+        if not narty:
             logger.error("Nie znaleziono nart w bazie danych")
-            return None, None, None, None
+            return None
 
-        # Znajdź narty w każdej kategorii osobno
-        idealne = znajdz_idealne_dopasowania(wszystkie_narty, wzrost, waga, poziom, plec, styl_jazdy)
-        poziom_za_nisko = znajdz_poziom_za_nisko(wszystkie_narty, wzrost, waga, poziom, plec, styl_jazdy)
-        alternatywy = znajdz_alternatywy(wszystkie_narty, wzrost, waga, poziom, plec, styl_jazdy)
-        inna_plec = znajdz_inna_plec(wszystkie_narty, wzrost, waga, poziom, plec, styl_jazdy)
+        sprawdzaj_dostepnosc = bool(data_od and data_do)
+        klucz = klucz_sortowania(sprawdzaj_dostepnosc, sortuj_po_dostepnosci)
+        with pomiar('dopasowanie'):
+            wyniki = None
+            if not sprawdzaj_dostepnosc:
+                # Tryb --tablica-odpowiedzi: pełne dobieranie dopiero dla strony spoza tablicy
+                from logika import tablica_odpowiedzi
 
-        # Sortuj wyniki
-        def sort_key(narta_info):
-            wspolczynnik = narta_info.get('wspolczynnik_idealnosci', 0)
-            return -wspolczynnik  # Od najwyższego do najniższego
+                def uzupelnij():
+                    kandydaci = {kategoria: [] for kategoria in KATEGORIE}
+                    for kategoria, narta_info in dopasowania_bazy(narty, wzrost, waga, poziom, plec, styl_jazdy):
+                        kandydaci[kategoria].append(narta_info)
+                    return kandydaci
 
-        idealne.sort(key=sort_key)
-        poziom_za_nisko.sort(key=sort_key)
-        alternatywy.sort(key=sort_key)
-        inna_plec.sort(key=sort_key)
+                wyniki = tablica_odpowiedzi.wyniki(narty, wzrost, waga, poziom, plec, styl_jazdy, klucz, limit,
+                                                   uzupelnij)
+            if wyniki is None:
+                wyniki = WynikiDoboru(klucz, limit, KATEGORIE)
+                for kategoria, narta_info in dopasowania_bazy(narty, wzrost, waga, poziom, plec, styl_jazdy,
+                                                              data_od, data_do, kalendarz, tylko_dostepne):
+                    wyniki.dodaj(kategoria, narta_info)
 
-        logger.info(f"Znaleziono: {len(idealne)} idealnych, {len(poziom_za_nisko)} poziom za nisko, {len(alternatywy)} alternatyw, {len(inna_plec)} inna płeć")
-        return idealne, poziom_za_nisko, alternatywy, inna_plec
+        logger.info(f"Znaleziono: {wyniki.liczba('idealne')} idealnych, {wyniki.liczba('poziom_za_nisko')} poziom za nisko, {wyniki.liczba('alternatywy')} alternatyw, {wyniki.liczba('inna_plec')} inna płeć")
+        return wyniki
 
     except Exception as e:
-        logger.error(f"Wystąpił nieoczekiwany błąd: {e}")
-        from PyQt5.QtWidgets import QMessageBox
-        QMessageBox.critical(None, "Błąd Krytyczny", f"Wystąpił nieoczekiwany błąd: {e}")
+        # Bez okien dialogowych - warstwa logiki nie zależy od Qt, błąd obsługuje wywołujący
+        logger.exception(f"Wystąpił nieoczekiwany błąd: {e}")
+        return None
+
+def dobierz_narty(wzrost, waga, poziom, plec, styl_jazdy=None, data_od=None, data_do=None,
+                  kalendarz=None, tylko_dostepne=False, sortuj_po_dostepnosci=True, limit=None,
+                  narty=None):
+    """Główna funkcja dobierania nart - zwraca cztery posortowane listy kategorii
+
+    Parametry jak w dobierz_narty_wyniki; przy podanym limit każda lista zawiera
+    tylko K najlepszych nart (kolejne strony daje WynikiDoboru.pokaz_wiecej).
+    """
+    wyniki = dobierz_narty_wyniki(wzrost, waga, poziom, plec, styl_jazdy, data_od, data_do,
+                                  kalendarz, tylko_dostepne, sortuj_po_dostepnosci, limit, narty)
+    if wyniki is None:
         return None, None, None, None
+    return wyniki.jako_krotka()
@@ -0,0 +1,163 @@
+"""
+Moduł równoległego dobierania nart dla dużych (połączonych) baz
+Baza dzielona jest na fragmenty przekazywane procesom jednorazowo przez pamięć
+współdzieloną; każde wyszukiwanie wysyła tylko profil klienta i profil oceny,
+a procesy zwracają dopasowane narty (bez danych wiersza) z każdej kategorii.
+Używane przez dobierz_narty_wyniki dla wyszukiwań bez okresu (pula_dla).
+"""
+import os
+import atexit
+import pickle
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+from logika.dobieranie_nart import sprawdz_dopasowanie_narty, kategoria_narty, maksymalne_punkty, planista, KATEGORIE
+from logika.profil_oceny import aktywny_profil, ustaw_profil
+
+logger = logging.getLogger(__name__)
+
+# Poniżej tej liczby wierszy koszt procesów przewyższa zysk - dobieranie w procesie.
+# Zmierzone na bazach 20k/50k/100k: dopasowanie w procesie ~3 µs na wiersz, narzut dwóch
+# procesów (wysłanie zapytania, zebranie i scalenie wyników) ~0,9 µs na wiersz - przy dwóch
+# procesorach wyszukiwanie jest krótsze o ~9 ms przy 20 tys. i ~35 ms przy 50 tys. wierszy
+PROG_ROWNOLEGLOSCI = 20000
+
+# Fragment bazy wczytany w procesie roboczym: (indeks pierwszego wiersza, wiersze)
+_fragment = None
+# Wersja profilu oceny procesu głównego ostatnio ustawiona w procesie roboczym
+_wersja_glowna = None
+
+def _wczytaj_fragment(nazwa_pamieci, rozmiar, poczatek):
+    """Inicjalizator procesu roboczego - jednorazowo odczytuje swój fragment z pamięci współdzielonej"""
+    global _fragment
+    pamiec = SharedMemory(name=nazwa_pamieci)
+    try:
+        _fragment = (poczatek, pickle.loads(bytes(pamiec.buf[:rozmiar])))
+    finally:
+        pamiec.close()
+
+def _dobierz_we_fragmencie(wzrost, waga, poziom, plec, styl_jazdy, kolejnosc, profil):
+    """Dobiera narty we fragmencie procesu - zwraca (indeks, narta_info bez 'dane') na kategorię w kolejności wierszy
+
+    kolejnosc to nazwy warunków w planie procesu głównego, profil - profil oceny procesu
+    głównego; proces roboczy podmienia swój profil tylko przy zmianie wersji.
+    """
+    global _wersja_glowna
+    if profil.wersja != _wersja_glowna:
+        ustaw_profil(profil)
+        _wersja_glowna = profil.wersja
+    profil = aktywny_profil()
+
+    poczatek, narty = _fragment
+    plan = tuple(planista.warunki[nazwa] for nazwa in kolejnosc)
+    max_punkty = maksymalne_punkty(styl_jazdy)
+    kandydaci = {kategoria: [] for kategoria in KATEGORIE}
+    for indeks, row in enumerate(narty, poczatek):
+        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy, plan, profil)
+        kategoria = kategoria_narty(narta_info, max_punkty)
+        if kategoria is not None:
+            # Wiersz zna proces główny - nie wraca przez potok
+            del narta_info['dane']
+            kandydaci[kategoria].append((indeks, narta_info))
+    return kandydaci
+
+class RownolegleDobieranie:
+    """Równoległe dobieranie nart - jeden proces roboczy na fragment bazy
+
+    Dostępność (kalendarz) nie jest sprawdzana w procesach - tylko dopasowanie i ocena.
+    Dla małych baz (poniżej prog wierszy) lub jednego procesora rownolegle jest False.
+    """
+
+    def __init__(self, narty, liczba_procesow=None, prog=PROG_ROWNOLEGLOSCI):
+        self.narty = narty
+        self.liczba_procesow = max(1, liczba_procesow or os.cpu_count() or 1)
+        self.rownolegle = len(narty) >= prog and self.liczba_procesow > 1
+        self._pamiec = []
+        self._procesy = []
+
+        if self.rownolegle:
+            kontekst = get_context('spawn')
+            rozmiar_fragmentu = -(-len(narty) // self.liczba_procesow)
+            for poczatek in range(0, len(narty), rozmiar_fragmentu):
+                dane = pickle.dumps(narty[poczatek:poczatek + rozmiar_fragmentu], protocol=pickle.HIGHEST_PROTOCOL)
+                pamiec = SharedMemory(create=True, size=len(dane))
+                pamiec.buf[:len(dane)] = dane
+                self._pamiec.append(pamiec)
+                self._procesy.append(ProcessPoolExecutor(
+                    max_workers=1, mp_context=kontekst,
+                    initializer=_wczytaj_fragment, initargs=(pamiec.name, len(dane), poczatek)
+                ))
+            logger.info(f"Dobieranie równoległe: {len(narty)} nart w {len(self._procesy)} fragmentach")
+        else:
+            logger.info(f"Dobieranie w procesie: {len(narty)} nart (próg {prog})")
+
+    def dopasowania(self, wzrost, waga, poziom, plec, styl_jazdy=None, profil=None):
+        """Zwraca (kategoria, narta_info) w kolejności wierszy - jak iteruj_dopasowania bez okresu
+
+        Wymaga rownolegle; profil to profil oceny odczytany raz na wyszukiwanie (domyślnie aktywny).
+        """
+        profil = profil or aktywny_profil()
+        planista.plan()  # Licznik wyszukiwań planisty - pomiary warunków zbiera dobieranie w procesie
+        zadania = [proces.submit(_dobierz_we_fragmencie, wzrost, waga, poziom, plec, styl_jazdy,
+                                 planista.kolejnosc, profil)
+                   for proces in self._procesy]
+
+        # Fragmenty są ciągłe - kolejne fragmenty i ich listy zachowują kolejność wierszy
+        kandydaci = []
+        for zadanie in zadania:
+            czesc = zadanie.result()
+            kandydaci.extend((indeks, kategoria, narta_info)
+                             for kategoria, lista in czesc.items() for indeks, narta_info in lista)
+        kandydaci.sort(key=lambda pozycja: pozycja[0])
+        wynik = []
+        for indeks, kategoria, narta_info in kandydaci:
+            narta_info['dane'] = self.narty[indeks]
+            wynik.append((kategoria, narta_info))
+        return wynik
+
+    def zamknij(self):
+        """Zatrzymuje procesy robocze i zwalnia pamięć współdzieloną"""
+        for proces in self._procesy:
+            proces.shutdown()
+        for pamiec in self._pamiec:
+            pamiec.close()
+            pamiec.unlink()
+        self._procesy = []
+        self._pamiec = []
+        self.rownolegle = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.zamknij()
+
+_blokada = threading.Lock()
+_pula = None
+
+def pula_dla(narty):
+    """Zwraca pulę procesów dla bazy narty albo None, gdy dobieranie ma zostać w procesie
+
+    Pula jest jedna na migawkę bazy - przy nowej liście narty poprzednia jest zamykana.
+    """
+    global _pula
+    if len(narty) < PROG_ROWNOLEGLOSCI or (os.cpu_count() or 1) < 2:
+        return None
+    with _blokada:
+        if _pula is None or _pula.narty is not narty:
+            if _pula is not None:
+                _pula.zamknij()
+            _pula = RownolegleDobieranie(narty, prog=PROG_ROWNOLEGLOSCI)
+        return _pula if _pula.rownolegle else None
+
+@atexit.register
+def zamknij_pule():
+    """Zamyka pulę procesów (przy zakończeniu programu)"""
+    global _pula
+    with _blokada:
+        if _pula is not None:
+            _pula.zamknij()
+            _pula = None
@@ -0,0 +1,222 @@
+"""
+Moduł odwrotnego indeksu klientów
+Dla każdej komórki siatki klientów (wzrost co 1 cm, waga co 1 kg, poziom 1-6, płeć
+klienta) liczy, ile nart trafia do każdej kategorii wyników przy wyszukiwaniu bez
+stylu jazdy. Obszar narty w siatce to prostokąt wagi i wzrostu (z tolerancją lub bez)
+dla każdego poziomu i płci, więc liczniki buduje się tablicami różnicowymi NumPy
+(dwie sumy narastające) zamiast dobierania dla każdego punktu siatki.
+
+Odpowiada w milisekundach na pytania: które narty pasują do klienta, jaką część
+klientów obsługuje narta i dla jakich profili nie ma żadnej idealnej narty.
+"""
+import logging
+import numpy as np
+
+from logika.dobieranie_nart import poziom_narty, KATEGORIE
+from logika.ocena_dopasowania import DOMENY
+from logika.profil_oceny import aktywny_profil
+from narzedzia.instrumentacja import mierzony, trafienie
+
+logger = logging.getLogger(__name__)
+
+# Osie siatki klientów
+PLCI_KLIENTA = ('Mężczyzna', 'Kobieta', 'Wszyscy')
+POZIOMY = tuple(range(1, 7))
+WZROST_MIN, WZROST_MAX = DOMENY['wzrost']
+WAGA_MIN, WAGA_MAX = DOMENY['waga']
+
+# Płcie nart zielone dla płci klienta (pozostałe to "inna płeć")
+ZIELONE_PLCI = {'Mężczyzna': ('M', 'U'), 'Kobieta': ('K', 'D', 'U'), 'Wszyscy': ('M', 'K', 'D', 'U')}
+# Płcie nart trafiające do "INNA PŁEĆ" (nieznana płeć narty nie jest inną płcią)
+INNE_PLCI = {'Mężczyzna': ('K', 'D'), 'Kobieta': ('M',), 'Wszyscy': ()}
+
+def _dodaj_prostokaty(roznice, prostokaty, znak=1):
+    """Dodaje prostokąty do tablicy różnicowej (rozmiar siatki + 1 w każdej osi)"""
+    _, w0, w1, k0, k1 = prostokaty
+    np.add.at(roznice, (w0, k0), znak)
+    np.add.at(roznice, (w0, k1 + 1), -znak)
+    np.add.at(roznice, (w1 + 1, k0), -znak)
+    np.add.at(roznice, (w1 + 1, k1 + 1), znak)
+
+class IndeksKlientow:
+    """Liczniki nart w kategoriach dla każdej komórki siatki (płeć, poziom, wzrost, waga)
+
+    Zgodny z dobierz_narty dla stylu "Wszystkie" i aktywnego profilu oceny z chwili budowy.
+    """
+
+    def __init__(self, narty, profil=None):
+        self.narty = narty
+        self.profil = profil or aktywny_profil()
+        n = len(narty)
+        self.waga_min = np.fromiter((row['WAGA_MIN'] for row in narty), dtype=np.int64, count=n)
+        self.waga_max = np.fromiter((row['WAGA_MAX'] for row in narty), dtype=np.int64, count=n)
+        self.wzrost_min = np.fromiter((row['WZROST_MIN'] for row in narty), dtype=np.int64, count=n)
+        self.wzrost_max = np.fromiter((row['WZROST_MAX'] for row in narty), dtype=np.int64, count=n)
+        # Poziom narty dla każdej płci klienta (-100 gdy nieczytelny - nigdy nie pasuje)
+        self.poziom_min = np.array([[poziom_narty(row['POZIOM'], plec)[0] or -100 for row in narty]
+                                    for plec in PLCI_KLIENTA], dtype=np.int64).reshape(len(PLCI_KLIENTA), n)
+        plci_nart = np.array([row['PLEC'] for row in narty], dtype=object)
+        # Dla "Wszyscy" każda płeć narty jest zielona (także nieznana)
+        self.zielona_plec = np.array([np.isin(plci_nart, ZIELONE_PLCI[plec]) | (plec == 'Wszyscy')
+                                      for plec in PLCI_KLIENTA], dtype=bool).reshape(len(PLCI_KLIENTA), n)
+        self.inna_plec = np.array([np.isin(plci_nart, INNE_PLCI[plec]) for plec in PLCI_KLIENTA],
+                                  dtype=bool).reshape(len(PLCI_KLIENTA), n)
+        self.liczniki = self._zbuduj_liczniki()
+
+    def maski_kategorii(self, g, poziom):
+        """Składniki kategorii dla płci o indeksie g i poziomu klienta - krotki (maska nart, z tolerancją)
+
+        Składnik z tolerancją to prostokąt z tolerancją bez prostokąta zielonego; narta trafia
+        do kategorii, gdy profil leży w prostokącie któregokolwiek składnika.
+        """
+        poziom_min = self.poziom_min[g]
+        poziom_zielony = poziom_min == poziom
+        poziom_nizej = (poziom_min < poziom) & (poziom <= poziom_min + self.profil.tolerancja_poziomu)
+        plec = self.zielona_plec[g]
+        # Nieznana płeć narty to jeden pomarańczowy punkt - w zakresie narta jest alternatywą
+        nieznana = ~plec & ~self.inna_plec[g]
+        return {
+            'idealne': ((poziom_zielony & plec, False),),
+            'alternatywy': ((poziom_zielony & (plec | nieznana), True), (poziom_zielony & nieznana, False)),
+            'poziom_za_nisko': ((poziom_nizej & plec, False),),
+            'inna_plec': ((poziom_zielony & self.inna_plec[g], False),),
+        }
+
+    def _prostokaty(self, maska, z_tolerancja):
+        """Indeksy nart z maski i ich prostokąty (indeksy siatki) przycięte do siatki, bez pustych"""
+        tol_wagi = self.profil.tolerancja_wagi if z_tolerancja else 0
+        tol_wzrostu = self.profil.tolerancja_wzrostu if z_tolerancja else 0
+        indeksy = np.flatnonzero(maska)
+        w0 = np.maximum(self.wzrost_min[indeksy] - tol_wzrostu, WZROST_MIN) - WZROST_MIN
+        w1 = np.minimum(self.wzrost_max[indeksy] + tol_wzrostu, WZROST_MAX) - WZROST_MIN
+        k0 = np.maximum(self.waga_min[indeksy] - tol_wagi, WAGA_MIN) - WAGA_MIN
+        k1 = np.minimum(self.waga_max[indeksy] + tol_wagi, WAGA_MAX) - WAGA_MIN
+        niepuste = (w0 <= w1) & (k0 <= k1)
+        return indeksy[niepuste], w0[niepuste], w1[niepuste], k0[niepuste], k1[niepuste]
+
+    def _zbuduj_liczniki(self):
+        ksztalt = (len(PLCI_KLIENTA), len(POZIOMY), WZROST_MAX - WZROST_MIN + 2, WAGA_MAX - WAGA_MIN + 2)
+        roznice = {kategoria: np.zeros(ksztalt, dtype=np.int32) for kategoria in KATEGORIE}
+        for g in range(len(PLCI_KLIENTA)):
+            for p, poziom in enumerate(POZIOMY):
+                for kategoria, skladniki in self.maski_kategorii(g, poziom).items():
+                    for maska, z_tolerancja in skladniki:
+                        self._dodaj_skladnik(roznice[kategoria][g, p], maska, z_tolerancja)
+        return {kategoria: tablica.cumsum(axis=2).cumsum(axis=3)[:, :, :-1, :-1]
+                for kategoria, tablica in roznice.items()}
+
+    def _dodaj_skladnik(self, roznice, maska, z_tolerancja):
+        """Dodaje prostokąty składnika kategorii do tablicy różnicowej jednej płci i poziomu"""
+        _dodaj_prostokaty(roznice, self._prostokaty(maska, z_tolerancja))
+        if z_tolerancja:
+            _dodaj_prostokaty(roznice, self._prostokaty(maska, False), -1)
+
+    @staticmethod
+    def komorka(wzrost, waga, poziom, plec):
+        """Indeks komórki siatki dla profilu klienta (ValueError poza siatką)"""
+        if plec not in PLCI_KLIENTA or poziom not in POZIOMY or not (
+                WZROST_MIN <= wzrost <= WZROST_MAX and WAGA_MIN <= waga <= WAGA_MAX):
+            raise ValueError(f"Profil poza siatką klientów: {wzrost} cm, {waga} kg, poziom {poziom}, {plec}")
+        return PLCI_KLIENTA.index(plec), poziom - 1, int(wzrost) - WZROST_MIN, int(waga) - WAGA_MIN
+
+    def liczby(self, wzrost, waga, poziom, plec):
+        """Liczba nart w każdej kategorii dla profilu klienta"""
+        indeks = self.komorka(wzrost, waga, poziom, plec)
+        return {kategoria: int(tablica[indeks]) for kategoria, tablica in self.liczniki.items()}
+
+    def narty_klienta(self, wzrost, waga, poziom, plec, kategoria='idealne'):
+        """Narty z kategorii dla profilu klienta (w kolejności bazy)"""
+        g, _, _, _ = self.komorka(wzrost, waga, poziom, plec)
+        w_zakresie = ((self.waga_min <= waga) & (waga <= self.waga_max) &
+                      (self.wzrost_min <= wzrost) & (wzrost <= self.wzrost_max))
+        tol_wagi, tol_wzrostu = self.profil.tolerancja_wagi, self.profil.tolerancja_wzrostu
+        w_tolerancji = ((self.waga_min - tol_wagi <= waga) & (waga <= self.waga_max + tol_wagi) &
+                        (self.wzrost_min - tol_wzrostu <= wzrost) & (wzrost <= self.wzrost_max + tol_wzrostu))
+        wynik = np.zeros(len(self.narty), dtype=bool)
+        for maska, z_tolerancja in self.maski_kategorii(g, poziom)[kategoria]:
+            wynik |= maska & (w_tolerancji & ~w_zakresie if z_tolerancja else w_zakresie)
+        return [self.narty[i] for i in np.flatnonzero(wynik)]
+
+    def pokrycie(self, rozklad=None, kategoria='idealne'):
+        """Udział klientów (0-1), dla których każda narta jest w kategorii - tablica w kolejności bazy
+
+        rozklad to wagi komórek siatki (kształt jak liczniki), domyślnie wszystkie komórki równo.
+        """
+        if rozklad is None:
+            rozklad = np.ones(self.liczniki[kategoria].shape)
+        rozklad = rozklad / rozklad.sum()
+        # Sumy narastające rozkładu - suma po prostokącie w czasie stałym
+        sumy = np.zeros((rozklad.shape[0], rozklad.shape[1], rozklad.shape[2] + 1, rozklad.shape[3] + 1))
+        sumy[:, :, 1:, 1:] = rozklad.cumsum(axis=2).cumsum(axis=3)
+
+        udzial = np.zeros(len(self.narty))
+        for g in range(len(PLCI_KLIENTA)):
+            for p, poziom in enumerate(POZIOMY):
+                for maska, z_tolerancja in self.maski_kategorii(g, poziom)[kategoria]:
+                    udzial += self._suma_prostokatow(sumy[g, p], maska, z_tolerancja)
+                    if z_tolerancja:
+                        udzial -= self._suma_prostokatow(sumy[g, p], maska, False)
+        return udzial
+
+    def _suma_prostokatow(self, sumy, maska, z_tolerancja):
+        """Suma rozkładu po prostokącie każdej narty z maski (0 dla pozostałych)"""
+        wynik = np.zeros(len(self.narty))
+        indeksy, w0, w1, k0, k1 = self._prostokaty(maska, z_tolerancja)
+        wynik[indeksy] = sumy[w1 + 1, k1 + 1] - sumy[w0, k1 + 1] - sumy[w1 + 1, k0] + sumy[w0, k0]
+        return wynik
+
+    def bez_idealnych(self, rozklad=None):
+        """Raport profili bez żadnej idealnej narty - dla każdej płci i poziomu klienta
+
+        Zwraca listę słowników: plec, poziom, komorki (liczba punktów siatki), udzial (część
+        klientów wg rozkładu), wzrost i waga (zakresy obejmujące puste komórki).
+        """
+        puste = self.liczniki['idealne'] == 0
+        if rozklad is not None:
+            puste &= rozklad > 0
+            udzialy = (rozklad * puste).sum(axis=(2, 3)) / rozklad.sum()
+        else:
+            udzialy = puste.sum(axis=(2, 3)) / puste.size
+        raport = []
+        for g, plec in enumerate(PLCI_KLIENTA):
+            for p, poziom in enumerate(POZIOMY):
+                wzrosty, wagi = np.nonzero(puste[g, p])
+                if not len(wzrosty):
+                    continue
+                raport.append({
+                    'plec': plec,
+                    'poziom': poziom,
+                    'komorki': int(len(wzrosty)),
+                    'udzial': float(udzialy[g, p]),
+                    'wzrost': (int(wzrosty.min()) + WZROST_MIN, int(wzrosty.max()) + WZROST_MIN),
+                    'waga': (int(wagi.min()) + WAGA_MIN, int(wagi.max()) + WAGA_MIN),
+                })
+        return raport
+
+def rozklad_z_profili(profile):
+    """Rozkład klientów na siatce z listy profili (np. list grup) - kształt jak liczniki indeksu"""
+    rozklad = np.zeros((len(PLCI_KLIENTA), len(POZIOMY), WZROST_MAX - WZROST_MIN + 1, WAGA_MAX - WAGA_MIN + 1))
+    for profil in profile:
+        try:
+            rozklad[IndeksKlientow.komorka(profil['wzrost'], profil['waga'], profil['poziom'], profil['plec'])] += 1
+        except ValueError:
+            logger.warning(f"Profil poza siatką klientów pominięty: {profil}")
+    return rozklad
+
+# Ostatnio zbudowany indeks: (narty, wersja profilu, indeks) - ważny dla tej samej migawki bazy
+_ostatni = None
+
+@mierzony('indeks_klientow')
+def indeks_klientow(narty):
+    """Zwraca indeks dla bazy nart (budowany ponownie po zmianie bazy lub profilu oceny)"""
+    global _ostatni
+    profil = aktywny_profil()
+    ostatni = _ostatni
+    trafione = ostatni is not None and ostatni[0] is narty and ostatni[1] == profil.wersja
+    trafienie('indeks_klientow', trafione)
+    if trafione:
+        return ostatni[2]
+    indeks = IndeksKlientow(narty, profil)
+    _ostatni = (narty, profil.wersja, indeks)
+    logger.info(f"Zbudowano indeks klientów dla {len(narty)} nart (profil {profil.opis()})")
+    return indeks
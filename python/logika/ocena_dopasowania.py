@@ -1,43 +1,161 @@
 """
 Moduł oceny dopasowania nart do klienta
-Zawiera system współczynnika idealności i wag
+Zawiera system współczynnika idealności i wag. Wyniki wagi i wzrostu dla zakresu
+narty liczone są raz dla całej domeny klientów (wektor indeksowany wagą/wzrostem)
+i trzymane w pamięci podręcznej z budżetem bajtów.
 """
-import math
 import logging
+import threading
+from array import array
+from collections import deque
+from dataclasses import replace
+
+from logika.profil_oceny import (aktywny_profil, ustaw_profil, przy_zmianie_profilu, wynik_gaussa,
+                                 wynik_poza_zakresem)
+from narzedzia import instrumentacja
 
 logger = logging.getLogger(__name__)
 
+# Domena klientów (kg, cm) - wektory wyników obejmują wartości od 0 do górnej granicy, powyżej wynik liczony wprost
+DOMENY = {'waga': (20, 200), 'wzrost': (100, 250)}
+
+# Budżet pamięci wektorów wyników (bajty) - po przekroczeniu usuwane są najdawniej zbudowane zakresy (FIFO)
+BUDZET_WEKTOROW = 4 * 1024 * 1024
+
+# Pola profilu oceny dla kryterium: tablica gaussa, tablica poza zakresem, odchylenie, spadek, tolerancja
+POLA_PROFILU = {
+    'waga': ('gauss_wagi', 'poza_zakresem_wagi', 'odchylenie_wagi', 'spadek_wagi', 'tolerancja_wagi'),
+    'wzrost': ('gauss_wzrostu', 'poza_zakresem_wzrostu', 'odchylenie_wzrostu', 'spadek_wzrostu', 'tolerancja_wzrostu'),
+}
+
 class CompatibilityScorer:
-    """Klasa do obliczania współczynnika idealności dopasowania nart"""
-    
-    def __init__(self):
-        # Domyślne wagi kryteriów (suma = 1.0)
-        self.wagi_kryteriow = {
-            'poziom': 0.35,      # 35% - Najważniejsze (bezpieczeństwo)
-            'waga': 0.25,        # 25% - Bardzo ważne (kontrola nart)
-            'wzrost': 0.20,      # 20% - Ważne (stabilność i zwrotność)
-            'plec': 0.15,        # 15% - Mniej ważne (ergonomia)
-            'przeznaczenie': 0.05 # 5% - Najmniej ważne (styl jazdy)
-        }
-        
-        # Parametry funkcji gaussowskich dla różnych kryteriów
-        self.tolerancje = {
-            'poziom': 1.0,       # Standardowe odchylenie dla poziomu
-            'waga': 8.0,         # Standardowe odchylenie dla wagi (kg)
-            'wzrost': 8.0,       # Standardowe odchylenie dla wzrostu (cm)
-        }
-    
+    """Klasa do obliczania współczynnika idealności dopasowania nart
+
+    Wagi kryteriów i parametry funkcji gaussowskich pochodzą z aktywnego profilu oceny
+    (logika.profil_oceny) - wyniki dla całkowitych odległości są odczytywane z jego tablic.
+    Wektory wyników zakresów (kryterium, min, max) są budowane leniwie przy pierwszej
+    ocenie narty o danym zakresie i usuwane przy każdej zmianie profilu (nowej wersji).
+    Metody oceny przyjmują profil odczytany raz na wyszukiwanie - wektory w pamięci są
+    używane tylko dla tej samej wersji profilu, a wektor ze starej wersji nie trafia do pamięci.
+    """
+
+    def __init__(self, budzet_pamieci=BUDZET_WEKTOROW):
+        self.budzet_pamieci = budzet_pamieci
+        self._blokada = threading.Lock()
+        self._wektory = {}      # kryterium -> {(min, max): array('d') wyników dla wag/wzrostów klientów}
+        self._kolejnosc = None  # klucze wektorów w kolejności budowania
+        self._zajete = 0
+        self._wersja_profilu = None  # wersja profilu, z której pochodzą wektory w pamięci
+        self.wyczysc_wektory()
+        przy_zmianie_profilu(self.wyczysc_wektory)
+
+    @property
+    def profil(self):
+        return aktywny_profil()
+
+    @property
+    def wagi_kryteriow(self):
+        return self.profil.wagi_kryteriow
+
+    @property
+    def tolerancje(self):
+        """Parametry funkcji gaussowskich dla kryteriów"""
+        return {'waga': self.profil.odchylenie_wagi, 'wzrost': self.profil.odchylenie_wzrostu}
+
     def gaussian_score(self, value, target, tolerance):
         """
         Oblicza wynik na podstawie funkcji gaussowskiej
         Zwraca wartość 0-1, gdzie 1 = idealne dopasowanie
         """
-        if tolerance == 0:
-            return 1.0 if value == target else 0.0
-        
-        distance = abs(value - target)
-        return math.exp(-0.5 * (distance / tolerance) ** 2)
-    
+        return wynik_gaussa(abs(value - target), tolerance)
+
+    def score_zakresu(self, wartosc, minimum, maksimum, status, gauss, poza_zakresem, odchylenie, spadek):
+        """Ocenia wagę lub wzrost względem zakresu narty - odczyt z tablic profilu"""
+        if status == 'green':
+            # Jak blisko środka zakresu jest klient (klucz tablicy to podwojona odległość)
+            wynik = gauss.get(abs(2 * wartosc - minimum - maksimum))
+            return wynik if wynik is not None else wynik_gaussa(abs(wartosc - (minimum + maksimum) / 2), odchylenie)
+        elif status == 'orange':
+            # Klient jest poza zakresem ale w tolerancji
+            distance = wartosc - maksimum if wartosc > maksimum else minimum - wartosc
+            wynik = poza_zakresem.get(distance)
+            return wynik if wynik is not None else wynik_poza_zakresem(distance, spadek)
+        return 0.1
+
+    def wektor_oceny(self, kryterium, minimum, maksimum, profil=None):
+        """Buduje wektor wyników kryterium dla zakresu narty - indeksem jest waga/wzrost klienta
+
+        W zakresie wynik jak dla statusu 'green', poza nim jak dla 'orange' (bez tolerancji -
+        status 'red' oceniany jest osobno). Wektor obejmuje wartości od 0 do górnej granicy
+        domeny, więc odczyt nie sprawdza dolnej granicy. profil domyślnie aktywny.
+        """
+        profil = profil or aktywny_profil()
+        wersja = profil.wersja
+        gorna = DOMENY[kryterium][1]
+        gauss, poza_zakresem, odchylenie, spadek, _ = (getattr(profil, pole) for pole in POLA_PROFILU[kryterium])
+        wektor = array('d', (
+            self.score_zakresu(wartosc, minimum, maksimum, 'green' if minimum <= wartosc <= maksimum else 'orange',
+                               gauss, poza_zakresem, odchylenie, spadek)
+            for wartosc in range(gorna + 1)
+        ))
+        with self._blokada:
+            if self._wersja_profilu is None:
+                self._wersja_profilu = wersja
+            wektory = self._wektory[kryterium]
+            # Profil zmieniony w trakcie liczenia - wektor zwracany, ale nie zapamiętywany
+            if wersja == self._wersja_profilu and (minimum, maksimum) not in wektory:
+                wektory[minimum, maksimum] = wektor
+                self._kolejnosc.append((kryterium, (minimum, maksimum)))
+                self._zajete += len(wektor) * wektor.itemsize
+                # Najdawniej zbudowane wektory ustępują nowym, gdy budżet jest przekroczony
+                while self._zajete > self.budzet_pamieci and len(self._kolejnosc) > 1:
+                    kryterium_usuwane, klucz = self._kolejnosc.popleft()
+                    usuniety = self._wektory[kryterium_usuwane].pop(klucz)
+                    self._zajete -= len(usuniety) * usuniety.itemsize
+        return wektor
+
+    def wektor_zakresu(self, kryterium, wartosc, minimum, maksimum, profil):
+        """Wektor wyników zakresu narty dla wersji profilu (z pamięci albo zbudowany)
+
+        Zwraca None, gdy wartość klienta nie jest liczbą całkowitą od 0 do górnej granicy
+        domeny - wtedy wynik liczony jest wprost z tablic profilu. Odczyt wyniku to wektor[wartosc].
+        """
+        if type(wartosc) is not int or not 0 <= wartosc <= DOMENY[kryterium][1]:
+            return None
+        if profil.wersja == self._wersja_profilu:
+            wektor = self._wektory[kryterium].get((minimum, maksimum))
+            if wektor is not None:
+                return wektor
+        return self.wektor_oceny(kryterium, minimum, maksimum, profil)
+
+    def score_kryterium(self, kryterium, wartosc, minimum, maksimum, status, profil=None):
+        """Ocenia wagę lub wzrost - odczyt z wektora zakresu, gdy status odpowiada położeniu
+        wartości względem zakresu (inny status albo poza domeną: z tablic profilu)"""
+        profil = profil or aktywny_profil()
+        if status == ('green' if minimum <= wartosc <= maksimum else 'orange') and type(wartosc) is int and wartosc >= 0:
+            wektor = self._wektory[kryterium].get((minimum, maksimum)) if profil.wersja == self._wersja_profilu else None
+            if wektor is None:
+                wektor = self.wektor_oceny(kryterium, minimum, maksimum, profil)
+            try:
+                return wektor[wartosc]
+            except IndexError:
+                pass   # powyżej domeny klientów
+        gauss, poza_zakresem, odchylenie, spadek, _ = (getattr(profil, pole) for pole in POLA_PROFILU[kryterium])
+        return self.score_zakresu(wartosc, minimum, maksimum, status, gauss, poza_zakresem, odchylenie, spadek)
+
+    def wyczysc_wektory(self, profil=None):
+        """Usuwa wektory wyników (wywoływane przy każdej zmianie profilu oceny)"""
+        with self._blokada:
+            self._wektory = {kryterium: {} for kryterium in DOMENY}
+            self._kolejnosc = deque()
+            self._zajete = 0
+            self._wersja_profilu = profil.wersja if profil is not None else None
+
+    def opis_wektorow(self):
+        """Jednoliniowy opis pamięci wektorów do podsumowania instrumentacji"""
+        return (f"{len(self._kolejnosc)} zakresów, {self._zajete / 1024:.0f} KB "
+                f"z {self.budzet_pamieci / 1024:.0f} KB")
+
     def score_poziom(self, poziom_klienta, poziom_narty_info):
         """Ocenia dopasowanie poziomu umiejętności"""
         # Wyciągnij rzeczywisty poziom z informacji o narcie
@@ -56,52 +174,20 @@ class CompatibilityScorer:
         
         return 0.5  # Domyślny wynik gdy nie można sparsować
     
-    def score_waga(self, waga_klienta, waga_narty_info):
+    def score_waga(self, waga_klienta, waga_narty_info, profil=None):
         """Ocenia dopasowanie wagi"""
         if isinstance(waga_narty_info, tuple) and len(waga_narty_info) >= 4:
             status, opis, waga_min, waga_max = waga_narty_info
-            
-            if status == 'green':
-                # Oblicz jak blisko środka zakresu jest klient
-                waga_srodek = (waga_min + waga_max) / 2
-                return self.gaussian_score(waga_klienta, waga_srodek, self.tolerancje['waga'])
-            elif status == 'orange':
-                # Klient jest poza zakresem ale w tolerancji
-                if waga_klienta > waga_max:
-                    distance = waga_klienta - waga_max
-                else:
-                    distance = waga_min - waga_klienta
-                
-                # Im mniejsza odległość od zakresu, tym lepszy wynik
-                return max(0.3, 0.8 - (distance / 10.0))
-            else:
-                return 0.1
-        
+            return self.score_kryterium('waga', waga_klienta, waga_min, waga_max, status, profil)
         return 0.5
-    
-    def score_wzrost(self, wzrost_klienta, wzrost_narty_info):
+
+    def score_wzrost(self, wzrost_klienta, wzrost_narty_info, profil=None):
         """Ocenia dopasowanie wzrostu"""
         if isinstance(wzrost_narty_info, tuple) and len(wzrost_narty_info) >= 4:
             status, opis, wzrost_min, wzrost_max = wzrost_narty_info
-            
-            if status == 'green':
-                # Oblicz jak blisko środka zakresu jest klient
-                wzrost_srodek = (wzrost_min + wzrost_max) / 2
-                return self.gaussian_score(wzrost_klienta, wzrost_srodek, self.tolerancje['wzrost'])
-            elif status == 'orange':
-                # Klient jest poza zakresem ale w tolerancji
-                if wzrost_klienta > wzrost_max:
-                    distance = wzrost_klienta - wzrost_max
-                else:
-                    distance = wzrost_min - wzrost_klienta
-                
-                # Im mniejsza odległość od zakresu, tym lepszy wynik
-                return max(0.3, 0.8 - (distance / 15.0))
-            else:
-                return 0.1
-        
+            return self.score_kryterium('wzrost', wzrost_klienta, wzrost_min, wzrost_max, status, profil)
         return 0.5
-    
+
     def score_plec(self, plec_klienta, plec_narty_info):
         """Ocenia dopasowanie płci"""
         if isinstance(plec_narty_info, tuple) and len(plec_narty_info) >= 2:
@@ -137,10 +223,15 @@ class CompatibilityScorer:
         return 0.7  # Domyślny wynik gdy brak informacji
     
     def oblicz_wspolczynnik_idealnosci(self, dopasowanie, wzrost_klienta, waga_klienta, 
-                                     poziom_klienta, plec_klienta, styl_klienta=None):
+                                     poziom_klienta, plec_klienta, styl_klienta=None, profil=None,
+                                     wektor_wagi=None, wektor_wzrostu=None):
         """
         Główna funkcja obliczająca współczynnik idealności (0-100%)
+        profil to profil oceny odczytany raz na wyszukiwanie (domyślnie aktywny) - z niego
+        pochodzą wagi kryteriów i wyniki wagi oraz wzrostu. wektor_wagi i wektor_wzrostu
+        (wektor_zakresu dla narty) zamieniają ocenę wagi i wzrostu na odczyt wektor[wartosc].
         """
+        profil = profil or aktywny_profil()
         wyniki_kryteriow = {}
         
         # Oceń każde kryterium
@@ -148,10 +239,12 @@ class CompatibilityScorer:
             wyniki_kryteriow['poziom'] = self.score_poziom(poziom_klienta, dopasowanie['poziom'])
         
         if 'waga' in dopasowanie:
-            wyniki_kryteriow['waga'] = self.score_waga(waga_klienta, dopasowanie['waga'])
+            wyniki_kryteriow['waga'] = (wektor_wagi[waga_klienta] if wektor_wagi is not None
+                                        else self.score_waga(waga_klienta, dopasowanie['waga'], profil))
         
         if 'wzrost' in dopasowanie:
-            wyniki_kryteriow['wzrost'] = self.score_wzrost(wzrost_klienta, dopasowanie['wzrost'])
+            wyniki_kryteriow['wzrost'] = (wektor_wzrostu[wzrost_klienta] if wektor_wzrostu is not None
+                                          else self.score_wzrost(wzrost_klienta, dopasowanie['wzrost'], profil))
         
         if 'plec' in dopasowanie:
             wyniki_kryteriow['plec'] = self.score_plec(plec_klienta, dopasowanie['plec'])
@@ -162,10 +255,11 @@ class CompatibilityScorer:
         # Oblicz ważoną średnią
         suma_wazona = 0.0
         suma_wag = 0.0
+        wagi_kryteriow = profil.wagi_kryteriow
         
         for kryterium, wynik in wyniki_kryteriow.items():
-            if kryterium in self.wagi_kryteriow:
-                waga = self.wagi_kryteriow[kryterium]
+            if kryterium in wagi_kryteriow:
+                waga = wagi_kryteriow[kryterium]
                 suma_wazona += wynik * waga
                 suma_wag += waga
         
@@ -178,13 +272,11 @@ class CompatibilityScorer:
         return round(wspolczynnik, 1), wyniki_kryteriow
     
     def ustaw_wagi(self, nowe_wagi):
-        """Pozwala na dostosowanie wag kryteriów"""
-        suma = sum(nowe_wagi.values())
-        if abs(suma - 1.0) > 0.01:
-            raise ValueError(f"Suma wag musi wynosić 1.0, a wynosi {suma}")
-        
-        self.wagi_kryteriow.update(nowe_wagi)
+        """Pozwala na dostosowanie wag kryteriów (nowa wersja aktywnego profilu)"""
+        profil = self.profil
+        ustaw_profil(replace(profil, wagi_kryteriow=dict(profil.wagi_kryteriow, **nowe_wagi)))
         logger.info(f"Zaktualizowano wagi kryteriów: {self.wagi_kryteriow}")
 
 # Globalna instancja scorera
 compatibility_scorer = CompatibilityScorer()
+instrumentacja.dodaj_raport('wektory_oceny', compatibility_scorer.opis_wektorow)
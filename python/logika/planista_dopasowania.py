@@ -0,0 +1,92 @@
+"""
+Moduł planisty dopasowania
+Ustala kolejność warunków odrzucających nartę (poziom, waga, wzrost) na podstawie
+statystyk z prawdziwych wyszukiwań - najpierw warunki, które odrzucają najwięcej
+nart w najkrótszym czasie. Co co_ile wyszukiwań wszystkie warunki są sprawdzane
+dla każdej narty, by selektywność nie zależała od bieżącej kolejności; pozostałe
+wyszukiwania sprawdzają warunki w ustalonej kolejności i kończą na pierwszym odrzuceniu.
+"""
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Co które wyszukiwanie zbiera statystyki warunków (pierwsze zawsze)
+CO_ILE_POMIAR = 20
+
+class PlanistaDopasowania:
+    """Kolejność warunków odrzucających według selektywności i kosztu
+
+    Warunek to funkcja (row, wzrost, waga, poziom, plec, profil) -> True gdy narta odpada.
+    Liczniki nie są chronione blokadą - przy równoległych wyszukiwaniach mogą zgubić
+    pojedyncze zliczenia, co nie zmienia wyniku dopasowania, tylko statystykę.
+    """
+
+    def __init__(self, warunki, co_ile=CO_ILE_POMIAR):
+        self.warunki = dict(warunki)
+        self.co_ile = co_ile
+        self.kolejnosc = tuple(self.warunki)
+        self.plan_biezacy = tuple(self.warunki.values())
+        self._blokada = threading.Lock()
+        self._wyszukiwania = 0
+        self._nowe_pomiary = False
+        self._sprawdzone = dict.fromkeys(self.warunki, 0)
+        self._odrzucone = dict.fromkeys(self.warunki, 0)
+        self._czas = dict.fromkeys(self.warunki, 0.0)
+
+    def plan(self):
+        """Zwraca krotkę warunków dla jednego wyszukiwania"""
+        with self._blokada:
+            if self._nowe_pomiary:
+                self._przeplanuj()
+            self._wyszukiwania += 1
+            mierz = self._wyszukiwania % self.co_ile == 1 or self.co_ile == 1
+        return (self._sprawdz_wszystkie,) if mierz else self.plan_biezacy
+
+    def _sprawdz_wszystkie(self, row, wzrost, waga, poziom, plec, profil):
+        """Sprawdza wszystkie warunki i zapisuje ich selektywność oraz czas"""
+        odpada = False
+        for nazwa, warunek in self.warunki.items():
+            start = time.perf_counter()
+            wynik = warunek(row, wzrost, waga, poziom, plec, profil)
+            self._czas[nazwa] += time.perf_counter() - start
+            self._sprawdzone[nazwa] += 1
+            if wynik:
+                self._odrzucone[nazwa] += 1
+                odpada = True
+        self._nowe_pomiary = True
+        return odpada
+
+    def _ranga(self, nazwa):
+        """Odrzucone narty na sekundę sprawdzania - wyżej znaczy wcześniej w planie"""
+        czas = self._czas[nazwa]
+        return self._odrzucone[nazwa] / czas if czas else 0.0
+
+    def _przeplanuj(self):
+        self._nowe_pomiary = False
+        kolejnosc = tuple(sorted(self.warunki, key=self._ranga, reverse=True))
+        if kolejnosc != self.kolejnosc:
+            self.kolejnosc = kolejnosc
+            self.plan_biezacy = tuple(self.warunki[nazwa] for nazwa in kolejnosc)
+            logger.info(f"Nowy plan dopasowania: {' > '.join(kolejnosc)}")
+
+    def statystyki(self):
+        """Kolejność warunków i ich statystyki: sprawdzone, odrzucone, selektywność, czas w µs"""
+        warunki = {}
+        for nazwa in self.kolejnosc:
+            sprawdzone = self._sprawdzone[nazwa]
+            warunki[nazwa] = {
+                'sprawdzone': sprawdzone,
+                'odrzucone': self._odrzucone[nazwa],
+                'selektywnosc': self._odrzucone[nazwa] / sprawdzone if sprawdzone else 0.0,
+                'czas_us': self._czas[nazwa] / sprawdzone * 1e6 if sprawdzone else 0.0,
+            }
+        return {'kolejnosc': list(self.kolejnosc), 'warunki': warunki}
+
+    def opis(self):
+        """Jednoliniowy opis planu do podsumowania instrumentacji"""
+        czesci = [f"{nazwa} (odrzuca {s['selektywnosc']:.0%}, {s['czas_us']:.2f}µs)"
+                  for nazwa, s in self.statystyki()['warunki'].items()]
+        return " > ".join(czesci)
+
@@ -0,0 +1,161 @@
+"""
+Moduł profilu oceny
+Tolerancje dopasowania i wagi kryteriów wczytywane z pliki_danych/profil_oceny.json
+(każda wypożyczalnia może mieć własny profil). Przy wczytaniu profil przelicza
+tablice wyników dla całkowitych odległości w kg/cm, więc ocena narty to odczyt
+z tablicy zamiast math.exp. Każda zmiana profilu podbija wersję - pamięci wyników
+zależnych od oceny porównują ją, by nie zwracać wyników liczonych starym profilem.
+"""
+import os
+import json
+import math
+import logging
+import threading
+from dataclasses import dataclass, field, fields, replace
+
+logger = logging.getLogger(__name__)
+
+PLIK_PROFILU = 'profil_oceny.json'
+
+# Zakres tablic gaussowskich: odległość od środka zakresu narty do tej wartości (kg/cm)
+ZAKRES_TABLIC = 150
+
+@dataclass(frozen=True)
+class ProfilOceny:
+    """Tolerancje dopasowania i parametry oceny z przeliczonymi tablicami wyników"""
+    nazwa: str = 'domyślny'
+    tolerancja_poziomu: int = 1        # o ile poziomów klient może być powyżej narty (pomarańczowe)
+    tolerancja_wagi: int = 5           # kg poza zakresem narty (pomarańczowe)
+    tolerancja_wzrostu: int = 5        # cm poza zakresem narty (pomarańczowe)
+    odchylenie_wagi: float = 8.0       # odchylenie gaussa od środka zakresu wagi (kg)
+    odchylenie_wzrostu: float = 8.0    # odchylenie gaussa od środka zakresu wzrostu (cm)
+    spadek_wagi: float = 10.0          # kg poza zakresem, o które wynik spada o 1.0
+    spadek_wzrostu: float = 15.0       # cm poza zakresem, o które wynik spada o 1.0
+    wagi_kryteriow: dict = field(default_factory=lambda: {
+        'poziom': 0.35,        # 35% - Najważniejsze (bezpieczeństwo)
+        'waga': 0.25,          # 25% - Bardzo ważne (kontrola nart)
+        'wzrost': 0.20,        # 20% - Ważne (stabilność i zwrotność)
+        'plec': 0.15,          # 15% - Mniej ważne (ergonomia)
+        'przeznaczenie': 0.05  # 5% - Najmniej ważne (styl jazdy)
+    })
+    wersja: int = 0
+
+    # Tablice wyników: klucz to podwojona odległość od środka zakresu (w zakresie)
+    # albo odległość od granicy zakresu (poza zakresem, do tolerancji)
+    gauss_wagi: dict = field(init=False, repr=False, compare=False)
+    gauss_wzrostu: dict = field(init=False, repr=False, compare=False)
+    poza_zakresem_wagi: dict = field(init=False, repr=False, compare=False)
+    poza_zakresem_wzrostu: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        suma = sum(self.wagi_kryteriow.values())
+        if abs(suma - 1.0) > 0.01:
+            raise ValueError(f"Suma wag musi wynosić 1.0, a wynosi {suma}")
+        if min(self.tolerancja_poziomu, self.tolerancja_wagi, self.tolerancja_wzrostu) < 0:
+            raise ValueError("Tolerancje nie mogą być ujemne")
+        object.__setattr__(self, 'gauss_wagi', tablica_gaussa(self.odchylenie_wagi))
+        object.__setattr__(self, 'gauss_wzrostu', tablica_gaussa(self.odchylenie_wzrostu))
+        object.__setattr__(self, 'poza_zakresem_wagi', tablica_poza_zakresem(self.tolerancja_wagi, self.spadek_wagi))
+        object.__setattr__(self, 'poza_zakresem_wzrostu',
+                           tablica_poza_zakresem(self.tolerancja_wzrostu, self.spadek_wzrostu))
+
+    def opis(self):
+        return (f"{self.nazwa} v{self.wersja} (tolerancje: poziom {self.tolerancja_poziomu}, "
+                f"waga {self.tolerancja_wagi} kg, wzrost {self.tolerancja_wzrostu} cm)")
+
+def wynik_gaussa(odleglosc, odchylenie):
+    """Wynik 0-1 funkcji gaussowskiej dla odległości od celu (1 = idealne dopasowanie)"""
+    if odchylenie == 0:
+        return 1.0 if odleglosc == 0 else 0.0
+    return math.exp(-0.5 * (odleglosc / odchylenie) ** 2)
+
+def wynik_poza_zakresem(odleglosc, spadek):
+    """Wynik klienta poza zakresem narty, ale w tolerancji - im bliżej zakresu, tym lepiej"""
+    return max(0.3, 0.8 - (odleglosc / spadek))
+
+def tablica_gaussa(odchylenie):
+    """Wyniki gaussa dla podwojonych całkowitych odległości (środek zakresu bywa połówką)"""
+    return {podwojona: wynik_gaussa(podwojona / 2, odchylenie) for podwojona in range(2 * ZAKRES_TABLIC + 1)}
+
+def tablica_poza_zakresem(tolerancja, spadek):
+    """Wyniki dla całkowitych odległości od granicy zakresu (0 ... tolerancja)"""
+    return {odleglosc: wynik_poza_zakresem(odleglosc, spadek) for odleglosc in range(tolerancja + 1)}
+
+_blokada = threading.Lock()
+_aktywny = None
+_ostatnia_wersja = 0
+_sluchacze = []
+
+def sciezka_profilu():
+    """Ścieżka pliku profilu oceny w pliki_danych"""
+    from dane.wczytywanie_danych import katalog_danych
+    return os.path.join(katalog_danych(), PLIK_PROFILU)
+
+def wczytaj_profil(sciezka=None):
+    """Wczytuje profil z pliku JSON (brakujące pola z profilu domyślnego); bez pliku - profil domyślny"""
+    sciezka = sciezka or sciezka_profilu()
+    if not os.path.exists(sciezka):
+        logger.info(f"Brak pliku {sciezka} - używany domyślny profil oceny")
+        return ProfilOceny()
+
+    with open(sciezka, encoding='utf-8') as plik:
+        dane = json.load(plik)
+    domyslny = ProfilOceny()
+    wagi = dict(domyslny.wagi_kryteriow, **dane.pop('wagi_kryteriow', {}))
+    nieznane = set(dane) - {pole.name for pole in fields(ProfilOceny) if pole.init and pole.name != 'wersja'}
+    if nieznane:
+        raise ValueError(f"Nieznane pola profilu oceny: {', '.join(sorted(nieznane))}")
+    return replace(domyslny, wagi_kryteriow=wagi, **dane)
+
+def przy_zmianie_profilu(funkcja):
+    """Rejestruje funkcję(profil) wywoływaną po każdej podmianie profilu (np. czyszczenie pamięci wyników)"""
+    _sluchacze.append(funkcja)
+
+def _podmien(profil):
+    """Nadaje profilowi nową wersję i uaktywnia go - wywoływane z założoną _blokada"""
+    global _aktywny, _ostatnia_wersja
+    _ostatnia_wersja += 1
+    _aktywny = replace(profil, wersja=_ostatnia_wersja)
+    return _aktywny
+
+def _powiadom(nowy):
+    """Powiadamia zarejestrowane funkcje o nowym profilu (poza blokadą - mogą czytać aktywny profil)"""
+    for funkcja in _sluchacze:
+        funkcja(nowy)
+    logger.info(f"Aktywny profil oceny: {nowy.opis()}")
+
+def ustaw_profil(profil):
+    """Podmienia aktywny profil, nadaje mu nową wersję i powiadamia zarejestrowane funkcje"""
+    with _blokada:
+        nowy = _podmien(profil)
+    _powiadom(nowy)
+    return nowy
+
+def przeladuj_profil(sciezka=None):
+    """Wczytuje profil z pliku i uaktywnia go; przy błędnym pliku zostaje poprzedni profil"""
+    try:
+        return ustaw_profil(wczytaj_profil(sciezka))
+    except (OSError, ValueError, TypeError) as e:
+        logger.error(f"Niepoprawny profil oceny ({e}) - pozostaje {aktywny_profil().opis()}")
+        return aktywny_profil()
+
+def aktywny_profil():
+    """Zwraca aktywny profil (przy pierwszym użyciu wczytuje go z pliku)"""
+    profil = _aktywny
+    if profil is not None:
+        return profil
+    with _blokada:
+        # Ponowne sprawdzenie - równoległe pierwsze wywołanie mogło już wczytać profil
+        if _aktywny is not None:
+            return _aktywny
+        try:
+            nowy = _podmien(wczytaj_profil())
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(f"Niepoprawny profil oceny ({e}) - używany profil domyślny")
+            nowy = _podmien(ProfilOceny())
+    _powiadom(nowy)
+    return nowy
+
+def wersja_profilu():
+    """Wersja aktywnego profilu - zmienia się przy każdej podmianie profilu"""
+    return aktywny_profil().wersja
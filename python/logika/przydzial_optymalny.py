@@ -0,0 +1,116 @@
+"""
+Moduł optymalnego przydziału sztuk nart dla grupy
+Przydział jako przepływ o minimalnym koszcie na rzadkim grafie dwudzielnym
+(osoba -> fizyczna sztuka): najpierw maksymalna liczba osób z nartami,
+potem maksymalna suma współczynników idealności
+"""
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Koszt krawędzi = MAKS_WSPOLCZYNNIK - współczynnik idealności (zawsze >= 0)
+MAKS_WSPOLCZYNNIK = 100.0
+
+def zbuduj_graf(kandydaci, klucz_sztuki):
+    """Buduje rzadki graf zgodności osób i sztuk
+
+    kandydaci: lista (dla każdej osoby) list (kategoria, narta_info) z 'wolne_sztuki'
+    Zwraca (krawedzie, sztuki): krawedzie[osoba] = lista (indeks_sztuki, koszt, kategoria, narta_info),
+    sztuki = lista (klucz sztuki, numer).
+    """
+    indeksy_sztuk = {}
+    sztuki = []
+    krawedzie = []
+    for lista in kandydaci:
+        krawedzie_osoby = []
+        for kategoria, narta_info in lista:
+            koszt = MAKS_WSPOLCZYNNIK - narta_info['wspolczynnik_idealnosci']
+            for numer in narta_info['wolne_sztuki']:
+                klucz = klucz_sztuki(narta_info, numer)
+                if klucz not in indeksy_sztuk:
+                    indeksy_sztuk[klucz] = len(sztuki)
+                    sztuki.append((klucz, numer))
+                krawedzie_osoby.append((indeksy_sztuk[klucz], koszt, kategoria, narta_info))
+        krawedzie.append(krawedzie_osoby)
+    return krawedzie, sztuki
+
+def przydziel_optymalnie(kandydaci, klucz_sztuki):
+    """Wyznacza optymalny przydział sztuk (najkrótsze ścieżki powiększające z potencjałami)
+
+    Osoby dodawane są po kolei; każda ma prywatną sztukę "bez nart" o koszcie większym
+    niż suma wszystkich współczynników, więc przydział zawsze istnieje, a jego minimalny
+    koszt oznacza najpierw najwięcej osób z nartami, potem największą sumę współczynników.
+    Zwraca listę (dla każdej osoby) krotek (kategoria, narta_info, numer_sztuki) lub None,
+    gdy dla osoby nie starczyło sztuk.
+    """
+    krawedzie, sztuki = zbuduj_graf(kandydaci, klucz_sztuki)
+    liczba_osob, liczba_sztuk = len(krawedzie), len(sztuki)
+
+    # Prywatne sztuki "bez nart" (indeksy liczba_sztuk + i)
+    koszt_braku = MAKS_WSPOLCZYNNIK * (liczba_osob + 1)
+    for i in range(liczba_osob):
+        krawedzie[i].append((liczba_sztuk + i, koszt_braku, None, None))
+
+    # Węzły: 0..n-1 = osoby, n..n+m+n-1 = sztuki (z prywatnymi), ostatni = ujście
+    wszystkie_sztuki = liczba_sztuk + liczba_osob
+    UJSCIE = liczba_osob + wszystkie_sztuki
+    potencjal = [0.0] * (UJSCIE + 1)
+    sztuka_osoby = [None] * liczba_osob         # osoba -> indeks krawędzi w krawedzie[osoba]
+    osoba_sztuki = [None] * wszystkie_sztuki    # sztuka -> osoba
+
+    for zrodlo in range(liczba_osob):
+        # Dijkstra od nowej osoby w sieci residualnej ze zredukowanymi kosztami
+        odleglosc = {zrodlo: 0.0}
+        poprzednik = {}
+        zamkniete = set()
+        kolejka = [(0.0, zrodlo)]
+        while kolejka:
+            d, wezel = heapq.heappop(kolejka)
+            if wezel in zamkniete:
+                continue
+            zamkniete.add(wezel)
+            if wezel == UJSCIE:
+                break
+
+            if wezel < liczba_osob:
+                sasiedzi = [(liczba_osob + u, koszt, (wezel, k)) for k, (u, koszt, _, _) in enumerate(krawedzie[wezel])
+                            if k != sztuka_osoby[wezel]]
+            else:
+                i = osoba_sztuki[wezel - liczba_osob]
+                if i is None:
+                    sasiedzi = [(UJSCIE, 0.0, None)]
+                else:
+                    sasiedzi = [(i, -krawedzie[i][sztuka_osoby[i]][1], None)]
+
+            for cel, koszt, krawedz in sasiedzi:
+                if cel in zamkniete:
+                    continue
+                nowa = d + koszt + potencjal[wezel] - potencjal[cel]
+                if nowa < odleglosc.get(cel, float('inf')):
+                    odleglosc[cel] = nowa
+                    poprzednik[cel] = (wezel, krawedz)
+                    heapq.heappush(kolejka, (nowa, cel))
+
+        # Aktualizacja potencjałów - zredukowane koszty pozostają nieujemne
+        d_ujscia = odleglosc[UJSCIE]
+        for wezel in zamkniete:
+            potencjal[wezel] += odleglosc[wezel] - d_ujscia
+
+        # Powiększenie przydziału wzdłuż ścieżki
+        wezel = poprzednik[UJSCIE][0]
+        while wezel != zrodlo:
+            poprzedni, krawedz = poprzednik[wezel]
+            if krawedz is not None:
+                i, k = krawedz
+                sztuka_osoby[i] = k
+                osoba_sztuki[krawedzie[i][k][0]] = i
+            wezel = poprzedni
+
+    przydzial = []
+    for i, k in enumerate(sztuka_osoby):
+        u, _, kategoria, narta_info = krawedzie[i][k]
+        przydzial.append(None if narta_info is None else (kategoria, narta_info, sztuki[u][1]))
+
+    logger.info(f"Optymalny przydział: {sum(p is not None for p in przydzial)}/{liczba_osob} osób, {liczba_sztuk} sztuk")
+    return przydzial
@@ -0,0 +1,436 @@
+"""
+Moduł tablicy odpowiedzi
+Opcjonalny tryb serwera (main.py --serve --tablica-odpowiedzi), w którym dla każdej kombinacji danych
+klienta (styl, płeć, poziom, wzrost co 1 cm, waga co 1 kg) przeliczane są z góry numery
+K najlepszych nart i liczby nart w każdej kategorii wyników. Wyszukiwanie bez okresu
+(dobierz_narty_wyniki) jest wtedy odczytem z tablicy - szczegóły dopasowania liczone
+są tylko dla K nart, a pełne dobieranie dopiero dla strony wykraczającej poza K.
+
+Tablica zapisywana jest w pliki_danych/tablica_odpowiedzi jako skompresowane pliki .npz
+(jedna warstwa na styl, płeć i poziom) z manifestem opisującym bazę i profil oceny,
+dla których ją zbudowano. Po zmianie pojedynczych wierszy bazy przeliczane są tylko
+komórki w prostokątach tolerancji tych wierszy (przed i po zmianie).
+"""
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import fields
+
+import numpy as np
+
+from logika.dobieranie_nart import sprawdz_dopasowanie_narty, maksymalne_punkty, KATEGORIE
+from logika.indeks_klientow import PLCI_KLIENTA, POZIOMY, WZROST_MIN, WZROST_MAX, WAGA_MIN, WAGA_MAX
+from logika.ocena_dopasowania import compatibility_scorer
+from logika.profil_oceny import aktywny_profil
+from logika.wyniki_doboru import WynikiDoboru
+from narzedzia.instrumentacja import pomiar, trafienie
+
+logger = logging.getLogger(__name__)
+
+KATALOG_TABLICY = 'tablica_odpowiedzi'
+PLIK_MANIFESTU = 'manifest.json'
+
+# Liczba najlepszych nart zapamiętana w każdej kategorii - strona wyników (10, jak w oknie)
+K_NAJLEPSZYCH = 10
+
+# Największa liczba elementów tablic roboczych (narty x komórki) przy liczeniu fragmentu siatki
+MAKS_ELEMENTOW = 4_000_000
+
+# Liczba warstw trzymanych w pamięci (pozostałe wczytywane z dysku przy odczycie)
+PAMIEC_WARSTW = 24
+
+# Zmiana większej części bazy przebudowuje całą tablicę zamiast wybranych komórek
+PROG_PRZEBUDOWY = 0.2
+
+# Pola wiersza, od których zależy dopasowanie i ocena
+POLA_DOPASOWANIA = ('ID', 'POZIOM', 'PLEC', 'WAGA_MIN', 'WAGA_MAX', 'WZROST_MIN', 'WZROST_MAX', 'PRZEZNACZENIE')
+
+ZIELONY, POMARANCZOWY, CZERWONY = 0, 1, 2
+_BRAK = np.iinfo(np.int64).max
+
+def wiersz_dopasowania(row):
+    """Pola wiersza bazy istotne dla tablicy (do manifestu i porównania baz)"""
+    return [row.get(pole, '') for pole in POLA_DOPASOWANIA]
+
+def odcisk_profilu(profil):
+    """Parametry profilu oceny bez wersji - tablica jest ważna tylko dla tych samych"""
+    return json.dumps({pole.name: getattr(profil, pole.name) for pole in fields(profil)
+                       if pole.init and pole.name != 'wersja'}, sort_keys=True, ensure_ascii=False)
+
+def _os_kryterium(narty, kryterium, pole_min, pole_max, dolna, gorna, profil, tolerancja):
+    """Statusy i wyniki kryterium (narty x wartości klienta na osi siatki)"""
+    wartosci = np.arange(dolna, gorna + 1)
+    minimum = np.array([row[pole_min] for row in narty], dtype=np.int64).reshape(-1, 1)
+    maksimum = np.array([row[pole_max] for row in narty], dtype=np.int64).reshape(-1, 1)
+    status = np.full((len(narty), len(wartosci)), CZERWONY, dtype=np.int8)
+    status[(minimum - tolerancja <= wartosci) & (wartosci <= maksimum + tolerancja)] = POMARANCZOWY
+    status[(minimum <= wartosci) & (wartosci <= maksimum)] = ZIELONY
+    # Wyniki z wektorów scorera - te same liczby co przy zwykłym wyszukiwaniu
+    wyniki = np.array([compatibility_scorer.wektor_oceny(kryterium, row[pole_min], row[pole_max], profil)[dolna:gorna + 1]
+                       for row in narty], dtype=float).reshape(len(narty), len(wartosci))
+    return status, wyniki
+
+class _Skladniki:
+    """Dane nart niezależne od warstwy: statusy i wyniki wagi oraz wzrostu na osiach siatki"""
+
+    def __init__(self, narty, profil):
+        self.narty = narty
+        self.profil = profil
+        self.waga_status, self.waga_wynik = _os_kryterium(
+            narty, 'waga', 'WAGA_MIN', 'WAGA_MAX', WAGA_MIN, WAGA_MAX, profil, profil.tolerancja_wagi)
+        self.wzrost_status, self.wzrost_wynik = _os_kryterium(
+            narty, 'wzrost', 'WZROST_MIN', 'WZROST_MAX', WZROST_MIN, WZROST_MAX, profil, profil.tolerancja_wzrostu)
+        self.wagi = profil.wagi_kryteriow
+        # Suma wag w kolejności kryteriów jak w oblicz_wspolczynnik_idealnosci
+        self.suma_wag = 0.0
+        for kryterium in ('poziom', 'waga', 'wzrost', 'plec', 'przeznaczenie'):
+            self.suma_wag += self.wagi[kryterium]
+
+    def warstwa(self, styl, plec, poziom):
+        """Składniki warstwy na nartę: poziom, płeć i styl nie zależą od wagi i wzrostu klienta
+
+        Liczone zwykłym sprawdz_dopasowanie_narty w środku zakresów narty (tam waga i wzrost
+        są zielone), więc statusy i wyniki tych kryteriów są dokładnie jak przy wyszukiwaniu.
+        """
+        n = len(self.narty)
+        warstwa = {
+            'pasuje': np.zeros(n, dtype=bool), 'zielone': np.zeros(n, dtype=np.int8),
+            'nizej': np.zeros(n, dtype=bool), 'inna_plec': np.zeros(n, dtype=bool),
+            'poziom': np.zeros(n), 'plec': np.zeros(n), 'przeznaczenie': np.zeros(n),
+        }
+        for i, row in enumerate(self.narty):
+            narta_info = sprawdz_dopasowanie_narty(row, (row['WZROST_MIN'] + row['WZROST_MAX']) // 2,
+                                                   (row['WAGA_MIN'] + row['WAGA_MAX']) // 2, poziom, plec, styl,
+                                                   profil=self.profil)
+            if narta_info is None:
+                continue
+            plec_status, detale = narta_info['dopasowanie']['plec'], narta_info['detale_oceny']
+            warstwa['pasuje'][i] = True
+            # W środku zakresów waga i wzrost dają po zielonym punkcie - w komórkach liczone osobno
+            warstwa['zielone'][i] = narta_info['zielone_punkty'] - 2
+            warstwa['nizej'][i] = narta_info['poziom_niżej_kandydat']
+            warstwa['inna_plec'][i] = plec_status[1] != 'OK' and ('Narta męska' in plec_status[1] or
+                                                                  'Narta kobieca' in plec_status[1])
+            for kryterium in ('poziom', 'plec', 'przeznaczenie'):
+                warstwa[kryterium][i] = detale[kryterium]
+        return warstwa
+
+    def komorki(self, warstwa, max_punkty, k, wiersze, kolumny):
+        """K najlepszych nart i liczby nart w kategoriach dla fragmentu siatki
+
+        wiersze i kolumny to zakresy indeksów osi wzrostu i wagi. Zwraca (narty, liczby)
+        o kształtach (kategorie, k, wiersze, kolumny) i (kategorie, wiersze, kolumny).
+        """
+        ksztalt = (len(wiersze), len(kolumny))
+        najlepsze = np.full((len(KATEGORIE), k) + ksztalt, -1, dtype=np.int32)
+        liczby = np.zeros((len(KATEGORIE),) + ksztalt, dtype=np.int32)
+        aktywne = np.flatnonzero(warstwa['pasuje'])
+        if not len(aktywne):
+            return najlepsze, liczby
+
+        n = len(self.narty)
+        wagi = self.wagi
+        waga_status = self.waga_status[aktywne][:, kolumny]
+        waga_wynik = self.waga_wynik[aktywne][:, kolumny] * wagi['waga']
+        wiersze_fragmentu = max(1, MAKS_ELEMENTOW // (len(aktywne) * len(kolumny)))
+        for start in range(0, len(wiersze), wiersze_fragmentu):
+            czesc = wiersze[start:start + wiersze_fragmentu]
+            wzrost_status = self.wzrost_status[aktywne][:, czesc]
+            wzrost_wynik = self.wzrost_wynik[aktywne][:, czesc] * wagi['wzrost']
+
+            # Suma ważona w tej samej kolejności działań co oblicz_wspolczynnik_idealnosci
+            suma = (warstwa['poziom'][aktywne] * wagi['poziom'])[:, None, None] + waga_wynik[:, None, :]
+            suma = suma + wzrost_wynik[:, :, None]
+            suma = suma + (warstwa['plec'][aktywne] * wagi['plec'])[:, None, None]
+            suma = suma + (warstwa['przeznaczenie'][aktywne] * wagi['przeznaczenie'])[:, None, None]
+            wspolczynnik = (suma / self.suma_wag) * 100
+            dziesiate = _dziesiate(wspolczynnik)
+
+            punkty = (warstwa['zielone'][aktywne][:, None, None] + (waga_status == ZIELONY)[:, None, :] +
+                      (wzrost_status == ZIELONY)[:, :, None])
+            odrzucone = (waga_status == CZERWONY)[:, None, :] | (wzrost_status == CZERWONY)[:, :, None]
+            nizej = warstwa['nizej'][aktywne][:, None, None]
+            inna_plec = warstwa['inna_plec'][aktywne][:, None, None]
+            # Kategorie jak w kategoria_narty (-1 gdy narta nie trafia do wyników)
+            kategoria = np.select(
+                [odrzucone, nizej, inna_plec, punkty == max_punkty],
+                [-1,
+                 np.where(~inna_plec & (punkty == max_punkty - 1), KATEGORIE.index('poziom_za_nisko'), -1),
+                 np.where(punkty == max_punkty - 1, KATEGORIE.index('inna_plec'), -1),
+                 KATEGORIE.index('idealne')],
+                KATEGORIE.index('alternatywy'))
+
+            # Klucz: najwyższy współczynnik, przy remisie kolejność w bazie (jak stabilne sortowanie)
+            klucz_bazowy = (1000 - dziesiate) * n + aktywne[:, None, None]
+            for c in range(len(KATEGORIE)):
+                w_kategorii = kategoria == c
+                liczby[c, start:start + len(czesc)] = w_kategorii.sum(axis=0)
+                klucz = np.where(w_kategorii, klucz_bazowy, _BRAK)
+                if len(aktywne) > k:
+                    klucz = np.partition(klucz, k - 1, axis=0)[:k]
+                klucz = np.sort(klucz, axis=0)
+                najlepsze[c, :len(klucz), start:start + len(czesc)] = np.where(klucz < _BRAK, klucz % n, -1)
+        return najlepsze, liczby
+
+def _dziesiate(wspolczynnik):
+    """round(wspolczynnik, 1) * 10 jako liczby całkowite - dokładnie jak wbudowane round()
+
+    np.rint(x * 10) różni się od round(x, 1) tylko blisko połówek - te wartości liczone są w Pythonie.
+    """
+    razy10 = wspolczynnik * 10
+    dziesiate = np.rint(razy10).astype(np.int64)
+    blisko_polowki = np.abs(razy10 - np.floor(razy10) - 0.5) < 1e-6
+    for pozycja in zip(*np.nonzero(blisko_polowki)):
+        dziesiate[pozycja] = round(round(float(wspolczynnik[pozycja]), 1) * 10)
+    return dziesiate
+
+def _prostokat_tolerancji(wiersz, profil):
+    """Zakresy indeksów osi (wzrost, waga) komórek, na które wpływa wiersz bazy (None gdy poza siatką)"""
+    pola = dict(zip(POLA_DOPASOWANIA, wiersz))
+    w0 = max(int(pola['WZROST_MIN']) - profil.tolerancja_wzrostu, WZROST_MIN) - WZROST_MIN
+    w1 = min(int(pola['WZROST_MAX']) + profil.tolerancja_wzrostu, WZROST_MAX) - WZROST_MIN
+    k0 = max(int(pola['WAGA_MIN']) - profil.tolerancja_wagi, WAGA_MIN) - WAGA_MIN
+    k1 = min(int(pola['WAGA_MAX']) + profil.tolerancja_wagi, WAGA_MAX) - WAGA_MIN
+    if w0 > w1 or k0 > k1:
+        return None
+    return np.arange(w0, w1 + 1), np.arange(k0, k1 + 1)
+
+class TablicaOdpowiedzi:
+    """Przeliczone odpowiedzi dla całej siatki klientów, zapisane na dysku i wczytywane warstwami"""
+
+    def __init__(self, katalog=None, k=K_NAJLEPSZYCH):
+        if katalog is None:
+            from dane.wczytywanie_danych import katalog_danych
+            katalog = os.path.join(katalog_danych(), KATALOG_TABLICY)
+        self.katalog = katalog
+        self.k = k
+        self.manifest = self._wczytaj_manifest()
+        self._blokada = threading.Lock()
+        self._warstwy = OrderedDict()
+        self._narty = None              # baza (krotka wierszy), dla której tablica jest aktualna
+        self._wersja_profilu = None
+        self._watek = None
+
+    @staticmethod
+    def warstwy(style):
+        """Klucze warstw: (styl, płeć, poziom)"""
+        return [(styl, plec, poziom) for styl in style for plec in PLCI_KLIENTA for poziom in POZIOMY]
+
+    def sciezka_warstwy(self, style, warstwa):
+        styl, plec, poziom = warstwa
+        return os.path.join(self.katalog, f"{style.index(styl)}_{PLCI_KLIENTA.index(plec)}_{poziom}.npz")
+
+    def _wczytaj_manifest(self):
+        try:
+            with open(os.path.join(self.katalog, PLIK_MANIFESTU), encoding='utf-8') as plik:
+                return json.load(plik)
+        except (OSError, ValueError):
+            return None
+
+    def _zapisz_manifest(self, manifest):
+        sciezka = os.path.join(self.katalog, PLIK_MANIFESTU)
+        with open(sciezka + '.tmp', 'w', encoding='utf-8') as plik:
+            json.dump(manifest, plik, ensure_ascii=False)
+        os.replace(sciezka + '.tmp', sciezka)
+        self.manifest = manifest
+
+    def _zapisz_warstwe(self, sciezka, najlepsze, liczby, n):
+        typ = np.int16 if n < np.iinfo(np.int16).max else np.int32
+        tymczasowa = sciezka + '.tmp.npz'
+        np.savez_compressed(tymczasowa, narty=najlepsze.astype(typ), liczby=liczby.astype(typ))
+        os.replace(tymczasowa, sciezka)
+
+    def _czy_zgodna(self, wiersze, profil):
+        manifest = self.manifest
+        return bool(manifest and manifest['k'] == self.k and manifest['profil'] == odcisk_profilu(profil)
+                    and manifest['wiersze'] == wiersze)
+
+    def zbuduj(self, narty, profil=None):
+        """Przelicza całą tablicę dla bazy nart i zapisuje ją na dysku"""
+        from dane.lista_grupy import STYLE_JAZDY
+        profil = profil or aktywny_profil()
+        os.makedirs(self.katalog, exist_ok=True)
+        with pomiar('tablica_odpowiedzi_budowa'):
+            skladniki = _Skladniki(narty, profil)
+            wiersze, kolumny = np.arange(WZROST_MAX - WZROST_MIN + 1), np.arange(WAGA_MAX - WAGA_MIN + 1)
+            for warstwa in self.warstwy(STYLE_JAZDY):
+                styl = warstwa[0]
+                najlepsze, liczby = skladniki.komorki(skladniki.warstwa(*warstwa), maksymalne_punkty(styl), self.k,
+                                                      wiersze, kolumny)
+                self._zapisz_warstwe(self.sciezka_warstwy(STYLE_JAZDY, warstwa), najlepsze, liczby, len(narty))
+        self._zapisz_manifest({'k': self.k, 'style': list(STYLE_JAZDY), 'profil': odcisk_profilu(profil),
+                               'wiersze': [wiersz_dopasowania(row) for row in narty]})
+        logger.info(f"Zbudowano tablicę odpowiedzi: {len(narty)} nart, {len(self.warstwy(STYLE_JAZDY))} warstw")
+
+    def aktualizuj(self, narty, profil=None):
+        """Doprowadza tablicę do zgodności z bazą - przelicza tylko komórki zmienionych wierszy
+
+        Zwraca liczbę przeliczonych prostokątów (0 gdy tablica była aktualna, None przy pełnej budowie).
+        """
+        profil = profil or aktywny_profil()
+        nowe = [wiersz_dopasowania(row) for row in narty]
+        if self._czy_zgodna(nowe, profil):
+            return 0
+        manifest = self.manifest
+        if not manifest or manifest['k'] != self.k or manifest['profil'] != odcisk_profilu(profil):
+            self.zbuduj(narty, profil)
+            return None
+
+        stare = manifest['wiersze']
+        stare_id, nowe_id = [w[0] for w in stare], [w[0] for w in nowe]
+        stare_po_id, nowe_po_id = {w[0]: w for w in stare}, {w[0]: w for w in nowe}
+        niezmienione = {id_narty for id_narty, w in stare_po_id.items() if nowe_po_id.get(id_narty) == w}
+        zmienione = [w for w in stare + nowe if w[0] not in niezmienione]
+        kolejnosc_zachowana = ([i for i in stare_id if i in niezmienione] == [i for i in nowe_id if i in niezmienione])
+        if (len(set(stare_id)) != len(stare_id) or len(set(nowe_id)) != len(nowe_id) or not kolejnosc_zachowana
+                or len(zmienione) > PROG_PRZEBUDOWY * max(len(nowe), 1)):
+            self.zbuduj(narty, profil)
+            return None
+
+        # Numery nart w tablicy po zmianie bazy (-1 dla usuniętych - ich komórki są przeliczane)
+        pozycja_nowa = {id_narty: i for i, id_narty in enumerate(nowe_id)}
+        mapa = np.full(len(stare) + 1, -1, dtype=np.int64)
+        for i, id_narty in enumerate(stare_id):
+            if id_narty in niezmienione:
+                mapa[i] = pozycja_nowa[id_narty]
+        prostokaty = [p for p in (_prostokat_tolerancji(w, profil) for w in zmienione) if p is not None]
+
+        style = manifest['style']
+        skladniki = _Skladniki(narty, profil)
+        with pomiar('tablica_odpowiedzi_aktualizacja'):
+            for warstwa in self.warstwy(style):
+                sciezka = self.sciezka_warstwy(style, warstwa)
+                with np.load(sciezka) as dane:
+                    najlepsze, liczby = mapa[dane['narty'].astype(np.int64)], dane['liczby'].astype(np.int32)
+                skladniki_warstwy = skladniki.warstwa(*warstwa)
+                for wiersze, kolumny in prostokaty:
+                    fragment_narty, fragment_liczby = skladniki.komorki(
+                        skladniki_warstwy, maksymalne_punkty(warstwa[0]), self.k, wiersze, kolumny)
+                    najlepsze[:, :, wiersze[0]:wiersze[-1] + 1, kolumny[0]:kolumny[-1] + 1] = fragment_narty
+                    liczby[:, wiersze[0]:wiersze[-1] + 1, kolumny[0]:kolumny[-1] + 1] = fragment_liczby
+                self._zapisz_warstwe(sciezka, najlepsze, liczby, len(narty))
+        self._zapisz_manifest(dict(manifest, wiersze=nowe))
+        logger.info(f"Tablica odpowiedzi: przeliczono komórki {len(zmienione)} zmienionych wierszy "
+                    f"({len(prostokaty)} prostokątów)")
+        return len(prostokaty)
+
+    def aktualizuj_w_tle(self, narty):
+        """Uruchamia aktualizację w wątku w tle (najwyżej jedna naraz); do końca odczyty zwracają None"""
+        with self._blokada:
+            if self._watek is not None and self._watek.is_alive():
+                return self._watek
+            self._narty = None
+            self._warstwy.clear()
+            self._watek = threading.Thread(target=self._aktualizuj, args=(narty,), name='TablicaOdpowiedzi',
+                                           daemon=True)
+            self._watek.start()
+            return self._watek
+
+    def _aktualizuj(self, narty):
+        profil = aktywny_profil()
+        try:
+            self.aktualizuj(narty, profil)
+        except Exception as e:
+            logger.exception(f"Błąd budowy tablicy odpowiedzi: {e}")
+            return
+        with self._blokada:
+            self._narty, self._wersja_profilu = narty, profil.wersja
+
+    def aktualna(self, narty):
+        """Czy odczyty dla tej bazy i aktywnego profilu idą z tablicy"""
+        return self._narty is narty and self._wersja_profilu == aktywny_profil().wersja
+
+    def _warstwa(self, warstwa):
+        """Tablice warstwy (narty, liczby) - z pamięci lub z dysku (wywoływane z założoną _blokada)"""
+        tablice = self._warstwy.get(warstwa)
+        if tablice is None:
+            with np.load(self.sciezka_warstwy(self.manifest['style'], warstwa)) as dane:
+                tablice = (dane['narty'], dane['liczby'])
+            self._warstwy[warstwa] = tablice
+            while len(self._warstwy) > PAMIEC_WARSTW:
+                self._warstwy.popitem(last=False)
+        return tablice
+
+    def odpowiedz(self, narty, wzrost, waga, poziom, plec, styl):
+        """Odpowiedź z tablicy: ({kategoria: [narta_info, ...]}, {kategoria: liczba})
+
+        Zwraca None, gdy tablica nie jest aktualna dla bazy lub profilu (wtedy uruchamia
+        aktualizację w tle) albo profil klienta jest poza siatką - wywołujący dobiera zwykle.
+        """
+        styl = styl or 'Wszystkie'
+        profil = aktywny_profil()
+        # Sprawdzenie aktualności i odczyt warstwy pod jedną blokadą - aktualizacja w tle
+        # unieważnia tablicę pod tą blokadą, zanim zacznie nadpisywać pliki warstw
+        with self._blokada:
+            aktualna = self._narty is narty and self._wersja_profilu == profil.wersja
+            if aktualna:
+                if (plec not in PLCI_KLIENTA or poziom not in POZIOMY or styl not in self.manifest['style'] or
+                        not (WZROST_MIN <= wzrost <= WZROST_MAX and WAGA_MIN <= waga <= WAGA_MAX) or
+                        wzrost != int(wzrost) or waga != int(waga)):
+                    return None
+                najlepsze, liczby = self._warstwa((styl, plec, poziom))
+        if not aktualna:
+            trafienie('tablica_odpowiedzi', False)
+            self.przygotuj(narty)
+            return None
+
+        trafienie('tablica_odpowiedzi', True)
+        w, k = int(wzrost) - WZROST_MIN, int(waga) - WAGA_MIN
+        kategorie = {}
+        for c, kategoria in enumerate(KATEGORIE):
+            kategorie[kategoria] = [sprawdz_dopasowanie_narty(narty[i], wzrost, waga, poziom, plec, styl, profil=profil)
+                                    for i in najlepsze[c, :, w, k] if i >= 0]
+        return kategorie, {kategoria: int(liczby[c, w, k]) for c, kategoria in enumerate(KATEGORIE)}
+
+    def przygotuj(self, narty):
+        """Nowa baza lub profil: tablica z dysku może być nadal aktualna - inaczej aktualizacja w tle"""
+        profil = aktywny_profil()
+        if self._czy_zgodna([wiersz_dopasowania(row) for row in narty], profil):
+            with self._blokada:
+                # W trakcie aktualizacji w tle pliki warstw są nadpisywane - aktualną oznaczy ona sama
+                if self._watek is None or not self._watek.is_alive():
+                    self._narty, self._wersja_profilu = narty, profil.wersja
+        else:
+            self.aktualizuj_w_tle(narty)
+
+# Tablica aktywna w trybie --tablica-odpowiedzi (None gdy tryb wyłączony)
+tablica = None
+
+def wlacz(narty=None, katalog=None, k=K_NAJLEPSZYCH):
+    """Włącza tryb tablicy odpowiedzi; z podaną bazą od razu sprawdza lub buduje tablicę w tle"""
+    global tablica
+    tablica = TablicaOdpowiedzi(katalog, k)
+    if narty is not None:
+        tablica.przygotuj(narty)
+    logger.info(f"Tryb tablicy odpowiedzi włączony ({tablica.katalog}, K={k})")
+    return tablica
+
+def wlacz_w_tle(katalog=None, k=K_NAJLEPSZYCH):
+    """Włącza tryb i w wątku w tle wczytuje bazę z magazynu danych, po czym przygotowuje tablicę"""
+    def przygotuj():
+        from dane.magazyn_danych import magazyn
+        tablica.przygotuj(magazyn.dane()[0])
+
+    wlacz(katalog=katalog, k=k)
+    threading.Thread(target=przygotuj, name='TablicaOdpowiedziStart', daemon=True).start()
+    return tablica
+
+def wyniki(narty, wzrost, waga, poziom, plec, styl, klucz, limit, uzupelnij):
+    """WynikiDoboru z aktywnej tablicy albo None (tryb wyłączony, tablica nieaktualna)
+
+    Z tablicy podawana jest pierwsza strona (limit nart, bez limitu - wszystkie), gdy w każdej
+    kategorii mieści się w K przeliczonych nartach; dalsze strony dobiera uzupelnij().
+    """
+    if tablica is None:
+        return None
+    wynik = tablica.odpowiedz(narty, wzrost, waga, poziom, plec, styl)
+    if wynik is None:
+        return None
+    kategorie, liczby = wynik
+    if any(min(liczby[kategoria], limit or liczby[kategoria]) > len(lista) for kategoria, lista in kategorie.items()):
+        trafienie('tablica_odpowiedzi_strona', False)
+        return None
+    trafienie('tablica_odpowiedzi_strona', True)
+    return WynikiDoboru(klucz, limit, KATEGORIE, kategorie, liczby, uzupelnij)
@@ -0,0 +1,85 @@
+"""
+Moduł wyników doboru nart
+Przechowuje kandydatów z jednego wyszukiwania i wybiera najlepszych K
+w każdej kategorii przez selekcję kopcem (heapq), z dalszym stronicowaniem
+"""
+import heapq
+
+from narzedzia.instrumentacja import pomiar, trafienie
+
+class WynikiDoboru:
+    """Wyniki jednego wyszukiwania z podziałem na kategorie
+
+    Pełne posortowanie wykonywane jest tylko dla pokazanej części listy -
+    kolejne strony ("pokaż więcej") nie wymagają ponownego dobierania.
+    Wyniki można uzupełniać na bieżąco (dodaj) podczas strumieniowego dobierania.
+    """
+
+    def __init__(self, klucz_sortowania, limit=None, kategorie=(), kandydaci=None, liczby=None, uzupelnij=None):
+        """kandydaci: opcjonalny słownik kategoria -> lista narta_info w kolejności z bazy
+
+        liczby i uzupelnij podaje tablica odpowiedzi: kandydaci to wtedy tylko najlepsze narty,
+        liczby - liczby wszystkich nart w kategoriach, a uzupelnij() zwraca pełnych kandydatów
+        (wołane raz, gdy strona wykracza poza przeliczone narty).
+        """
+        self.kandydaci = {kategoria: [] for kategoria in kategorie}
+        self.kandydaci.update(kandydaci or {})
+        self.klucz_sortowania = klucz_sortowania
+        self.limit = limit
+        self._liczby = liczby
+        self._uzupelnij = uzupelnij
+        self._posortowane = {kategoria: [] for kategoria in self.kandydaci}
+        self._dodatkowe = {kategoria: 0 for kategoria in self.kandydaci}
+
+    def dodaj(self, kategoria, narta_info):
+        """Dodaje nartę do kategorii (kolejność dodawania rozstrzyga remisy)"""
+        self.kandydaci[kategoria].append(narta_info)
+        self._posortowane[kategoria] = []
+
+    def _pokazane(self, kategoria):
+        liczba = self.liczba(kategoria)
+        if self.limit is None:
+            return liczba
+        return min(self.limit + self._dodatkowe[kategoria], liczba)
+
+    def _najlepsze(self, kategoria, n):
+        """Zwraca n najlepszych nart z kategorii (posortowany prefiks jest zapamiętywany)"""
+        if self._uzupelnij is not None and n > len(self.kandydaci[kategoria]):
+            self.kandydaci.update(self._uzupelnij())
+            self._posortowane = {nazwa: [] for nazwa in self.kandydaci}
+            self._liczby = self._uzupelnij = None
+        lista = self.kandydaci[kategoria]
+        n = min(n, len(lista))
+        trafione = len(self._posortowane[kategoria]) >= n
+        trafienie('strony_wynikow', trafione)
+        if not trafione:
+            with pomiar('sortowanie'):
+                if n == len(lista):
+                    self._posortowane[kategoria] = sorted(lista, key=self.klucz_sortowania)
+                else:
+                    self._posortowane[kategoria] = heapq.nsmallest(n, lista, key=self.klucz_sortowania)
+        return self._posortowane[kategoria][:n]
+
+    def pokazane(self, kategoria):
+        """Zwraca aktualnie pokazane narty z kategorii (od najlepszej)"""
+        return self._najlepsze(kategoria, self._pokazane(kategoria))
+
+    def pokaz_wiecej(self, kategoria, ile=None):
+        """Odsłania kolejną stronę kategorii i zwraca tylko nowo pokazane narty"""
+        poprzednio = self._pokazane(kategoria)
+        self._dodatkowe[kategoria] += ile or self.limit or 0
+        return self._najlepsze(kategoria, self._pokazane(kategoria))[poprzednio:]
+
+    def liczba(self, kategoria):
+        """Liczba wszystkich nart znalezionych w kategorii"""
+        if self._liczby is not None:
+            return self._liczby[kategoria]
+        return len(self.kandydaci[kategoria])
+
+    def ukryte(self, kategoria):
+        """Liczba nart w kategorii, które nie zostały jeszcze pokazane"""
+        return self.liczba(kategoria) - self._pokazane(kategoria)
+
+    def jako_krotka(self):
+        """Zwraca pokazane narty jako krotkę list w kolejności kategorii"""
+        return tuple(self.pokazane(kategoria) for kategoria in self.kandydaci)
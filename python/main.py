@@ -1,45 +1,97 @@
 """
 Asystent Doboru Nart v6.0 - Modularna wersja
 Główny plik uruchamiający aplikację
+
+Użycie:
+    python main.py                     - aplikacja okienkowa
+    python main.py --serve [--port N]  - serwer HTTP/JSON bez interfejsu
+    python main.py --serve --tablica-odpowiedzi - jak wyżej, wyszukiwania bez okresu z przeliczonej tablicy
 """
 import sys
 import os
-from PyQt5.QtWidgets import QApplication
+import argparse
 
 # Dodaj ścieżki do modułów
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import modułów
 from narzedzia.konfiguracja_logowania import setup_logging
-from interfejs.okno_glowne import SkiApp
+from narzedzia import instrumentacja, profiler
+
+def parsuj_argumenty(argv=None):
+    """Parsuje argumenty wiersza poleceń"""
+    parser = argparse.ArgumentParser(description="Asystent Doboru Nart")
+    parser.add_argument('--serve', action='store_true', help="uruchom serwer HTTP/JSON zamiast okna")
+    parser.add_argument('--host', default='127.0.0.1', help="adres serwera (domyślnie 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="port serwera (domyślnie 8765)")
+    parser.add_argument('--diagnostyka', action='store_true', help="zbieraj statystyki wydajności od startu")
+    parser.add_argument('--profiluj', type=int, nargs='?', const=0, metavar='N',
+                        help="profiluj N kolejnych wyszukiwań (bez N - całą sesję; cProfile tylko w wątku głównym, próbki stosów ze wszystkich wątków); pliki w logi/")
+    parser.add_argument('--profiler', choices=profiler.TRYBY, default='cprofile',
+                        help="cprofile (pełne statystyki) lub probkowanie (niski narzut)")
+    parser.add_argument('--tablica-odpowiedzi', action='store_true',
+                        help="z --serve: odpowiadaj na wyszukiwania bez okresu z przeliczonej tablicy (budowana w tle)")
+    args, _ = parser.parse_known_args(argv)
+    if args.tablica_odpowiedzi and not args.serve:
+        parser.error("--tablica-odpowiedzi działa tylko z --serve (wyszukiwania w oknie zawsze mają okres)")
+    return args
+
+def uruchom_okno(logger):
+    """Uruchamia aplikację okienkową"""
+    from PyQt5.QtWidgets import QApplication
+    from interfejs.okno_glowne import SkiApp
 
-def main():
-    """Główna funkcja aplikacji"""
-    # Skonfiguruj logowanie
-    logger = setup_logging()
-    logger.info("Uruchamianie Asystenta Doboru Nart v6.0")
-    
     # Utwórz aplikację Qt
     app = QApplication(sys.argv)
-    
+
     # Ustawienia aplikacji
     app.setApplicationName("Asystent Doboru Nart")
     app.setApplicationVersion("6.0")
     app.setOrganizationName("WYPAS Ski Rental")
-    
+
     try:
         # Stwórz i pokaż główne okno
         window = SkiApp()
         window.show()
-        
+
         logger.info("Aplikacja uruchomiona pomyślnie")
-        
+
         # Uruchom aplikację
         sys.exit(app.exec_())
-        
+
     except Exception as e:
         logger.error(f"Błąd podczas uruchamiania aplikacji: {e}")
         raise
 
+def main():
+    """Główna funkcja aplikacji"""
+    args = parsuj_argumenty()
+
+    # Skonfiguruj logowanie
+    logger = setup_logging()
+    logger.info("Uruchamianie Asystenta Doboru Nart v6.0")
+    
+    # Statystyki wydajności: okresowe podsumowanie w logu (gdy pomiary włączone)
+    if args.diagnostyka:
+        instrumentacja.wlacz()
+    instrumentacja.OkresowePodsumowanie().start()
+    
+    # Profilowanie na żądanie (pliki .prof i .folded w logi/)
+    if args.profiluj == 0:
+        profiler.profiluj_sesje(args.profiler)
+    elif args.profiluj:
+        profiler.profiluj_wyszukiwania(args.profiluj, args.profiler)
+
+    # Tablica odpowiedzi: sprawdzenie lub budowa w tle po wczytaniu bazy
+    if args.tablica_odpowiedzi:
+        from logika import tablica_odpowiedzi
+        tablica_odpowiedzi.wlacz_w_tle()
+
+    if args.serve:
+        from serwis.serwer_http import uruchom_serwer
+        uruchom_serwer(args.host, args.port)
+    else:
+        uruchom_okno(logger)
+
 if __name__ == "__main__":
     main()
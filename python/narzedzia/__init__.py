@@ -3,6 +3,8 @@ narzedzia - moduł projektu Asystent Doboru Nart
 Zawiera narzędzia pomocnicze i konfigurację
 """
 
-from narzedzia.konfiguracja_logowania import setup_logging, get_logger
+from narzedzia.konfiguracja_logowania import setup_logging, get_logger, katalog_logow
+from narzedzia.obserwator_plikow import ObserwatorPlikow
+from narzedzia import instrumentacja, profiler
 
-__all__ = ['setup_logging', 'get_logger']
+__all__ = ['setup_logging', 'get_logger', 'katalog_logow', 'ObserwatorPlikow', 'instrumentacja', 'profiler']
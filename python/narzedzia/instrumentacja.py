@@ -0,0 +1,201 @@
+"""
+Moduł instrumentacji gorących ścieżek
+Zbiera czasy etapów (wczytanie bazy, rezerwacji, dopasowanie z oceną, sortowanie,
+wyświetlanie) w histogramach w pamięci oraz współczynniki trafień pamięci podręcznych.
+Wyłączona instrumentacja kosztuje jedno sprawdzenie flagi na wywołanie.
+
+Użycie:
+    with pomiar('dopasowanie'):
+        ...
+
+    @mierzony('wczytanie_bazy')
+    def wczytaj_narty(): ...
+
+    trafienie('magazyn', True)
+
+    dodaj_raport('plan_dopasowania', planista.opis)
+"""
+import os
+import time
+import bisect
+import logging
+import threading
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+# Górne granice przedziałów histogramu w sekundach (10 µs ... ~84 s, co 2x)
+GRANICE_PRZEDZIALOW = tuple(1e-5 * 2 ** i for i in range(24))
+
+# Domyślny odstęp okresowego podsumowania w logu (sekundy)
+INTERWAL_PODSUMOWANIA = 300
+
+_wlaczona = os.environ.get('NARTY_DIAGNOSTYKA', '') not in ('', '0')
+_blokada = threading.Lock()
+_histogramy = {}
+_trafienia = {}
+_raporty = {}
+
+class Histogram:
+    """Histogram czasów w przedziałach logarytmicznych"""
+
+    def __init__(self):
+        self.przedzialy = [0] * (len(GRANICE_PRZEDZIALOW) + 1)
+        self.liczba = 0
+        self.suma = 0.0
+        self.minimum = float('inf')
+        self.maksimum = 0.0
+
+    def dodaj(self, sekundy):
+        self.przedzialy[bisect.bisect_left(GRANICE_PRZEDZIALOW, sekundy)] += 1
+        self.liczba += 1
+        self.suma += sekundy
+        self.minimum = min(self.minimum, sekundy)
+        self.maksimum = max(self.maksimum, sekundy)
+
+    def percentyl(self, p):
+        """Przybliżony percentyl (górna granica przedziału, nie więcej niż maksimum)"""
+        if not self.liczba:
+            return 0.0
+        prog = p / 100 * self.liczba
+        narastajaco = 0
+        for i, liczba in enumerate(self.przedzialy):
+            narastajaco += liczba
+            if narastajaco >= prog:
+                granica = GRANICE_PRZEDZIALOW[i] if i < len(GRANICE_PRZEDZIALOW) else self.maksimum
+                return min(granica, self.maksimum)
+        return self.maksimum
+
+    def podsumowanie(self):
+        """Słownik z liczbą wywołań i czasami w milisekundach"""
+        return {
+            'liczba': self.liczba,
+            'suma_ms': self.suma * 1000,
+            'srednia_ms': self.suma / self.liczba * 1000 if self.liczba else 0.0,
+            'min_ms': self.minimum * 1000 if self.liczba else 0.0,
+            'p50_ms': self.percentyl(50) * 1000,
+            'p95_ms': self.percentyl(95) * 1000,
+            'max_ms': self.maksimum * 1000,
+        }
+
+def wlacz(wlaczona=True):
+    """Włącza lub wyłącza zbieranie pomiarów"""
+    global _wlaczona
+    _wlaczona = wlaczona
+    logger.info(f"Instrumentacja {'włączona' if wlaczona else 'wyłączona'}")
+
+def wlaczona():
+    """Czy pomiary są zbierane"""
+    return _wlaczona
+
+def zapisz_czas(etap, sekundy):
+    """Dodaje czas etapu do histogramu"""
+    with _blokada:
+        histogram = _histogramy.get(etap)
+        if histogram is None:
+            histogram = _histogramy[etap] = Histogram()
+        histogram.dodaj(sekundy)
+
+def trafienie(pamiec, trafione):
+    """Zapisuje trafienie (True) lub chybienie (False) pamięci podręcznej"""
+    if not _wlaczona:
+        return
+    with _blokada:
+        licznik = _trafienia.setdefault(pamiec, [0, 0])
+        licznik[0 if trafione else 1] += 1
+
+def dodaj_raport(nazwa, funkcja):
+    """Rejestruje funkcję zwracającą jednoliniowy opis stanu (np. planu dopasowania) do statystyk"""
+    _raporty[nazwa] = funkcja
+
+class _Pomiar:
+    __slots__ = ('etap', 'start')
+
+    def __init__(self, etap):
+        self.etap = etap
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        zapisz_czas(self.etap, time.perf_counter() - self.start)
+
+class _BezPomiaru:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+_BEZ_POMIARU = _BezPomiaru()
+
+def pomiar(etap):
+    """Menedżer kontekstu mierzący czas bloku (bez kosztu, gdy instrumentacja wyłączona)"""
+    return _Pomiar(etap) if _wlaczona else _BEZ_POMIARU
+
+def mierzony(etap):
+    """Dekorator mierzący czas wywołań funkcji"""
+    def dekorator(funkcja):
+        @wraps(funkcja)
+        def opakowanie(*args, **kwargs):
+            if not _wlaczona:
+                return funkcja(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return funkcja(*args, **kwargs)
+            finally:
+                zapisz_czas(etap, time.perf_counter() - start)
+        return opakowanie
+    return dekorator
+
+def statystyki():
+    """Zwraca migawkę pomiarów: {'etapy': {etap: podsumowanie}, 'pamiec': {nazwa: trafienia},
+    'raporty': {nazwa: opis}}"""
+    with _blokada:
+        etapy = {etap: histogram.podsumowanie() for etap, histogram in _histogramy.items()}
+        pamiec = {nazwa: {'trafienia': t, 'chybienia': c, 'wspolczynnik': t / (t + c) if t + c else 0.0}
+                  for nazwa, (t, c) in _trafienia.items()}
+    raporty = {nazwa: funkcja() for nazwa, funkcja in _raporty.items()}
+    return {'etapy': etapy, 'pamiec': pamiec, 'raporty': raporty}
+
+def wyczysc():
+    """Usuwa zebrane pomiary"""
+    with _blokada:
+        _histogramy.clear()
+        _trafienia.clear()
+
+def podsumowanie_tekst():
+    """Jednoliniowe podsumowanie pomiarów do logu (pusty tekst, gdy brak pomiarów)"""
+    dane = statystyki()
+    czesci = [f"{etap}: n={s['liczba']} śr={s['srednia_ms']:.1f}ms p95={s['p95_ms']:.1f}ms"
+              for etap, s in sorted(dane['etapy'].items())]
+    czesci += [f"{nazwa}: trafienia {s['wspolczynnik']:.0%} ({s['trafienia']}/{s['trafienia'] + s['chybienia']})"
+               for nazwa, s in sorted(dane['pamiec'].items())]
+    if czesci:
+        czesci += [f"{nazwa}: {opis}" for nazwa, opis in sorted(dane['raporty'].items())]
+    return " | ".join(czesci)
+
+class OkresowePodsumowanie:
+    """Wątek w tle zapisujący podsumowanie pomiarów do logu co interwal sekund"""
+
+    def __init__(self, interwal=INTERWAL_PODSUMOWANIA):
+        self.interwal = interwal
+        self._stop = threading.Event()
+        self._watek = threading.Thread(target=self._petla, name='PodsumowanieInstrumentacji', daemon=True)
+
+    def start(self):
+        self._watek.start()
+        return self
+
+    def zatrzymaj(self):
+        self._stop.set()
+
+    def _petla(self):
+        while not self._stop.wait(self.interwal):
+            if _wlaczona:
+                tekst = podsumowanie_tekst()
+                if tekst:
+                    logger.info(f"Statystyki wydajności: {tekst}")
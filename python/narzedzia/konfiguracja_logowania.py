@@ -1,32 +1,107 @@
 """
 Moduł konfiguracji systemu logowania
-Ustawia logi aplikacji z odpowiednim formatowaniem
+Ustawia logi aplikacji z odpowiednim formatowaniem. Zapis do pliku i konsoli
+odbywa się w osobnym wątku (QueueHandler/QueueListener), więc wywołanie
+loggera w wątku interfejsu nie czeka na dysk (np. udział sieciowy).
 """
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 
-def setup_logging():
-    """Konfiguruje system logowania"""
-    # Sprawdź czy folder logi istnieje
+# Rotacja pliku logów: rozmiar jednego pliku i liczba kopii
+MAKS_ROZMIAR_LOGU = 5 * 1024 * 1024
+LICZBA_KOPII_LOGU = 5
+
+# Okno czasowe (sekundy), w którym powtórzone ostrzeżenie jest pomijane
+OKNO_POWTORZEN = 60
+
+_sluchacz = None
+_handler_kolejki = None
+
+def katalog_logow():
+    """Zwraca katalog logi (tworzy go, jeśli nie istnieje)"""
     current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     log_dir = os.path.join(current_dir, 'logi')
-    
+
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
-    
-    # Ścieżka do pliku logów
-    log_file = os.path.join(log_dir, 'aplikacja_narty.log')
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
+    return log_dir
+
+class FiltrPowtorzen(logging.Filter):
+    """Pomija ostrzeżenia i błędy o tej samej treści powtórzone w oknie czasowym
+
+    Po upływie okna kolejne wystąpienie przechodzi z dopiskiem, ile razy pominięto.
+    """
+
+    def __init__(self, okno=OKNO_POWTORZEN, poziom=logging.WARNING, maks_wpisow=1000):
+        super().__init__()
+        self.okno = okno
+        self.poziom = poziom
+        self.maks_wpisow = maks_wpisow
+        self._blokada = threading.Lock()
+        self._ostatnie = {}   # (logger, poziom, treść) -> [czas, pominięte]
+
+    def filter(self, record):
+        if record.levelno < self.poziom:
+            return True
+        klucz = (record.name, record.levelno, record.getMessage())
+        teraz = time.monotonic()
+        with self._blokada:
+            wpis = self._ostatnie.get(klucz)
+            if wpis is not None and teraz - wpis[0] < self.okno:
+                wpis[1] += 1
+                return False
+            if len(self._ostatnie) >= self.maks_wpisow:
+                self._ostatnie.clear()
+            self._ostatnie[klucz] = [teraz, 0]
+        if wpis is not None and wpis[1]:
+            record.msg = f"{record.getMessage()} (pominięto {wpis[1]} powtórzeń)"
+            record.args = None
+        return True
+
+def setup_logging():
+    """Konfiguruje system logowania (plik z rotacją i konsola przez kolejkę w tle)"""
+    global _sluchacz, _handler_kolejki
+
+    if _sluchacz is None:
+        # Ścieżka do pliku logów
+        log_file = os.path.join(katalog_logow(), 'aplikacja_narty.log')
+
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        handlers = [
+            logging.handlers.RotatingFileHandler(log_file, maxBytes=MAKS_ROZMIAR_LOGU,
+                                                 backupCount=LICZBA_KOPII_LOGU, encoding='utf-8'),
             logging.StreamHandler()
         ]
-    )
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        kolejka = queue.SimpleQueue()
+        _handler_kolejki = logging.handlers.QueueHandler(kolejka)
+        _handler_kolejki.addFilter(FiltrPowtorzen())
+
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        root.addHandler(_handler_kolejki)
+
+        _sluchacz = logging.handlers.QueueListener(kolejka, *handlers, respect_handler_level=True)
+        _sluchacz.start()
+        atexit.register(zatrzymaj_logowanie)
     return logging.getLogger(__name__)
 
+def zatrzymaj_logowanie():
+    """Zapisuje zaległe wpisy z kolejki i zatrzymuje wątek logowania"""
+    global _sluchacz, _handler_kolejki
+    if _sluchacz is not None:
+        logging.getLogger().removeHandler(_handler_kolejki)
+        _sluchacz.stop()
+        _sluchacz = None
+        _handler_kolejki = None
+
 def get_logger(name):
     """Zwraca logger o określonej nazwie"""
     return logging.getLogger(name)
@@ -0,0 +1,145 @@
+"""
+Moduł obserwatora plików
+Wykrywa nowe lub zmienione pliki w katalogu (inotify na Linuksie, w pozostałych
+systemach sprawdzanie czasu modyfikacji) i zgłasza je dopiero, gdy zapis się
+zakończy - rozmiar i czas modyfikacji nie zmieniają się przez czas_stabilizacji
+"""
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Stałe inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+ZDARZENIE_INOTIFY = struct.Struct('iIII')
+
+def _podpis(sciezka):
+    """Rozmiar i czas modyfikacji pliku (None gdy plik nie istnieje)"""
+    try:
+        stat = os.stat(sciezka)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+class _Inotify:
+    """Minimalne powiązanie z inotify przez ctypes"""
+
+    def __init__(self, katalog):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        maska = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(katalog), maska) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch")
+
+    def czekaj(self, limit_czasu):
+        """Czeka na zdarzenia najwyżej limit_czasu sekund - zwraca nazwy zmienionych plików"""
+        gotowe, _, _ = select.select([self.fd], [], [], limit_czasu)
+        if not gotowe:
+            return set()
+        try:
+            bufor = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        nazwy = set()
+        pozycja = 0
+        while pozycja + ZDARZENIE_INOTIFY.size <= len(bufor):
+            _, _, _, dlugosc = ZDARZENIE_INOTIFY.unpack_from(bufor, pozycja)
+            pozycja += ZDARZENIE_INOTIFY.size
+            nazwy.add(os.fsdecode(bufor[pozycja:pozycja + dlugosc].rstrip(b'\0')))
+            pozycja += dlugosc
+        return nazwy
+
+    def zamknij(self):
+        os.close(self.fd)
+
+class ObserwatorPlikow:
+    """Obserwuje wybrane pliki w katalogu i wywołuje callback(nazwy) po zakończeniu ich zapisu
+
+    Callback wywoływany jest w wątku obserwatora, więc nie może dotykać interfejsu Qt.
+    """
+
+    def __init__(self, katalog, pliki, callback, interwal=1.0, czas_stabilizacji=1.0):
+        self.katalog = katalog
+        self.pliki = set(pliki)
+        self.callback = callback
+        self.interwal = interwal
+        self.czas_stabilizacji = czas_stabilizacji
+        self._stop = threading.Event()
+        self._watek = None
+        self._inotify = None
+        # Stan znany przy starcie i pliki oczekujące na zakończenie zapisu: nazwa -> (podpis, od kiedy)
+        self._podpisy = {}
+        self._oczekujace = {}
+
+    def start(self):
+        """Uruchamia obserwację w wątku w tle"""
+        self._podpisy = {nazwa: _podpis(os.path.join(self.katalog, nazwa)) for nazwa in self.pliki}
+        if sys.platform.startswith('linux'):
+            try:
+                self._inotify = _Inotify(self.katalog)
+            except (OSError, AttributeError) as e:
+                logger.warning(f"inotify niedostępne, sprawdzanie co {self.interwal} s: {e}")
+        self._watek = threading.Thread(target=self._petla, name='ObserwatorPlikow', daemon=True)
+        self._watek.start()
+        logger.info(f"Obserwacja {', '.join(sorted(self.pliki))} w {self.katalog} "
+                    f"({'inotify' if self._inotify else 'sprawdzanie czasu modyfikacji'})")
+        return self
+
+    def zatrzymaj(self):
+        """Zatrzymuje obserwację"""
+        self._stop.set()
+        if self._watek is not None:
+            self._watek.join()
+            self._watek = None
+        if self._inotify is not None:
+            self._inotify.zamknij()
+            self._inotify = None
+
+    def _zmienione(self):
+        """Nazwy obserwowanych plików, które mogły się zmienić od ostatniego sprawdzenia"""
+        if self._inotify is not None:
+            limit_czasu = self.interwal if not self._oczekujace else min(self.interwal, self.czas_stabilizacji / 4)
+            return self._inotify.czekaj(limit_czasu) & self.pliki
+        self._stop.wait(self.interwal)
+        return {nazwa for nazwa in self.pliki
+                if _podpis(os.path.join(self.katalog, nazwa)) != self._podpisy.get(nazwa)}
+
+    def _petla(self):
+        while not self._stop.is_set():
+            try:
+                for nazwa in self._zmienione() - self._oczekujace.keys():
+                    self._oczekujace[nazwa] = (_podpis(os.path.join(self.katalog, nazwa)), time.monotonic())
+
+                gotowe = set()
+                teraz = time.monotonic()
+                for nazwa, (podpis, od_kiedy) in list(self._oczekujace.items()):
+                    aktualny = _podpis(os.path.join(self.katalog, nazwa))
+                    if aktualny != podpis:
+                        self._oczekujace[nazwa] = (aktualny, teraz)
+                    elif teraz - od_kiedy >= self.czas_stabilizacji:
+                        del self._oczekujace[nazwa]
+                        if aktualny is not None and aktualny != self._podpisy.get(nazwa):
+                            self._podpisy[nazwa] = aktualny
+                            gotowe.add(nazwa)
+
+                if gotowe:
+                    logger.info(f"Wykryto nowe pliki: {', '.join(sorted(gotowe))}")
+                    self.callback(gotowe)
+            except Exception as e:
+                logger.error(f"Błąd obserwatora plików: {e}")
@@ -0,0 +1,178 @@
+"""
+Moduł profilowania na żądanie
+Profiluje całą sesję albo N kolejnych wyszukiwań przez cProfile lub profiler
+próbkujący i zapisuje do logi/ plik .prof (cProfile) oraz plik stosów w formacie
+"collapsed" (.folded) do narysowania flamegraph (flamegraph.pl, speedscope)
+"""
+import os
+import sys
+import atexit
+import cProfile
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+from narzedzia.konfiguracja_logowania import katalog_logow
+
+logger = logging.getLogger(__name__)
+
+TRYBY = ('cprofile', 'probkowanie')
+
+# Odstęp między próbkami stosu (sekundy)
+INTERWAL_PROBKOWANIA = 0.005
+
+def _opis_ramki(ramka):
+    kod = ramka.f_code
+    return f"{kod.co_name} ({os.path.basename(kod.co_filename)}:{kod.co_firstlineno})"
+
+class Profiler:
+    """Profiler z wstrzymywaniem - mierzy tylko wątki, w których wywołano wznow()
+
+    Tryb 'cprofile' zbiera pełne statystyki wywołań (.prof) i próbki stosów,
+    tryb 'probkowanie' tylko próbki stosów (niski narzut).
+    Z wszystkie_watki próbki stosów obejmują każdy wątek procesu (np. wątki
+    wykonawcy serwera) - cProfile nadal mierzy tylko wątki z wznow().
+    """
+
+    def __init__(self, tryb='cprofile', interwal=INTERWAL_PROBKOWANIA, wszystkie_watki=False):
+        if tryb not in TRYBY:
+            raise ValueError(f"Nieznany tryb profilowania: {tryb} (dostępne: {', '.join(TRYBY)})")
+        self.tryb = tryb
+        self.interwal = interwal
+        self.profil = cProfile.Profile() if tryb == 'cprofile' else None
+        self.stosy = Counter()
+        self.poczatek = datetime.now()
+        self.wszystkie_watki = wszystkie_watki
+        self._watki = set()
+        self._stop = threading.Event()
+        self._probkowanie = threading.Thread(target=self._probkuj, name='ProfilerProbkujacy', daemon=True)
+        self._probkowanie.start()
+
+    def wznow(self):
+        """Włącza profilowanie bieżącego wątku"""
+        self._watki.add(threading.get_ident())
+        if self.profil is not None:
+            self.profil.enable()
+
+    def wstrzymaj(self):
+        """Wyłącza profilowanie bieżącego wątku"""
+        if self.profil is not None:
+            self.profil.disable()
+        self._watki.discard(threading.get_ident())
+
+    def _probkuj(self):
+        wlasny = threading.get_ident()
+        while not self._stop.wait(self.interwal):
+            ramki = sys._current_frames()
+            watki = [ident for ident in ramki if ident != wlasny] if self.wszystkie_watki else tuple(self._watki)
+            if not watki:
+                continue
+            for ident in watki:
+                ramka = ramki.get(ident)
+                stos = []
+                while ramka is not None:
+                    stos.append(_opis_ramki(ramka))
+                    ramka = ramka.f_back
+                if stos:
+                    self.stosy[';'.join(reversed(stos))] += 1
+
+    def zapisz(self, katalog=None):
+        """Kończy profilowanie i zapisuje pliki - zwraca listę ścieżek"""
+        self._stop.set()
+        self._probkowanie.join()
+        katalog = katalog or katalog_logow()
+        podstawa = os.path.join(katalog, f"profil_{self.poczatek:%Y%m%d_%H%M%S}")
+
+        sciezki = []
+        if self.profil is not None:
+            self.profil.dump_stats(f"{podstawa}.prof")
+            sciezki.append(f"{podstawa}.prof")
+        with open(f"{podstawa}.folded", 'w', encoding='utf-8') as plik:
+            for stos, liczba in self.stosy.most_common():
+                plik.write(f"{stos} {liczba}\n")
+        sciezki.append(f"{podstawa}.folded")
+
+        logger.info(f"Zapisano profil ({self.tryb}, {sum(self.stosy.values())} próbek): {', '.join(sciezki)}")
+        return sciezki
+
+# Aktywne profilowanie: cała sesja albo pozostała liczba wyszukiwań
+_blokada = threading.Lock()
+_profiler = None
+_pozostalo = None
+
+def aktywne():
+    """Czy trwa profilowanie"""
+    return _profiler is not None
+
+def profiluj_sesje(tryb='cprofile'):
+    """Profiluje sesję do końca (pliki zapisywane przy wyjściu lub w zakoncz)
+
+    cProfile działa tylko w wątku wywołującym - wyszukiwania serwera (--serve) wykonywane
+    w wątkach wykonawcy trafiają wyłącznie do próbek stosów (.folded), które obejmują
+    wszystkie wątki; dla serwera wystarcza tryb 'probkowanie'.
+    """
+    global _profiler, _pozostalo
+    with _blokada:
+        if _profiler is not None:
+            return
+        _profiler, _pozostalo = Profiler(tryb, wszystkie_watki=True), None
+        _profiler.wznow()
+    atexit.register(zakoncz)
+    logger.info(f"Profilowanie całej sesji ({tryb})")
+
+def profiluj_wyszukiwania(liczba, tryb='cprofile'):
+    """Profiluje liczba kolejnych wyszukiwań, potem zapisuje pliki"""
+    global _profiler, _pozostalo
+    with _blokada:
+        if _profiler is not None:
+            return
+        _profiler, _pozostalo = Profiler(tryb), liczba
+    logger.info(f"Profilowanie {liczba} kolejnych wyszukiwań ({tryb})")
+
+def zakoncz():
+    """Kończy profilowanie i zapisuje pliki - zwraca listę ścieżek (pusta, gdy nie profilowano)"""
+    global _profiler, _pozostalo
+    with _blokada:
+        profiler, _profiler, _pozostalo = _profiler, None, None
+    if profiler is None:
+        return []
+    profiler.wstrzymaj()
+    return profiler.zapisz()
+
+@contextmanager
+def wyszukiwanie():
+    """Profiluje blok jednego wyszukiwania, jeśli włączono profilowanie wyszukiwań
+
+    Wyszukiwania profilowane są pojedynczo - równoległe (serwer) w tym czasie pomijane.
+    """
+    global _pozostalo
+    profiler = _profiler
+    if profiler is None or _pozostalo is None or not _blokada.acquire(blocking=False):
+        yield
+        return
+    try:
+        profiler.wznow()
+        try:
+            yield
+        finally:
+            profiler.wstrzymaj()
+        if _pozostalo is not None:
+            _pozostalo -= 1
+            koniec = _pozostalo <= 0
+        else:
+            koniec = False
+    finally:
+        _blokada.release()
+    if koniec:
+        zakoncz()
+
+def profilowane(funkcja):
+    """Dekorator - wywołanie funkcji liczy się jako jedno profilowane wyszukiwanie"""
+    @wraps(funkcja)
+    def opakowanie(*args, **kwargs):
+        with wyszukiwanie():
+            return funkcja(*args, **kwargs)
+    return opakowanie
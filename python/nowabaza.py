@@ -2,714 +2,28 @@
 # System doboru nart z integracją FireSnow
 
 import sys
-import csv
-import pandas as pd
-from datetime import datetime, timedelta
 import os
-import logging
-import math
+import bisect
+from collections import Counter
+from datetime import datetime, timedelta
+import pandas as pd
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, 
                              QLineEdit, QComboBox, QRadioButton, QTextEdit,
                              QTableWidget, QTableWidgetItem,
                              QFrame, QGroupBox, QMessageBox, QCalendarWidget, QDialog)
 from PyQt5.QtCore import Qt, QRegExp
-from PyQt5.QtGui import QFont, QPixmap, QColor, QRegExpValidator
-
-# ===== KONFIGURACJA LOGOWANIA =====
-def setup_logging():
-    """Konfiguruje system logowania"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('aplikacja_narty.log', encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
-    return logging.getLogger(__name__)
-
-logger = setup_logging()
-
-# ===== SYSTEM WSPÓŁCZYNNIKA IDEALNOŚCI I WAG =====
-class CompatibilityScorer:
-    """Klasa do obliczania współczynnika idealności dopasowania nart"""
-    
-    def __init__(self):
-        # Domyślne wagi kryteriów (suma = 1.0)
-        self.wagi_kryteriow = {
-            'poziom': 0.35,      # 35% - Najważniejsze (bezpieczeństwo)
-            'waga': 0.25,        # 25% - Bardzo ważne (kontrola nart)
-            'wzrost': 0.20,      # 20% - Ważne (stabilność i zwrotność)
-            'plec': 0.15,        # 15% - Mniej ważne (ergonomia)
-            'przeznaczenie': 0.05 # 5% - Najmniej ważne (styl jazdy)
-        }
-        
-        # Parametry funkcji gaussowskich dla różnych kryteriów
-        self.tolerancje = {
-            'poziom': 1.0,       # Standardowe odchylenie dla poziomu
-            'waga': 8.0,         # Standardowe odchylenie dla wagi (kg)
-            'wzrost': 8.0,       # Standardowe odchylenie dla wzrostu (cm)
-        }
-    
-    def gaussian_score(self, value, target, tolerance):
-        """
-        Oblicza wynik na podstawie funkcji gaussowskiej
-        Zwraca wartość 0-1, gdzie 1 = idealne dopasowanie
-        """
-        if tolerance == 0:
-            return 1.0 if value == target else 0.0
-        
-        distance = abs(value - target)
-        return math.exp(-0.5 * (distance / tolerance) ** 2)
-    
-    def score_poziom(self, poziom_klienta, poziom_narty_info):
-        """Ocenia dopasowanie poziomu umiejętności"""
-        # Wyciągnij rzeczywisty poziom z informacji o narcie
-        if isinstance(poziom_narty_info, tuple) and len(poziom_narty_info) >= 3:
-            status, opis, poziom_str = poziom_narty_info
-            
-            if status == 'green' and 'OK' in opis:
-                return 1.0  # Idealne dopasowanie
-            elif status == 'orange':
-                if 'jeden poziom' in opis:
-                    return 0.7  # Dobry wynik dla 1 poziom różnicy
-                else:
-                    return 0.4  # Słabszy wynik dla większych różnic
-            else:
-                return 0.1  # Bardzo słaby wynik
-        
-        return 0.5  # Domyślny wynik gdy nie można sparsować
-    
-    def score_waga(self, waga_klienta, waga_narty_info):
-        """Ocenia dopasowanie wagi"""
-        if isinstance(waga_narty_info, tuple) and len(waga_narty_info) >= 4:
-            status, opis, waga_min, waga_max = waga_narty_info
-            
-            if status == 'green':
-                # Oblicz jak blisko środka zakresu jest klient
-                waga_srodek = (waga_min + waga_max) / 2
-                return self.gaussian_score(waga_klienta, waga_srodek, self.tolerancje['waga'])
-            elif status == 'orange':
-                # Klient jest poza zakresem ale w tolerancji
-                if waga_klienta > waga_max:
-                    distance = waga_klienta - waga_max
-                else:
-                    distance = waga_min - waga_klienta
-                
-                # Im mniejsza odległość od zakresu, tym lepszy wynik
-                return max(0.3, 0.8 - (distance / 10.0))
-            else:
-                return 0.1
-        
-        return 0.5
-    
-    def score_wzrost(self, wzrost_klienta, wzrost_narty_info):
-        """Ocenia dopasowanie wzrostu"""
-        if isinstance(wzrost_narty_info, tuple) and len(wzrost_narty_info) >= 4:
-            status, opis, wzrost_min, wzrost_max = wzrost_narty_info
-            
-            if status == 'green':
-                # Oblicz jak blisko środka zakresu jest klient
-                wzrost_srodek = (wzrost_min + wzrost_max) / 2
-                return self.gaussian_score(wzrost_klienta, wzrost_srodek, self.tolerancje['wzrost'])
-            elif status == 'orange':
-                # Klient jest poza zakresem ale w tolerancji
-                if wzrost_klienta > wzrost_max:
-                    distance = wzrost_klienta - wzrost_max
-                else:
-                    distance = wzrost_min - wzrost_klienta
-                
-                # Im mniejsza odległość od zakresu, tym lepszy wynik
-                return max(0.3, 0.8 - (distance / 15.0))
-            else:
-                return 0.1
-        
-        return 0.5
-    
-    def score_plec(self, plec_klienta, plec_narty_info):
-        """Ocenia dopasowanie płci"""
-        if isinstance(plec_narty_info, tuple) and len(plec_narty_info) >= 2:
-            status, opis = plec_narty_info[:2]
-            
-            if status == 'green' and 'OK' in opis:
-                return 1.0  # Idealne dopasowanie
-            elif status == 'orange':
-                if 'Narta męska' in opis or 'Narta kobieca' in opis:
-                    return 0.6  # Narta dla przeciwnej płci
-                else:
-                    return 0.8  # Inne problemy z płcią
-            else:
-                return 0.2
-        
-        return 0.5
-    
-    def score_przeznaczenie(self, styl_klienta, przeznaczenie_narty_info):
-        """Ocenia dopasowanie przeznaczenia/stylu jazdy"""
-        if not styl_klienta or styl_klienta == "Wszystkie":
-            return 1.0  # Brak preferencji = pełny wynik
-        
-        if isinstance(przeznaczenie_narty_info, tuple) and len(przeznaczenie_narty_info) >= 2:
-            status, opis = przeznaczenie_narty_info[:2]
-            
-            if status == 'green' and 'OK' in opis:
-                return 1.0  # Idealne dopasowanie stylu
-            elif status == 'orange':
-                return 0.5  # Inne przeznaczenie
-            else:
-                return 0.2
-        
-        return 0.7  # Domyślny wynik gdy brak informacji
-    
-    def oblicz_wspolczynnik_idealnosci(self, dopasowanie, wzrost_klienta, waga_klienta, 
-                                     poziom_klienta, plec_klienta, styl_klienta=None):
-        """
-        Główna funkcja obliczająca współczynnik idealności (0-100%)
-        """
-        wyniki_kryteriow = {}
-        
-        # Oceń każde kryterium
-        if 'poziom' in dopasowanie:
-            wyniki_kryteriow['poziom'] = self.score_poziom(poziom_klienta, dopasowanie['poziom'])
-        
-        if 'waga' in dopasowanie:
-            wyniki_kryteriow['waga'] = self.score_waga(waga_klienta, dopasowanie['waga'])
-        
-        if 'wzrost' in dopasowanie:
-            wyniki_kryteriow['wzrost'] = self.score_wzrost(wzrost_klienta, dopasowanie['wzrost'])
-        
-        if 'plec' in dopasowanie:
-            wyniki_kryteriow['plec'] = self.score_plec(plec_klienta, dopasowanie['plec'])
-        
-        if 'przeznaczenie' in dopasowanie:
-            wyniki_kryteriow['przeznaczenie'] = self.score_przeznaczenie(styl_klienta, dopasowanie['przeznaczenie'])
-        
-        # Oblicz ważoną średnią
-        suma_wazona = 0.0
-        suma_wag = 0.0
-        
-        for kryterium, wynik in wyniki_kryteriow.items():
-            if kryterium in self.wagi_kryteriow:
-                waga = self.wagi_kryteriow[kryterium]
-                suma_wazona += wynik * waga
-                suma_wag += waga
-        
-        # Znormalizuj wynik do 0-100%
-        if suma_wag > 0:
-            wspolczynnik = (suma_wazona / suma_wag) * 100
-        else:
-            wspolczynnik = 0
-        
-        return round(wspolczynnik, 1), wyniki_kryteriow
-    
-    def ustaw_wagi(self, nowe_wagi):
-        """Pozwala na dostosowanie wag kryteriów"""
-        suma = sum(nowe_wagi.values())
-        if abs(suma - 1.0) > 0.01:
-            raise ValueError(f"Suma wag musi wynosić 1.0, a wynosi {suma}")
-        
-        self.wagi_kryteriow.update(nowe_wagi)
-        logger.info(f"Zaktualizowano wagi kryteriów: {self.wagi_kryteriow}")
-
-# Globalna instancja scorera
-compatibility_scorer = CompatibilityScorer()
-
-# ===== NOWOCZESNY MOTYW KOLORÓW - NIEBIESKI JAK LOGO =====
-class ModernTheme:
-    # Główne kolory - różne odcienie niebieskiego
-    PRIMARY = QColor(240, 248, 255)          # Bardzo jasny niebieski (główne tło)
-    SECONDARY = QColor(220, 235, 255)        # Jasny niebieski (sekundarne tło)
-    TERTIARY = QColor(200, 220, 255)         # Średni jasny niebieski (ramki)
-    
-    # Akcenty - inspirowane niebieskim logo
-    ACCENT = QColor(30, 100, 175)            # Głęboki niebieski (główny akcent)
-    ACCENT_HOVER = QColor(20, 80, 140)       # Ciemniejszy niebieski (hover)
-    ACCENT_LIGHT = QColor(59, 130, 246)      # Jaśniejszy niebieski (aktywne elementy)
-    
-    # Kolory funkcjonalne - kontrastowe na niebieskim tle
-    SUCCESS = QColor(5, 150, 105)            # Zielony las (sukces)
-    WARNING = QColor(217, 119, 6)            # Pomarańczowy zachód (ostrzeżenie)
-    ERROR = QColor(220, 38, 38)              # Ciemny czerwony (błąd)
-    INFO = QColor(2, 132, 199)               # Niebieski lód (informacja)
-    
-    # Tekst - ciemny dla kontrastu na niebieskim tle
-    TEXT_PRIMARY = QColor(31, 41, 55)        # Prawie czarny (główny tekst)
-    TEXT_SECONDARY = QColor(55, 65, 81)      # Ciemny szary (drugorzędny tekst)
-
-# ===== FUNKCJE OBSŁUGI REZERWACJI Z FIRESNOW =====
-def wczytaj_rezerwacje_firesnow():
-    """Wczytuje rezerwacje z pliku rez.csv (sprawdzony format)"""
-    try:
-        # Sprawdź w katalogu programu
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        rez_csv = os.path.join(current_dir, 'rez.csv')
-        rez_xlsx = os.path.join(current_dir, 'rez.xlsx')
-        
-        # Użyj sprawdzonego pliku rez.csv
-        if os.path.exists(rez_csv):
-            # Użyj pliku CSV - header=1 bo pierwszy wiersz to "Unnamed", ale sprawdź strukturę
-            try:
-                df = pd.read_csv(rez_csv, encoding='utf-8-sig', header=1)
-                logger.info("Wczytano dane z rez.csv")
-                return przetworz_dane_narty(df)
-            except Exception as e:
-                logger.warning(f"Błąd parsowania z header=1, próbuję header=0: {e}")
-                # Fallback: spróbuj z header=0
-                df = pd.read_csv(rez_csv, encoding='utf-8-sig', header=0)
-                logger.info("Wczytano dane z rez.csv (header=0)")
-                return przetworz_dane_narty(df)
-        elif os.path.exists(rez_xlsx):
-            # Wczytaj dane z Excel
-            df = pd.read_excel(rez_xlsx, header=1)
-            logger.info("Wczytano dane z rez.xlsx")
-            return przetworz_dane_narty(df)
-        else:
-            logger.warning("Brak plików z rezerwacjami")
-            return pd.DataFrame()
-        
-    except Exception as e:
-        logger.error(f"Błąd podczas wczytywania rezerwacji: {e}")
-        return pd.DataFrame()
-
-def przetworz_dane_narty(df):
-    """Przetwarza surowe dane rezerwacji i wyciąga informacje o nartach"""
-    try:
-        # Sprawdź czy kolumny istnieją - obsłuż różne formaty
-        if 'Od' in df.columns and 'Do' in df.columns and 'Sprzęt' in df.columns:
-            # Nowy format z polskimi nazwami kolumn
-            df_rezerwacje = df.dropna(subset=['Od', 'Do']).copy()
-            df_narty = df_rezerwacje[df_rezerwacje['Sprzęt'].str.contains('NARTY', na=False)].copy()
-        elif 'Data_Od' in df.columns and 'Data_Do' in df.columns and 'Sprzet' in df.columns:
-            # Stary format z angielskimi nazwami kolumn
-            df_rezerwacje = df.dropna(subset=['Data_Od', 'Data_Do']).copy()
-            df_narty = df_rezerwacje[df_rezerwacje['Sprzet'].str.contains('NARTY', na=False)].copy()
-            # Mapuj na nowe nazwy
-            df_narty = df_narty.rename(columns={'Data_Od': 'Od', 'Data_Do': 'Do', 'Sprzet': 'Sprzęt'})
-        else:
-            logger.warning(f"Nieznany format kolumn: {list(df.columns)}")
-            return pd.DataFrame()
-        
-        if len(df_narty) == 0:
-            logger.info("Brak rezerwacji nart w pliku")
-            return pd.DataFrame()
-        
-        # Wyciągnij informacje o nartach z kolumny Sprzęt
-        def wyciagnij_info_narty(sprzet):
-            """Wyciąga markę, model, długość i numer narty z opisu sprzętu"""
-            if pd.isna(sprzet) or not isinstance(sprzet, str):
-                return None, None, None, None
-            
-            # Przykład: "NARTY KNEISSL MY STAR XC 144cm /2024 //01"
-            parts = sprzet.split()
-            if len(parts) < 4:
-                return None, None, None, None
-            
-            # Znajdź markę (pierwsze słowo po "NARTY")
-            marka = parts[1] if len(parts) > 1 else None
-            
-            # Znajdź długość (słowo zawierające "cm")
-            dlugosc = None
-            for part in parts:
-                if 'cm' in part:
-                    dlugosc = part.replace('cm', '').strip()
-                    break
-            
-            # Znajdź numer narty (ostatnie //XX)
-            numer = None
-            for part in parts:
-                if part.startswith('//') and len(part) > 2:
-                    numer = part
-                    break
-            
-            # Model to wszystko między marką a długością
-            model_parts = []
-            for i, part in enumerate(parts[2:], 2):
-                if 'cm' in part:
-                    break
-                model_parts.append(part)
-            model = ' '.join(model_parts) if model_parts else None
-            
-            return marka, model, dlugosc, numer
-        
-        # Dodaj kolumny z informacjami o nartach
-        narty_info = df_narty['Sprzęt'].apply(wyciagnij_info_narty)
-        df_narty['Marka'] = [info[0] for info in narty_info]
-        df_narty['Model'] = [info[1] for info in narty_info]
-        df_narty['Dlugosc'] = [info[2] for info in narty_info]
-        df_narty['Numer_Narty'] = [info[3] for info in narty_info]
-        
-        # Filtruj tylko wiersze z poprawnie wyciągniętymi danymi
-        df_narty = df_narty.dropna(subset=['Marka', 'Model', 'Dlugosc'])
-        
-        logger.info(f"Przetworzono {len(df_narty)} rezerwacji nart")
-        return df_narty
-        
-    except Exception as e:
-        logger.error(f"Błąd podczas przetwarzania danych nart: {e}")
-        return pd.DataFrame()
-
-def sprawdz_czy_narta_zarezerwowana(marka, model, dlugosc, data_od=None, data_do=None):
-    """Sprawdza czy narta jest zarezerwowana w danym terminie"""
-    try:
-        rezerwacje = wczytaj_rezerwacje_firesnow()
-        if rezerwacje.empty:
-            return False, None, None
-        
-        # Konwertuj daty do porównania
-        if data_od and data_do:
-            data_od = pd.to_datetime(data_od).date()
-            data_do = pd.to_datetime(data_do).date()
-        else:
-            return False, None, None
-        
-        # Sprawdź czy narta jest zarezerwowana w danym terminie
-        for _, rezerwacja in rezerwacje.iterrows():
-            if (rezerwacja['Marka'] == marka and 
-                rezerwacja['Model'] == model and 
-                str(rezerwacja['Dlugosc']) == str(dlugosc)):
-                
-                # Konwertuj daty rezerwacji - sprawdź różne nazwy kolumn
-                try:
-                    # Sprawdź czy to nowy format (Od, Do) czy stary (Data_Od, Data_Do)
-                    if 'Od' in rezerwacja and 'Do' in rezerwacja:
-                        data_od_rez = pd.to_datetime(rezerwacja['Od']).date()
-                        data_do_rez = pd.to_datetime(rezerwacja['Do']).date()
-                    elif 'Data_Od' in rezerwacja and 'Data_Do' in rezerwacja:
-                        data_od_rez = pd.to_datetime(rezerwacja['Data_Od']).date()
-                        data_do_rez = pd.to_datetime(rezerwacja['Data_Do']).date()
-                    else:
-                        continue
-                    
-                    # Sprawdź czy terminy się nakładają
-                    if not (data_do < data_od_rez or data_od > data_do_rez):
-                        numer_narty = rezerwacja.get('Numer_Narty', '')
-                        return True, f"{data_od_rez} - {data_do_rez}", numer_narty
-                except:
-                    continue
-        
-        return False, None, None
-        
-    except Exception as e:
-        logger.error(f"Błąd podczas sprawdzania rezerwacji: {e}")
-        return False, None, None
-
-# ===== GŁÓWNA LOGIKA DOBIERANIA NART (zachowana z oryginału) =====
-def wczytaj_narty():
-    """Wczytuje wszystkie narty z bazy danych"""
-    try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        csv_file = os.path.join(current_dir, 'NOWABAZA_final.csv')
-        
-        with open(csv_file, 'r', newline='', encoding='utf-8-sig') as file:
-            reader = csv.DictReader(file)
-            return list(reader)
-    except Exception as e:
-        logger.error(f"Błąd podczas wczytywania nart: {e}")
-        return []
-
-def sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy):
-    """Sprawdza dopasowanie pojedynczej narty do kryteriów klienta"""
-    try:
-        if not all(key in row and row[key] for key in ['POZIOM', 'WAGA_MIN', 'WAGA_MAX', 'WZROST_MIN', 'WZROST_MAX', 'DLUGOSC', 'PLEC']):
-            return None
-
-        waga_min = int(float(row['WAGA_MIN']))
-        waga_max = int(float(row['WAGA_MAX']))
-        min_wzrost_narciarza = int(float(row['WZROST_MIN']))
-        max_wzrost_narciarza = int(float(row['WZROST_MAX']))
-        narta_plec = row.get('PLEC', 'U').strip() or 'U'
-
-        # Parsuj poziom w zależności od formatu
-        poziom_text = row.get('POZIOM', '').strip()
-        poziom_min, poziom_display = parsuj_poziom(poziom_text, plec)
-        if poziom_min is None:
-            return None
-
-        # Sprawdź czy poziom nie jest o 2+ za niski - wyklucz całkowicie
-        POZIOM_TOLERANCJA_W_DOL = 2
-        if poziom < poziom_min - POZIOM_TOLERANCJA_W_DOL:
-            return None
-
-        dopasowanie = {}
-        zielone_punkty = 0
-        poziom_niżej_kandydat = False
-
-        # Sprawdź poziom
-        if poziom == poziom_min:
-            dopasowanie['poziom'] = ('green', 'OK', poziom_display)
-            zielone_punkty += 1
-        elif poziom == poziom_min + 1:
-            dopasowanie['poziom'] = ('orange', f'Narta słabsza o jeden poziom', poziom_display)
-            poziom_niżej_kandydat = True
-        elif poziom > poziom_min + 1:
-            return None  # Wyklucz całkowicie
-        else:
-            return None
-
-        # Sprawdź płeć
-        if plec == "Wszyscy":
-            dopasowanie['plec'] = ('green', 'OK', narta_plec)
-            zielone_punkty += 1
-        elif plec == "Kobieta":
-            if narta_plec in ["K", "D", "U"]:
-                dopasowanie['plec'] = ('green', 'OK', narta_plec)
-                zielone_punkty += 1
-            elif narta_plec == "M":
-                dopasowanie['plec'] = ('orange', 'Narta męska', narta_plec)
-            else:
-                dopasowanie['plec'] = ('orange', 'Nieznana płeć', narta_plec)
-        elif plec == "Mężczyzna":
-            if narta_plec in ["M", "U"]:
-                dopasowanie['plec'] = ('green', 'OK', narta_plec)
-                zielone_punkty += 1
-            elif narta_plec in ["K", "D"]:
-                dopasowanie['plec'] = ('orange', 'Narta kobieca', narta_plec)
-            else:
-                dopasowanie['plec'] = ('orange', 'Nieznana płeć', narta_plec)
-
-        # Sprawdź wagę
-        WAGA_TOLERANCJA = 5
-        if waga_min <= waga <= waga_max:
-            dopasowanie['waga'] = ('green', 'OK', waga_min, waga_max)
-            zielone_punkty += 1
-        elif waga > waga_max and waga <= waga_max + WAGA_TOLERANCJA:
-            dopasowanie['waga'] = ('orange', f'O {waga - waga_max} kg za duża (miększa)', waga_min, waga_max)
-        elif waga < waga_min and waga >= waga_min - WAGA_TOLERANCJA:
-            dopasowanie['waga'] = ('orange', f'O {waga_min - waga} kg za mała (sztywniejsza)', waga_min, waga_max)
-        else:
-            dopasowanie['waga'] = ('red', 'Niedopasowana', waga_min, waga_max)
-
-        # Sprawdź wzrost
-        WZROST_TOLERANCJA = 5
-        if min_wzrost_narciarza <= wzrost <= max_wzrost_narciarza:
-            dopasowanie['wzrost'] = ('green', 'OK', min_wzrost_narciarza, max_wzrost_narciarza)
-            zielone_punkty += 1
-        elif wzrost > max_wzrost_narciarza and wzrost <= max_wzrost_narciarza + WZROST_TOLERANCJA:
-            dopasowanie['wzrost'] = ('orange', f'O {wzrost - max_wzrost_narciarza} cm za duży (zwrotniejsza)', min_wzrost_narciarza, max_wzrost_narciarza)
-        elif wzrost < min_wzrost_narciarza and wzrost >= min_wzrost_narciarza - WZROST_TOLERANCJA:
-            dopasowanie['wzrost'] = ('orange', f'O {min_wzrost_narciarza - wzrost} cm za mały (stabilniejsza)', min_wzrost_narciarza, max_wzrost_narciarza)
-        else:
-            dopasowanie['wzrost'] = ('red', 'Niedopasowany', min_wzrost_narciarza, max_wzrost_narciarza)
-
-        # Sprawdź przeznaczenie
-        if styl_jazdy and styl_jazdy != "Wszystkie":
-            przeznaczenie = row.get('PRZEZNACZENIE', '')
-            if przeznaczenie:
-                przeznaczenia = [p.strip() for p in przeznaczenie.replace(',', ',').split(',')]
-                if styl_jazdy in przeznaczenia:
-                    dopasowanie['przeznaczenie'] = ('green', 'OK', przeznaczenie)
-                    zielone_punkty += 1
-                else:
-                    dopasowanie['przeznaczenie'] = ('orange', f'Inne przeznaczenie ({przeznaczenie})', przeznaczenie)
-            else:
-                dopasowanie['przeznaczenie'] = ('orange', 'Brak przeznaczenia', '')
-        else:
-            dopasowanie['przeznaczenie'] = ('green', 'OK', row.get('PRZEZNACZENIE', ''))
-
-        # Wyklucz narty z czerwonymi kryteriami
-        if any(v[0] == 'red' for v in dopasowanie.values()):
-            return None
+from PyQt5.QtGui import QFont, QPixmap, QRegExpValidator
 
-        # Oblicz współczynnik idealności
-        wspolczynnik, detale_oceny = compatibility_scorer.oblicz_wspolczynnik_idealnosci(
-            dopasowanie, wzrost, waga, poziom, plec, styl_jazdy
-        )
-
-        return {
-            'dane': row,
-            'dopasowanie': dopasowanie,
-            'wspolczynnik_idealnosci': wspolczynnik,
-            'detale_oceny': detale_oceny,
-            'zielone_punkty': zielone_punkty,
-            'poziom_niżej_kandydat': poziom_niżej_kandydat
-        }
-
-    except (ValueError, TypeError) as e:
-        logger.warning(f"Pominięto wiersz z powodu błędu danych: {row} - {e}")
-        return None
-
-def parsuj_poziom(poziom_text, plec):
-    """Parsuje poziom narty w zależności od formatu"""
-    if '/' in poziom_text:
-        # Format unisex: "5M/6D"
-        try:
-            parts = poziom_text.split('/')
-            pm_part = parts[0].replace('M', '').strip()
-            pd_part = parts[1].replace('D', '').strip()
-            poziom_m = int(float(pm_part))
-            poziom_d = int(float(pd_part))
-            
-            if plec == "Mężczyzna":
-                return poziom_m, f"PM{poziom_m}/PD{poziom_d}"
-            elif plec == "Kobieta":
-                return poziom_d, f"PM{poziom_m}/PD{poziom_d}"
-            else:  # Wszyscy
-                return min(poziom_m, poziom_d), f"PM{poziom_m}/PD{poziom_d}"
-        except:
-            return None, None
-    elif 'M' in poziom_text and 'D' in poziom_text:
-        # Format unisex ze spacją: "5M 6D"
-        try:
-            parts = poziom_text.split()
-            pm_part = None
-            pd_part = None
-            
-            for part in parts:
-                if 'M' in part:
-                    pm_part = part.replace('M', '').strip()
-                elif 'D' in part:
-                    pd_part = part.replace('D', '').strip()
-            
-            if pm_part and pd_part:
-                poziom_m = int(float(pm_part))
-                poziom_d = int(float(pd_part))
-                
-                if plec == "Mężczyzna":
-                    return poziom_m, f"PM{poziom_m} PD{poziom_d}"
-                elif plec == "Kobieta":
-                    return poziom_d, f"PM{poziom_m} PD{poziom_d}"
-                else:  # Wszyscy
-                    return min(poziom_m, poziom_d), f"PM{poziom_m} PD{poziom_d}"
-            else:
-                return None, None
-        except:
-            return None, None
-    elif 'M' in poziom_text:
-        # Format męski: "5M"
-        try:
-            poziom_min = int(float(poziom_text.replace('M', '').strip()))
-            return poziom_min, f"PM{poziom_text.replace('M', '').strip()}"
-        except:
-            return None, None
-    elif 'D' in poziom_text:
-        # Format damski: "5D"
-        try:
-            poziom_min = int(float(poziom_text.replace('D', '').strip()))
-            return poziom_min, f"PD{poziom_text.replace('D', '').strip()}"
-        except:
-            return None, None
-    elif poziom_text.strip().isdigit():
-        # Format prosty: tylko cyfra
-        try:
-            poziom_min = int(float(poziom_text.strip()))
-            return poziom_min, f"P{poziom_text.strip()}"
-        except:
-            return None, None
-    else:
-        return None, None
-
-def znajdz_idealne_dopasowania(narty, wzrost, waga, poziom, plec, styl_jazdy):
-    """Znajduje narty z idealnym dopasowaniem (wszystkie kryteria spełnione)"""
-    idealne = []
-    max_punkty = 5 if (styl_jazdy and styl_jazdy != "Wszystkie") else 4
-    
-    for row in narty:
-        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy)
-        if narta_info and narta_info['zielone_punkty'] == max_punkty:
-            # Sprawdź czy to nie problem z płcią
-            plec_status = narta_info['dopasowanie'].get('plec')
-            if plec_status and plec_status[1] not in ['OK']:
-                if 'Narta męska' in plec_status[1] or 'Narta kobieca' in plec_status[1]:
-                    continue  # Pomiń - to będzie w "INNA PŁEĆ"
-            idealne.append(narta_info)
-    
-    return idealne
-
-def znajdz_poziom_za_nisko(narty, wzrost, waga, poziom, plec, styl_jazdy):
-    """Znajduje narty z poziomem za niskim (wszystkie inne kryteria OK)"""
-    poziom_za_nisko = []
-    max_punkty = 5 if (styl_jazdy and styl_jazdy != "Wszystkie") else 4
-    
-    for row in narty:
-        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy)
-        if narta_info and narta_info['poziom_niżej_kandydat']:
-            # Sprawdź czy reszta kryteriów jest OK
-            pozostałe_punkty = narta_info['zielone_punkty']
-            max_pozostałe_punkty = max_punkty - 1
-            
-            if pozostałe_punkty == max_pozostałe_punkty:
-                # Sprawdź czy to nie problem z płcią - jeśli tak, pomiń (będzie w "INNA PŁEĆ")
-                plec_status = narta_info['dopasowanie'].get('plec')
-                if plec_status and plec_status[1] not in ['OK']:
-                    if 'Narta męska' in plec_status[1] or 'Narta kobieca' in plec_status[1]:
-                        continue  # Pomiń - to będzie w "INNA PŁEĆ"
-                poziom_za_nisko.append(narta_info)
-    
-    return poziom_za_nisko
-
-def znajdz_alternatywy(narty, wzrost, waga, poziom, plec, styl_jazdy):
-    """Znajduje narty alternatywne (poziom OK, ale inne kryteria nie idealne)"""
-    alternatywy = []
-    max_punkty = 5 if (styl_jazdy and styl_jazdy != "Wszystkie") else 4
-    
-    for row in narty:
-        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy)
-        if narta_info and not narta_info['poziom_niżej_kandydat'] and narta_info['zielone_punkty'] < max_punkty:
-            # Sprawdź czy to nie problem z płcią - jeśli tak, pomiń (będzie w "INNA PŁEĆ")
-            plec_status = narta_info['dopasowanie'].get('plec')
-            if plec_status and plec_status[1] not in ['OK']:
-                if 'Narta męska' in plec_status[1] or 'Narta kobieca' in plec_status[1]:
-                    continue  # Pomiń - to będzie w "INNA PŁEĆ"
-            alternatywy.append(narta_info)
-    
-    return alternatywy
-
-def znajdz_inna_plec(narty, wzrost, waga, poziom, plec, styl_jazdy):
-    """Znajduje narty z niepasującą płcią (wszystkie inne kryteria OK)"""
-    inna_plec = []
-    max_punkty = 5 if (styl_jazdy and styl_jazdy != "Wszystkie") else 4
-    
-    for row in narty:
-        narta_info = sprawdz_dopasowanie_narty(row, wzrost, waga, poziom, plec, styl_jazdy)
-        if narta_info and not narta_info['poziom_niżej_kandydat']:
-            # Sprawdź czy to problem z płcią
-            plec_status = narta_info['dopasowanie'].get('plec')
-            if plec_status and plec_status[1] not in ['OK']:
-                if 'Narta męska' in plec_status[1] or 'Narta kobieca' in plec_status[1]:
-                    # Sprawdź czy reszta kryteriów jest OK (poziom OK, waga OK, wzrost OK, przeznaczenie OK)
-                    pozostałe_punkty = narta_info['zielone_punkty']
-                    max_pozostałe_punkty = max_punkty - 1  # Płeć nie liczy się do punktów
-                    
-                    if pozostałe_punkty == max_pozostałe_punkty:
-                        inna_plec.append(narta_info)
-    
-    return inna_plec
-
-def dobierz_narty(wzrost, waga, poziom, plec, styl_jazdy=None):
-    """Główna funkcja dobierania nart - teraz z osobnymi wyszukiwaniami dla każdej kategorii"""
-    logger.info(f"Szukanie nart: wzrost={wzrost}, waga={waga}, poziom={poziom}, plec={plec}, styl={styl_jazdy}")
-    
-    try:
-        # Wczytaj wszystkie narty
-        wszystkie_narty = wczytaj_narty()
-        if not wszystkie_narty:
-            logger.error("Nie znaleziono nart w bazie danych")
-            return None, None, None, None
-
-        # Znajdź narty w każdej kategorii osobno
-        idealne = znajdz_idealne_dopasowania(wszystkie_narty, wzrost, waga, poziom, plec, styl_jazdy)
-        poziom_za_nisko = znajdz_poziom_za_nisko(wszystkie_narty, wzrost, waga, poziom, plec, styl_jazdy)
-        alternatywy = znajdz_alternatywy(wszystkie_narty, wzrost, waga, poziom, plec, styl_jazdy)
-        inna_plec = znajdz_inna_plec(wszystkie_narty, wzrost, waga, poziom, plec, styl_jazdy)
-
-        # Sortuj wyniki
-        def sort_key(narta_info):
-            wspolczynnik = narta_info.get('wspolczynnik_idealnosci', 0)
-            return -wspolczynnik  # Od najwyższego do najniższego
-
-        idealne.sort(key=sort_key)
-        poziom_za_nisko.sort(key=sort_key)
-        alternatywy.sort(key=sort_key)
-        inna_plec.sort(key=sort_key)
-
-        logger.info(f"Znaleziono: {len(idealne)} idealnych, {len(poziom_za_nisko)} poziom za nisko, {len(alternatywy)} alternatyw, {len(inna_plec)} inna płeć")
-        return idealne, poziom_za_nisko, alternatywy, inna_plec
-
-    except Exception as e:
-        logger.error(f"Wystąpił nieoczekiwany błąd: {e}")
-        QMessageBox.critical(None, "Błąd Krytyczny", f"Wystąpił nieoczekiwany błąd: {e}")
-        return None, None, None, None
+# Wspólna warstwa danych z aplikacją modułową (main.py): baza nart, kalendarz rezerwacji i dobieranie
+from narzedzia.konfiguracja_logowania import setup_logging, get_logger
+from dane.magazyn_danych import magazyn
+from dane.wczytywanie_danych import katalog_danych, wczytaj_surowa_baze_nart, zapisz_baze_nart
+from logika.dobieranie_nart import dobierz_narty
+from styl.motyw_kolorow import ModernTheme
 
+setup_logging()
+logger = get_logger(__name__)
 
 # ===== DIALOG KALENDARZA =====
 class DatePickerDialog(QDialog):
@@ -763,6 +77,18 @@ class DatePickerDialog(QDialog):
         return self.calendar.selectedDate()
 
 # ===== GŁÓWNE OKNO APLIKACJI =====
+# Kolumny tabeli przeglądu nart: (nagłówek, kolumna w CSV)
+KOLUMNY_TABELI = [
+    ("ID", "ID"), ("Marka", "MARKA"), ("Model", "MODEL"), ("Długość", "DLUGOSC"), ("Szt.", "ILOSC"),
+    ("Poziom", "POZIOM"), ("Płeć", "PLEC"), ("Waga Min", "WAGA_MIN"), ("Waga Max", "WAGA_MAX"),
+    ("Wzrost Min", "WZROST_MIN"), ("Wzrost Max", "WZROST_MAX"), ("Przeznaczenie", "PRZEZNACZENIE"),
+    ("Rok", "ROK"), ("Uwagi", "UWAGI")
+]
+KOLUMNA_ID = 0
+
+# Kolumny z filtrami (combobox) - indeks ich wartości aktualizowany przy edycji
+KOLUMNY_FILTROW = ('MARKA', 'POZIOM', 'PLEC')
+
 class SkiApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -813,7 +139,7 @@ class SkiApp(QMainWindow):
         try:
             # Sprawdź ścieżkę do pliku
             current_dir = os.path.dirname(os.path.abspath(__file__))
-            logo_path = os.path.join(current_dir, "narty.png")
+            logo_path = os.path.join(current_dir, "zasoby", "narty.png")
             logger.info(f"Próbuję załadować logo z: {logo_path}")
             logger.info(f"Plik istnieje: {os.path.exists(logo_path)}")
             
@@ -1476,7 +802,10 @@ class SkiApp(QMainWindow):
         
         logger.info(f"Wywołuję dobierz_narty z parametrami: wzrost={wzrost_klienta}, waga={waga_klienta}, poziom={poziom_klienta}, plec={plec_klienta}, styl={styl}")
         
-        idealne, poziom_za_nisko, alternatywy, inna_plec = dobierz_narty(wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, styl)
+        # Baza i kalendarz rezerwacji z pamięci (wspólny magazyn danych) - bez ponownego czytania plików
+        narty, kalendarz = magazyn.dane()
+        idealne, poziom_za_nisko, alternatywy, inna_plec = dobierz_narty(wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, styl,
+                                                                         narty=narty)
         
         logger.info(f"Wyniki dobierz_narty: idealne={len(idealne) if idealne else 'None'}, poziom_za_nisko={len(poziom_za_nisko) if poziom_za_nisko else 'None'}, alternatywy={len(alternatywy) if alternatywy else 'None'}, inna_plec={len(inna_plec) if inna_plec else 'None'}")
         
@@ -1506,35 +835,35 @@ class SkiApp(QMainWindow):
             self.wyniki_text.append("✅ IDEALNE DOPASOWANIA:")
             self.wyniki_text.append("=" * 50)
             for narta_info in idealne:
-                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do)
+                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do, kalendarz)
             self.wyniki_text.append("")
         
         if poziom_za_nisko:
             self.wyniki_text.append("🟡 POZIOM ZA NISKO (narty z niższym poziomem wymagania, reszta OK):")
             self.wyniki_text.append("=" * 50)
             for narta_info in poziom_za_nisko:
-                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do)
+                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do, kalendarz)
             self.wyniki_text.append("")
         
         if alternatywy:
             self.wyniki_text.append("⚠️ ALTERNATYWY:")
             self.wyniki_text.append("=" * 50)
             for narta_info in alternatywy:
-                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do)
+                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do, kalendarz)
             self.wyniki_text.append("")
         
         if inna_plec:
             self.wyniki_text.append("👥 INNA PŁEĆ:")
             self.wyniki_text.append("=" * 50)
             for narta_info in inna_plec:
-                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do)
+                self.wyswietl_jedna_narte(narta_info, wzrost_klienta, waga_klienta, poziom_klienta, plec_klienta, data_od, data_do, kalendarz)
             self.wyniki_text.append("")
         
         # Przewiń do początku wyników
         self.wyniki_text.moveCursor(self.wyniki_text.textCursor().Start)
     
     
-    def wyswietl_jedna_narte(self, narta_info, w, s, p, plec_klienta, data_od=None, data_do=None):
+    def wyswietl_jedna_narte(self, narta_info, w, s, p, plec_klienta, data_od=None, data_do=None, kalendarz=None):
         """Wyświetla informacje o jednej narcie w kompaktowej formie"""
         narta = narta_info['dane']
         dopasowanie = narta_info['dopasowanie']
@@ -1556,40 +885,30 @@ class SkiApp(QMainWindow):
         # 1. Nazwa narty i długość z współczynnikiem
         self.wyniki_text.append(f"► {narta['MARKA']} {narta['MODEL']} ({narta['DLUGOSC']} cm) {wspolczynnik_emoji} {wspolczynnik}%")
         
-        # 2. Sprawdź rezerwacje dla tej narty
-        ilosc_sztuk = int(narta.get('ILOSC', '1') or '1')
+        # 2. Sprawdź rezerwacje w kalendarzu dostępności
+        if kalendarz is None:
+            kalendarz = magazyn.dane()[1]
+        ilosc_sztuk = narta.get('ILOSC', 1)
         dostepnosc_text = "   📦 Dostępność: "
         
-        # Sprawdź każdą sztukę narty
-        for i in range(ilosc_sztuk):
-            # Sprawdź czy konkretna sztuka jest zarezerwowana
-            jest_zarezerwowana, okres_rezerwacji, numer_narty = sprawdz_czy_narta_zarezerwowana(
-                narta['MARKA'], narta['MODEL'], narta['DLUGOSC'], data_od, data_do
-            )
-            
-            # Sprawdź czy to konkretna sztuka (jeśli mamy numer narty)
-            if jest_zarezerwowana and numer_narty:
-                # Sprawdź czy to ta sama sztuka (porównaj numery)
-                if f"//{i+1:02d}" in numer_narty or f"//{i+1}" in numer_narty:
-                    # To konkretna sztuka - czerwony kwadracik
-                    dostepnosc_text += f"🔴{i+1} "
-                else:
-                    # Inna sztuka - zielony kwadracik
-                    dostepnosc_text += f"🟩{i+1} "
-            elif jest_zarezerwowana and not numer_narty:
-                # Zarezerwowana ale bez numeru - wszystkie sztuki czerwone
-                dostepnosc_text += f"🔴{i+1} "
-            else:
-                # Narta dostępna - zielony kwadracik
-                dostepnosc_text += f"🟩{i+1} "
+        if data_od and data_do:
+            wolne = set(kalendarz.wolne_sztuki(narta['MARKA'], narta['MODEL'], narta['DLUGOSC'], ilosc_sztuk, data_od, data_do))
+            rezerwacje = kalendarz.rezerwacje_w_okresie(narta['MARKA'], narta['MODEL'], narta['DLUGOSC'], data_od, data_do)
+        else:
+            wolne = set(range(1, ilosc_sztuk + 1))
+            rezerwacje = []
+        
+        for i in range(1, ilosc_sztuk + 1):
+            dostepnosc_text += f"🟩{i} " if i in wolne else f"🔴{i} "
         
         self.wyniki_text.append(dostepnosc_text)
         
         # 3. Informacje o rezerwacjach (jeśli są)
-        if jest_zarezerwowana and okres_rezerwacji:
-            rezerwacja_text = f"   🚫 Zarezerwowana: {okres_rezerwacji}"
-            if numer_narty:
-                rezerwacja_text += f" (Nr: {numer_narty})"
+        if rezerwacje:
+            numer, od_rez, do_rez = rezerwacje[0]
+            rezerwacja_text = f"   🚫 Zarezerwowana: {od_rez} - {do_rez}"
+            if numer:
+                rezerwacja_text += f" (Nr: //{numer:02d})"
             self.wyniki_text.append(rezerwacja_text)
         
         # 4. Dopasowanie (w jednej linii) z kolorowym podświetlaniem
@@ -1685,14 +1004,16 @@ class SkiApp(QMainWindow):
             # Wyczyść pole wyników
             self.wyniki_text.clear()
             
-            # Sprawdź czy plik rez.csv istnieje (w katalogu programu)
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            rez_file = os.path.join(current_dir, 'rez.csv')
+            # Wymuś przeładowanie kalendarza dostępności (wspólnego z wyszukiwaniem)
+            magazyn.przeladuj(narty=False)
+            
+            # Sprawdź czy plik rez.csv istnieje (w pliki_danych)
+            rez_file = os.path.join(katalog_danych(), 'rez.csv')
             
             if not os.path.exists(rez_file):
                 self.wyniki_text.append("❌ BŁĄD: Plik rez.csv nie istnieje!")
-                self.wyniki_text.append(f"Szukam w: {current_dir}")
-                self.wyniki_text.append("Sprawdź czy plik rez.csv jest w tym samym katalogu co program.")
+                self.wyniki_text.append(f"Szukam w: {katalog_danych()}")
+                self.wyniki_text.append("Sprawdź czy plik rez.csv jest w katalogu pliki_danych.")
                 return
             
             # Wczytaj dane bezpośrednio z rez.csv
@@ -1921,11 +1242,13 @@ class SkiApp(QMainWindow):
         self.table.verticalHeader().setDefaultSectionSize(60)  # Zwiększ wysokość wierszy
         
         # Kolumny tabeli
-        columns = ["ID", "Marka", "Model", "Długość", "Szt.", "Poziom", "Płeć", "Waga Min", "Waga Max", 
-                  "Wzrost Min", "Wzrost Max", "Przeznaczenie", "Rok", "Uwagi"]
+        columns = [naglowek for naglowek, _ in KOLUMNY_TABELI]
         self.table.setColumnCount(len(columns))
         self.table.setHorizontalHeaderLabels(columns)
         
+        # Edycja komórki zmienia tylko odpowiadające jej narty w pamięci (po ID)
+        self.table.itemChanged.connect(self.on_item_changed)
+        
         # Ustaw szerokości kolumn
         column_widths = [40, 80, 180, 60, 50, 80, 70, 70, 70, 75, 75, 100, 60, 800]
         for i, width in enumerate(column_widths):
@@ -1942,31 +1265,37 @@ class SkiApp(QMainWindow):
     def load_data(self):
         """Ładuje dane z CSV do tabeli"""
         try:
-            # Sprawdź w katalogu programu
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            csv_file = os.path.join(current_dir, 'NOWABAZA_final.csv')
+            # Surowe wiersze bazy (także te odrzucane przy walidacji - do poprawienia w edytorze)
+            kolumny, self.all_data = wczytaj_surowa_baze_nart()
+            self.kolumny_csv = kolumny or [pole for _, pole in KOLUMNY_TABELI]
+            
+            # ID to stały klucz narty - brakujące lub powtórzone ID dostają nowe
+            self.narty_po_id = {}
+            self.nastepne_id = 1 + max((int(item['ID']) for item in self.all_data
+                                        if str(item.get('ID', '')).isdigit()), default=0)
+            for item in self.all_data:
+                if not item.get('ID') or item['ID'] in self.narty_po_id:
+                    item['ID'] = self.nowe_id()
+                self.narty_po_id[item['ID']] = item
+            self.zmienione = False
+            
+            # Indeks wartości filtrów (liczba nart z każdą wartością)
+            self.indeks_filtrow = {pole: Counter(item.get(pole, '') for item in self.all_data if item.get(pole))
+                                   for pole in KOLUMNY_FILTROW}
+            self.combo_filtrow = {'MARKA': self.marka_combo, 'POZIOM': self.poziom_combo, 'PLEC': self.plec_combo}
+            
+            # Wypełnij comboboxy filtrów
+            for pole, combo in self.combo_filtrow.items():
+                combo.addItems(['Wszystkie'] + sorted(self.indeks_filtrow[pole]))
+            
+            # Ustaw domyślne wartości
+            self.marka_combo.setCurrentText('Wszystkie')
+            self.poziom_combo.setCurrentText('Wszystkie')
+            self.plec_combo.setCurrentText('Wszystkie')
+            
+            self.apply_filters()
+            logger.info(f"Załadowano {len(self.all_data)} nart")
             
-            with open(csv_file, 'r', newline='', encoding='utf-8-sig') as file:
-                reader = csv.DictReader(file)
-                self.all_data = list(reader)
-                
-                # Wypełnij comboboxy filtrów
-                marki = sorted(set(item.get('MARKA', '') for item in self.all_data if item.get('MARKA')))
-                poziomy = sorted(set(item.get('POZIOM', '') for item in self.all_data if item.get('POZIOM')))
-                plcie = sorted(set(item.get('PLEC', '') for item in self.all_data if item.get('PLEC')))
-                
-                self.marka_combo.addItems(['Wszystkie'] + marki)
-                self.poziom_combo.addItems(['Wszystkie'] + poziomy)
-                self.plec_combo.addItems(['Wszystkie'] + plcie)
-                
-                # Ustaw domyślne wartości
-                self.marka_combo.setCurrentText('Wszystkie')
-                self.poziom_combo.setCurrentText('Wszystkie')
-                self.plec_combo.setCurrentText('Wszystkie')
-                
-                self.apply_filters()
-                logger.info(f"Załadowano {len(self.all_data)} nart")
-                
         except Exception as e:
             logger.error(f"Błąd podczas ładowania danych: {e}")
             QMessageBox.critical(self.narty_window, "Błąd", f"Nie można załadować danych: {e}")
@@ -1975,6 +1304,8 @@ class SkiApp(QMainWindow):
         """Stosuje filtry do danych i grupuje identyczne narty"""
         if not hasattr(self, 'all_data'):
             return
+        if hasattr(self, 'combo_filtrow'):
+            self.usun_puste_wartosci()
             
         filtered = self.all_data.copy()
         
@@ -2014,16 +1345,20 @@ class SkiApp(QMainWindow):
             
             if key in grouped_data:
                 # Zwiększ ilość
-                current_qty = int(grouped_data[key].get('ILOSC', '1') or '1')
+                grupa, ids = grouped_data[key]
+                current_qty = int(grupa.get('ILOSC', '1') or '1')
                 item_qty = int(item.get('ILOSC', '1') or '1')
-                grouped_data[key]['ILOSC'] = str(current_qty + item_qty)
+                grupa['ILOSC'] = str(current_qty + item_qty)
+                ids.append(item['ID'])
             else:
                 # Dodaj nowy element
-                grouped_data[key] = item.copy()
-                if 'ILOSC' not in grouped_data[key] or not grouped_data[key]['ILOSC']:
-                    grouped_data[key]['ILOSC'] = '1'
+                grupa = item.copy()
+                if 'ILOSC' not in grupa or not grupa['ILOSC']:
+                    grupa['ILOSC'] = '1'
+                grouped_data[key] = (grupa, [item['ID']])
         
-        self.filtered_data = list(grouped_data.values())
+        self.filtered_data = [grupa for grupa, _ in grouped_data.values()]
+        self.filtered_ids = [ids for _, ids in grouped_data.values()]
         self.update_table()
     
     def clear_filters(self):
@@ -2047,159 +1382,214 @@ class SkiApp(QMainWindow):
         
         return cleaned if cleaned else ''
 
+    def nowe_id(self):
+        """Zwraca kolejne wolne ID narty (ID są stałe - nie są przenumerowywane)"""
+        nowe = str(self.nastepne_id)
+        self.nastepne_id += 1
+        return nowe
+
+    def wypelnij_wiersz(self, i, narta, ids):
+        """Wypełnia jeden wiersz tabeli - komórka ID trzyma listę ID nart zgrupowanych w wierszu"""
+        for j, (_, pole) in enumerate(KOLUMNY_TABELI):
+            if j == KOLUMNA_ID:
+                item = QTableWidgetItem(", ".join(ids))
+                item.setData(Qt.UserRole, list(ids))
+                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            else:
+                item = QTableWidgetItem(str(narta.get(pole, '1' if pole == 'ILOSC' else '')))
+            self.table.setItem(i, j, item)
+
     def update_table(self):
-        """Aktualizuje tabelę z przefiltrowanymi danymi"""
+        """Przebudowuje tabelę z przefiltrowanymi danymi (po zmianie filtrów)"""
         if not hasattr(self, 'filtered_data'):
             return
-            
-        # Ustaw liczbę wierszy
-        self.table.setRowCount(len(self.filtered_data))
-        
-        # Dodaj dane
-        for i, narta in enumerate(self.filtered_data):
-            # Wyczyść uwagi z informacji o dostępności
-            uwagi_cleaned = self.clean_uwagi(narta.get('UWAGI', ''))
-            
-            values = [
-                i+1,
-                narta.get('MARKA', ''),
-                narta.get('MODEL', ''),
-                narta.get('DLUGOSC', ''),
-                narta.get('ILOSC', '1'),
-                narta.get('POZIOM', ''),
-                narta.get('PLEC', ''),
-                narta.get('WAGA_MIN', ''),
-                narta.get('WAGA_MAX', ''),
-                narta.get('WZROST_MIN', ''),
-                narta.get('WZROST_MAX', ''),
-                narta.get('PRZEZNACZENIE', ''),
-                narta.get('ROK', ''),
-                narta.get('UWAGI', '')
-            ]
-            
-            for j, value in enumerate(values):
-                item = QTableWidgetItem(str(value))
-                self.table.setItem(i, j, item)
-        
-        # Aktualizuj licznik
-        self.count_label.setText(f"Wyświetlane: {len(self.filtered_data)} / {len(self.all_data)} nart")
-    
+
+        # Bez sortowania, sygnałów edycji i odrysowywania w trakcie wypełniania
+        self.table.setSortingEnabled(False)
+        self.table.blockSignals(True)
+        self.table.setUpdatesEnabled(False)
+        try:
+            self.table.setRowCount(len(self.filtered_data))
+            for i, (narta, ids) in enumerate(zip(self.filtered_data, self.filtered_ids)):
+                self.wypelnij_wiersz(i, narta, ids)
+        finally:
+            self.table.setUpdatesEnabled(True)
+            self.table.blockSignals(False)
+            self.table.setSortingEnabled(True)
+
+        self.aktualizuj_licznik()
+
+    def aktualizuj_licznik(self):
+        """Aktualizuje licznik wyświetlanych nart"""
+        niezapisane = " • niezapisane zmiany" if self.zmienione else ""
+        self.count_label.setText(f"Wyświetlane: {self.table.rowCount()} / {len(self.all_data)} nart{niezapisane}")
+
+    def zmien_indeks(self, pole, stara, nowa):
+        """Aktualizuje indeks wartości filtra i combobox - tylko dla zmienionych wartości
+
+        Zmiana listy comboboxa nie wywołuje apply_filters (tabela w trakcie edycji zostaje),
+        a wybrana wartość filtra zostaje na liście do zmiany filtra (usun_puste_wartosci).
+        """
+        if stara == nowa:
+            return
+        indeks, combo = self.indeks_filtrow[pole], self.combo_filtrow[pole]
+        combo.blockSignals(True)
+        try:
+            if stara:
+                indeks[stara] -= 1
+                if indeks[stara] <= 0:
+                    del indeks[stara]
+                    if stara != combo.currentText():
+                        combo.removeItem(combo.findText(stara))
+            if nowa:
+                indeks[nowa] += 1
+                if indeks[nowa] == 1 and combo.findText(nowa) < 0:
+                    wartosci = [combo.itemText(i) for i in range(1, combo.count())]
+                    combo.insertItem(1 + bisect.bisect(wartosci, nowa), nowa)
+        finally:
+            combo.blockSignals(False)
+
+    def usun_puste_wartosci(self):
+        """Usuwa z comboboxów filtrów wartości bez nart pozostawione jako wybrany filtr"""
+        for pole, combo in self.combo_filtrow.items():
+            indeks = self.indeks_filtrow[pole]
+            combo.blockSignals(True)
+            try:
+                for i in range(combo.count() - 1, 0, -1):
+                    if combo.itemText(i) not in indeks and i != combo.currentIndex():
+                        combo.removeItem(i)
+            finally:
+                combo.blockSignals(False)
+
+    def on_item_changed(self, item):
+        """Przenosi edycję komórki do nart w pamięci (zmienia się tylko ten wiersz tabeli)"""
+        ids = self.table.item(item.row(), KOLUMNA_ID).data(Qt.UserRole)
+        pole = KOLUMNY_TABELI[item.column()][1]
+        narty = [self.narty_po_id[id_narty] for id_narty in ids]
+        nowa = item.text().strip()
+
+        if pole == 'ILOSC':
+            # Ilość wiersza zgrupowanego to suma - zmiana trafia do pierwszej narty grupy
+            ilosci = [int(narta.get('ILOSC', '1') or '1') for narta in narty]
+            if not nowa.isdigit() or int(nowa) < sum(ilosci[1:]):
+                QMessageBox.warning(self.narty_window, "Uwaga", f"Niepoprawna ilość: {nowa} (min. {sum(ilosci[1:])})")
+                self.table.blockSignals(True)
+                item.setText(str(sum(ilosci)))
+                self.table.blockSignals(False)
+                return
+            zmiany = [(narty[0], str(int(nowa) - sum(ilosci[1:])))]
+        else:
+            zmiany = [(narta, nowa) for narta in narty]
+
+        self.zmienione = True
+        for narta, wartosc in zmiany:
+            stara = narta.get(pole, '')
+            narta[pole] = wartosc
+            if pole in self.indeks_filtrow:
+                self.zmien_indeks(pole, stara, wartosc)
+        self.aktualizuj_licznik()
+
     def save_changes(self):
-        """Zapisuje zmiany do pliku CSV"""
+        """Zapisuje bazę nart z pamięci do pliku CSV (wszystkie narty, niezależnie od filtrów)"""
         try:
-            # Przygotuj dane do zapisania
-            data_to_save = []
-            for i in range(self.table.rowCount()):
-                row_data = {}
-                for j in range(self.table.columnCount()):
-                    item = self.table.item(i, j)
-                    if item:
-                        column_name = self.table.horizontalHeaderItem(j).text()
-                        # Mapuj nazwy kolumn na nazwy w CSV
-                        column_mapping = {
-                            "ID": "ID",
-                            "Marka": "MARKA", 
-                            "Model": "MODEL",
-                            "Długość": "DLUGOSC",
-                            "Szt.": "ILOSC",
-                            "Poziom": "POZIOM",
-                            "Płeć": "PLEC",
-                            "Waga Min": "WAGA_MIN",
-                            "Waga Max": "WAGA_MAX",
-                            "Wzrost Min": "WZROST_MIN",
-                            "Wzrost Max": "WZROST_MAX",
-                            "Przeznaczenie": "PRZEZNACZENIE",
-                            "Rok": "ROK",
-                            "Uwagi": "UWAGI"
-                        }
-                        csv_column = column_mapping.get(column_name, column_name)
-                        row_data[csv_column] = item.text()
-                if row_data:  # Tylko jeśli wiersz nie jest pusty
-                    data_to_save.append(row_data)
-            
-            # Zapisz do pliku
-            if data_to_save:
-                with open('NOWABAZA_final.csv', 'w', newline='', encoding='utf-8-sig') as file:
-                    fieldnames = data_to_save[0].keys()
-                    writer = csv.DictWriter(file, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(data_to_save)
-                
-                QMessageBox.information(self.narty_window, "Sukces", f"Zapisano {len(data_to_save)} nart do pliku!")
-                logger.info(f"Zapisano {len(data_to_save)} nart do CSV")
+            if self.all_data:
+                zapisz_baze_nart(self.all_data, self.kolumny_csv)
+                # Wyszukiwanie od razu korzysta z nowej bazy
+                magazyn.przeladuj(rezerwacje=False)
+
+                self.zmienione = False
+                self.aktualizuj_licznik()
+                QMessageBox.information(self.narty_window, "Sukces", f"Zapisano {len(self.all_data)} nart do pliku!")
+                logger.info(f"Zapisano {len(self.all_data)} nart do CSV")
             else:
                 QMessageBox.warning(self.narty_window, "Uwaga", "Brak danych do zapisania!")
-                
+
         except Exception as e:
             QMessageBox.critical(self.narty_window, "Błąd", f"Nie można zapisać danych: {e}")
             logger.error(f"Błąd podczas zapisywania: {e}")
-    
+
     def add_new_ski(self):
-        """Dodaje nową nartę do tabeli"""
-        # Dodaj nowy wiersz na końcu tabeli
+        """Dodaje nową nartę do bazy i jeden wiersz na końcu tabeli"""
+        narta = {pole: '' for pole in self.kolumny_csv}
+        narta.update({
+            'ID': self.nowe_id(),
+            'MARKA': "Nowa marka",
+            'MODEL': "Nowy model",
+            'DLUGOSC': "150",
+            'ILOSC': "1",
+            'POZIOM': "1M/1D",
+            'PLEC': "U",
+            'WAGA_MIN': "50",
+            'WAGA_MAX': "100",
+            'WZROST_MIN': "150",
+            'WZROST_MAX': "200",
+            'PRZEZNACZENIE': "SLG",
+            'ROK': "2024",
+            'UWAGI': ""
+        })
+        self.all_data.append(narta)
+        self.narty_po_id[narta['ID']] = narta
+        self.zmienione = True
+        for pole in KOLUMNY_FILTROW:
+            self.zmien_indeks(pole, '', narta[pole])
+
+        # Dodaj nowy wiersz na końcu tabeli (sortowanie wyłączone, by wiersz nie przeskoczył w trakcie)
         row_count = self.table.rowCount()
+        self.table.setSortingEnabled(False)
+        self.table.blockSignals(True)
         self.table.insertRow(row_count)
-        
-        # Wypełnij domyślnymi wartościami
-        default_values = [
-            str(row_count + 1),  # ID
-            "Nowa marka",        # Marka
-            "Nowy model",        # Model
-            "150",               # Długość
-            "1",                 # Szt.
-            "1M/1D",             # Poziom
-            "U",                 # Płeć
-            "50",                # Waga Min
-            "100",               # Waga Max
-            "150",               # Wzrost Min
-            "200",               # Wzrost Max
-            "SLG",               # Przeznaczenie
-            "2024",              # Rok
-            ""                   # Uwagi
-        ]
-        
-        for j, value in enumerate(default_values):
-            item = QTableWidgetItem(value)
-            self.table.setItem(row_count, j, item)
-        
+        self.wypelnij_wiersz(row_count, narta, [narta['ID']])
+        id_item = self.table.item(row_count, KOLUMNA_ID)
+        self.table.blockSignals(False)
+        self.table.setSortingEnabled(True)
+        self.aktualizuj_licznik()
+
         # Przewiń do nowego wiersza
-        self.table.scrollToItem(self.table.item(row_count, 0))
-        self.table.selectRow(row_count)
-        
+        self.table.scrollToItem(id_item)
+        self.table.selectRow(id_item.row())
+
         QMessageBox.information(self.narty_window, "Sukces", "Dodano nową nartę! Edytuj parametry i zapisz zmiany.")
-        logger.info("Dodano nową nartę do tabeli")
-    
+        logger.info(f"Dodano nową nartę (ID {narta['ID']})")
+
     def delete_selected(self):
-        """Usuwa wybrane wiersze z tabeli"""
+        """Usuwa wybrane wiersze z tabeli i ich narty z bazy w pamięci"""
         selected_rows = set()
         for item in self.table.selectedItems():
             selected_rows.add(item.row())
-        
+
         if not selected_rows:
             QMessageBox.warning(self.narty_window, "Uwaga", "Wybierz wiersze do usunięcia!")
             return
-        
+
         # Potwierdź usunięcie
         reply = QMessageBox.question(
-            self.narty_window, 
-            "Potwierdź usunięcie", 
+            self.narty_window,
+            "Potwierdź usunięcie",
             f"Czy na pewno chcesz usunąć {len(selected_rows)} wybranych nart?",
             QMessageBox.Yes | QMessageBox.No
         )
-        
+
         if reply == QMessageBox.Yes:
-            # Usuń wiersze w odwrotnej kolejności (od końca)
+            usuwane = set()
+            for row in selected_rows:
+                usuwane.update(self.table.item(row, KOLUMNA_ID).data(Qt.UserRole))
+
+            # Usuń wiersze w odwrotnej kolejności (od końca) - ID pozostałych nart się nie zmieniają
+            self.table.blockSignals(True)
             for row in sorted(selected_rows, reverse=True):
                 self.table.removeRow(row)
-            
-            # Aktualizuj ID
-            for i in range(self.table.rowCount()):
-                id_item = self.table.item(i, 0)
-                if id_item:
-                    id_item.setText(str(i + 1))
-            
+            self.table.blockSignals(False)
+
+            usuniete = [self.narty_po_id.pop(id_narty) for id_narty in usuwane]
+            self.all_data = [narta for narta in self.all_data if narta['ID'] not in usuwane]
+            self.zmienione = True
+            for narta in usuniete:
+                for pole in KOLUMNY_FILTROW:
+                    self.zmien_indeks(pole, narta.get(pole, ''), '')
+            self.aktualizuj_licznik()
+
             QMessageBox.information(self.narty_window, "Sukces", f"Usunięto {len(selected_rows)} nart!")
-            logger.info(f"Usunięto {len(selected_rows)} nart z tabeli")
+            logger.info(f"Usunięto {len(usuniete)} nart z bazy (ID: {', '.join(sorted(usuwane))})")
 
 # ===== GŁÓWNA FUNKCJA =====
 def main():
@@ -0,0 +1,10 @@
+"""
+serwis - moduł projektu Asystent Doboru Nart
+Zawiera tryb serwera (bez interfejsu Qt) z API HTTP/JSON
+"""
+
+from serwis.obsluga_zapytan import (BladZapytania, szukaj, dostepnosc, dopasuj_grupe, pokrycie, bez_idealnych,
+                                    status, statystyki)
+from serwis.serwer_http import SerwerDoboru, uruchom_serwer
+
+__all__ = ['BladZapytania', 'szukaj', 'dostepnosc', 'dopasuj_grupe', 'pokrycie', 'bez_idealnych', 'status', 'statystyki', 'SerwerDoboru', 'uruchom_serwer']
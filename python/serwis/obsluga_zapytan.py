@@ -0,0 +1,175 @@
+"""
+Moduł obsługi zapytań serwera
+Zamienia parametry zapytań na wywołania logiki doboru i wyniki na słowniki JSON
+(niezależnie od sposobu transportu HTTP). Każda funkcja pracuje na jednej
+niezmiennej migawce danych (MigawkaDanych), bez blokad.
+"""
+import logging
+import pandas as pd
+
+from dane.lista_grupy import profil_z_wiersza
+from logika.dobieranie_nart import dobierz_narty_wyniki, KATEGORIE
+from logika.dobieranie_grupowe import dobierz_narty_batch, bez_nart
+from logika.profil_oceny import aktywny_profil
+from logika.indeks_klientow import indeks_klientow
+from logika import tablica_odpowiedzi
+from narzedzia import instrumentacja
+from narzedzia.profiler import profilowane
+
+logger = logging.getLogger(__name__)
+
+class BladZapytania(ValueError):
+    """Niepoprawne parametry zapytania (odpowiedź 400)"""
+
+def _data(parametry, nazwa):
+    """Odczytuje opcjonalną datę z parametrów zapytania"""
+    wartosc = parametry.get(nazwa)
+    if not wartosc:
+        return None
+    try:
+        return pd.to_datetime(wartosc).date()
+    except (ValueError, TypeError):
+        raise BladZapytania(f"Nieprawidłowa data '{nazwa}': {wartosc}")
+
+def _okres(parametry):
+    """Odczytuje okres od-do (obie daty lub żadna)"""
+    data_od, data_do = _data(parametry, 'od'), _data(parametry, 'do')
+    if bool(data_od) != bool(data_do):
+        raise BladZapytania("Podaj obie daty 'od' i 'do' albo żadnej")
+    if data_od and data_od > data_do:
+        raise BladZapytania("Data 'od' musi być wcześniejsza niż 'do'")
+    return data_od, data_do
+
+def _profil(parametry):
+    """Zamienia parametry (wzrost, waga, poziom, plec M/K/U, styl) na profil klienta"""
+    profil = profil_z_wiersza({str(k).upper(): str(v) for k, v in parametry.items() if v is not None})
+    if profil is None:
+        raise BladZapytania("Wymagane: wzrost (100-250), waga (20-200), poziom (1-6), plec (M/K/U)")
+    return profil
+
+def narta_do_json(narta_info):
+    """Wynik dopasowania jednej narty w postaci gotowej do JSON"""
+    return {
+        'dane': narta_info['dane'],
+        'dopasowanie': narta_info['dopasowanie'],
+        'wspolczynnik_idealnosci': narta_info['wspolczynnik_idealnosci'],
+        'detale_oceny': narta_info['detale_oceny'],
+        'wolne_sztuki': narta_info.get('wolne_sztuki'),
+    }
+
+@profilowane
+def szukaj(migawka, parametry):
+    """Dobiera narty dla jednego klienta - odpowiednik przycisku "Znajdź" """
+    profil = _profil(parametry)
+    data_od, data_do = _okres(parametry)
+    try:
+        limit = int(parametry['limit']) if parametry.get('limit') else None
+    except ValueError:
+        raise BladZapytania(f"Nieprawidłowy limit: {parametry['limit']}")
+    tylko_dostepne = str(parametry.get('tylko_dostepne', '')).lower() in ('1', 'true', 'tak')
+
+    narty, kalendarz = migawka.narty, migawka.kalendarz
+    # Bez okresu w trybie --tablica-odpowiedzi wyniki czytane są z przeliczonej tablicy
+    wyniki = dobierz_narty_wyniki(
+        profil['wzrost'], profil['waga'], profil['poziom'], profil['plec'], profil['styl'],
+        data_od=data_od, data_do=data_do, kalendarz=kalendarz,
+        tylko_dostepne=tylko_dostepne, limit=limit, narty=narty
+    )
+    if wyniki is None:
+        raise RuntimeError("Błąd podczas dobierania nart - sprawdź logi")
+
+    return {
+        'kategorie': {k: [narta_do_json(n) for n in wyniki.pokazane(k)] for k in KATEGORIE},
+        'liczby': {k: wyniki.liczba(k) for k in KATEGORIE},
+    }
+
+def dostepnosc(migawka, parametry):
+    """Zwraca wolne sztuki i rezerwacje modelu narty w okresie"""
+    marka, model, dlugosc = parametry.get('marka'), parametry.get('model'), parametry.get('dlugosc')
+    if not (marka and model and dlugosc):
+        raise BladZapytania("Wymagane: marka, model, dlugosc")
+    data_od, data_do = _okres(parametry)
+    if not data_od:
+        raise BladZapytania("Wymagane: od, do")
+
+    narty, kalendarz = migawka.narty, migawka.kalendarz
+    if parametry.get('ilosc'):
+        try:
+            ilosc = int(parametry['ilosc'])
+        except ValueError:
+            raise BladZapytania(f"Nieprawidłowa ilość: {parametry['ilosc']}")
+    else:
+        # Liczba sztuk z bazy nart (1 gdy model nieznany)
+        ilosc = next((row.get('ILOSC', 1) for row in narty
+                      if (row.get('MARKA'), row.get('MODEL'), str(row.get('DLUGOSC'))) == (marka, model, str(dlugosc))), 1)
+
+    return {
+        'ilosc': ilosc,
+        'wolne_sztuki': kalendarz.wolne_sztuki(marka, model, dlugosc, ilosc, data_od, data_do),
+        'rezerwacje': [{'numer': numer, 'od': od.isoformat(), 'do': do.isoformat()}
+                       for numer, od, do in kalendarz.rezerwacje_w_okresie(marka, model, dlugosc, data_od, data_do)],
+    }
+
+def dopasuj_grupe(migawka, dane_json):
+    """Dobiera narty dla grupy: {"profile": [...], "od": ..., "do": ..., "optymalnie": true}"""
+    if not isinstance(dane_json, dict) or not isinstance(dane_json.get('profile'), list):
+        raise BladZapytania("Wymagane pole 'profile' z listą osób")
+
+    profile = []
+    for nr, osoba in enumerate(dane_json['profile'], 1):
+        if not isinstance(osoba, dict):
+            raise BladZapytania(f"Osoba {nr}: oczekiwano obiektu")
+        try:
+            profile.append(_profil(osoba))
+        except BladZapytania as e:
+            raise BladZapytania(f"Osoba {nr}: {e}")
+    data_od, data_do = _okres(dane_json)
+
+    narty, kalendarz = migawka.narty, migawka.kalendarz
+    przydzial = dobierz_narty_batch(profile, (data_od, data_do) if data_od else None, narty=narty,
+                                    kalendarz=kalendarz, optymalnie=dane_json.get('optymalnie', True))
+
+    wynik = []
+    for pozycja in przydzial:
+        narta_info = pozycja['narta_info']
+        narta = narta_info['dane'] if narta_info else {}
+        wynik.append({
+            'profil': pozycja['profil'],
+            'kategoria': pozycja['kategoria'],
+            'marka': narta.get('MARKA'),
+            'model': narta.get('MODEL'),
+            'dlugosc': narta.get('DLUGOSC'),
+            'numer': pozycja['numer_sztuki'],
+            'wspolczynnik_idealnosci': narta_info['wspolczynnik_idealnosci'] if narta_info else None,
+        })
+    return {'przydzial': wynik, 'bez_nart': [p['imie'] for p in bez_nart(przydzial)]}
+
+def pokrycie(migawka, parametry=None):
+    """Udział siatki klientów, dla którego każda narta jest idealna lub alternatywna (opcjonalnie ?id=)"""
+    parametry = parametry or {}
+    indeks = indeks_klientow(migawka.narty)
+    udzialy = {kategoria: indeks.pokrycie(kategoria=kategoria) for kategoria in ('idealne', 'alternatywy')}
+    wynik = [{
+        'id': row.get('ID', ''),
+        'marka': row.get('MARKA', ''),
+        'model': row.get('MODEL', ''),
+        'dlugosc': row.get('DLUGOSC', ''),
+        **{kategoria: float(udzial[i]) for kategoria, udzial in udzialy.items()},
+    } for i, row in enumerate(migawka.narty) if not parametry.get('id') or row.get('ID') == parametry['id']]
+    if parametry.get('id') and not wynik:
+        raise BladZapytania(f"Nieznane ID narty: {parametry['id']}")
+    return {'narty': wynik}
+
+def bez_idealnych(migawka, parametry=None):
+    """Płcie i poziomy klientów z komórkami siatki bez żadnej idealnej narty"""
+    return {'profile': indeks_klientow(migawka.narty).bez_idealnych()}
+
+def status(migawka, parametry=None):
+    """Stan migawki danych i aktywny profil oceny"""
+    tablica = tablica_odpowiedzi.tablica
+    stan_tablicy = 'wyłączona' if tablica is None else ('aktualna' if tablica.aktualna(migawka.narty) else 'w budowie')
+    return {**migawka.status(), 'profil_oceny': aktywny_profil().opis(), 'tablica_odpowiedzi': stan_tablicy}
+
+def statystyki(migawka, parametry=None):
+    """Czasy etapów i trafienia pamięci podręcznych (instrumentacja)"""
+    return {'wlaczona': instrumentacja.wlaczona(), **instrumentacja.statystyki()}
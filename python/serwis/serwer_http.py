@@ -0,0 +1,188 @@
+"""
+Moduł serwera HTTP/JSON (tryb bez interfejsu Qt)
+Trzyma bazę nart i kalendarz dostępności w pamięci i udostępnia wyszukiwanie,
+dostępność oraz dobieranie grupowe lokalnym klientom (druga lada, aplikacja Flutter)
+
+Serwer działa na asyncio: każde zapytanie bierze bieżącą migawkę danych i liczy
+wynik w puli wątków, a przeładowanie danych odbywa się w zadaniu w tle, które
+podmienia migawkę dopiero po wczytaniu - czas przeładowania nie wydłuża zapytań.
+Nowe eksporty w pliki_danych wczytuje w tle obserwator plików.
+
+Endpointy:
+    GET  /szukaj?wzrost=&waga=&poziom=&plec=M|K|U&styl=&od=&do=&limit=&tylko_dostepne=
+    GET  /dostepnosc?marka=&model=&dlugosc=&od=&do=[&ilosc=]
+    POST /grupa        {"profile": [{"imie", "wzrost", "waga", "poziom", "plec", "styl"}], "od", "do", "optymalnie"}
+    POST /przeladuj    (202 - przeładowanie w tle)
+    GET  /pokrycie[?id=]  (udział siatki klientów obsługiwany przez narty)
+    GET  /bez_idealnych  (profile klientów bez idealnej narty)
+    GET  /status
+    GET  /statystyki
+"""
+import json
+import asyncio
+import logging
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+
+from dane.magazyn_danych import magazyn as wspolny_magazyn
+from serwis.obsluga_zapytan import (BladZapytania, szukaj, dostepnosc, dopasuj_grupe, pokrycie, bez_idealnych,
+                                    status, statystyki)
+from narzedzia.instrumentacja import pomiar
+
+logger = logging.getLogger(__name__)
+
+# Maksymalny rozmiar treści zapytania POST (bajty)
+MAKS_ROZMIAR_TRESCI = 1024 * 1024
+
+# Czas bezczynności połączenia keep-alive (sekundy)
+LIMIT_BEZCZYNNOSCI = 30
+
+TRASY_GET = {
+    '/szukaj': szukaj,
+    '/dostepnosc': dostepnosc,
+    '/pokrycie': pokrycie,
+    '/bez_idealnych': bez_idealnych,
+    '/status': status,
+    '/statystyki': statystyki,
+}
+
+TRASY_POST = {
+    '/grupa': dopasuj_grupe,
+}
+
+class SerwerDoboru:
+    """Asynchroniczny serwer HTTP/JSON na migawkach z MagazynDanych"""
+
+    def __init__(self, magazyn):
+        self.magazyn = magazyn
+        self._przeladowanie = None
+
+    def przeladuj_w_tle(self):
+        """Uruchamia przeładowanie danych w tle (najwyżej jedno naraz)"""
+        if self._przeladowanie is None or self._przeladowanie.done():
+            self._przeladowanie = asyncio.create_task(self._przeladuj())
+        return self._przeladowanie
+
+    async def _przeladuj(self):
+        try:
+            await asyncio.to_thread(self.magazyn.przeladuj)
+        except Exception as e:
+            logger.exception(f"Błąd przeładowania danych - serwer używa poprzedniej migawki: {e}")
+
+    def w_toku(self):
+        """Czy trwa przeładowanie danych"""
+        return self._przeladowanie is not None and not self._przeladowanie.done()
+
+    async def obsluz(self, metoda, sciezka, tresc):
+        """Obsługuje jedno zapytanie - zwraca (kod HTTP, dane JSON)"""
+        adres = urlsplit(sciezka)
+
+        if metoda == 'POST' and adres.path == '/przeladuj':
+            self.przeladuj_w_tle()
+            return HTTPStatus.ACCEPTED, {'przeladowanie': 'w toku', **self.magazyn.status()}
+
+        trasy = TRASY_GET if metoda == 'GET' else TRASY_POST if metoda == 'POST' else {}
+        trasa = trasy.get(adres.path)
+        if trasa is None:
+            return HTTPStatus.NOT_FOUND, {'blad': f"Nieznany adres: {metoda} {adres.path}"}
+
+        if metoda == 'GET':
+            dane = dict(parse_qsl(adres.query))
+        else:
+            try:
+                dane = json.loads(tresc or b'{}')
+            except ValueError:
+                return HTTPStatus.BAD_REQUEST, {'blad': "Nieprawidłowy JSON"}
+
+        # Migawka pobrana na początku - zapytanie nie widzi przeładowania w trakcie
+        migawka = self.magazyn.migawka
+        try:
+            with pomiar(f"serwer{adres.path}"):
+                wynik = await asyncio.get_running_loop().run_in_executor(None, trasa, migawka, dane)
+        except BladZapytania as e:
+            return HTTPStatus.BAD_REQUEST, {'blad': str(e)}
+        except Exception as e:
+            logger.exception(f"Błąd obsługi {metoda} {sciezka}: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'blad': str(e)}
+
+        if trasa is status:
+            wynik['przeladowanie_w_toku'] = self.w_toku()
+        return HTTPStatus.OK, wynik
+
+    async def polaczenie(self, reader, writer):
+        """Obsługuje połączenie klienta (HTTP/1.1 z keep-alive)"""
+        try:
+            while True:
+                try:
+                    wiersz = await asyncio.wait_for(reader.readline(), LIMIT_BEZCZYNNOSCI)
+                except asyncio.TimeoutError:
+                    break
+                if not wiersz.strip():
+                    break
+                try:
+                    metoda, sciezka, wersja = wiersz.decode('latin-1').split()
+                except ValueError:
+                    await self.wyslij(writer, HTTPStatus.BAD_REQUEST, {'blad': "Nieprawidłowe zapytanie"}, False)
+                    break
+
+                naglowki = {}
+                while True:
+                    linia = await reader.readline()
+                    if linia in (b'\r\n', b'\n', b''):
+                        break
+                    nazwa, _, wartosc = linia.decode('latin-1').partition(':')
+                    naglowki[nazwa.strip().lower()] = wartosc.strip()
+
+                dlugosc = naglowki.get('content-length') or '0'
+                if not dlugosc.isdigit():
+                    await self.wyslij(writer, HTTPStatus.BAD_REQUEST, {'blad': "Nieprawidłowy nagłówek Content-Length"}, False)
+                    break
+                dlugosc = int(dlugosc)
+                if dlugosc > MAKS_ROZMIAR_TRESCI:
+                    await self.wyslij(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'blad': "Zbyt duża treść zapytania"}, False)
+                    break
+                tresc = await reader.readexactly(dlugosc) if dlugosc else b''
+
+                zostaw = wersja == 'HTTP/1.1' and naglowki.get('connection', '').lower() != 'close'
+                kod, dane = await self.obsluz(metoda.upper(), sciezka, tresc)
+                await self.wyslij(writer, kod, dane, zostaw)
+                logger.debug(f"{metoda} {sciezka} -> {kod.value}")
+                if not zostaw:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def wyslij(writer, kod, dane, zostaw):
+        """Wysyła odpowiedź JSON"""
+        tresc = json.dumps(dane, ensure_ascii=False, default=str).encode('utf-8')
+        naglowek = (f"HTTP/1.1 {kod.value} {kod.phrase}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(tresc)}\r\n"
+                    f"Connection: {'keep-alive' if zostaw else 'close'}\r\n\r\n")
+        writer.write(naglowek.encode('latin-1') + tresc)
+        await writer.drain()
+
+async def _serwuj(host, port, magazyn, obserwuj):
+    serwer = SerwerDoboru(magazyn)
+    if magazyn.migawka.wersja == 0:
+        await asyncio.to_thread(magazyn.przeladuj)
+
+    gniazdo = await asyncio.start_server(serwer.polaczenie, host, port)
+    obserwator = magazyn.obserwuj() if obserwuj else None
+    logger.info(f"Serwer doboru nart nasłuchuje na http://{host}:{port}")
+    try:
+        async with gniazdo:
+            await gniazdo.serve_forever()
+    finally:
+        if obserwator:
+            obserwator.zatrzymaj()
+
+def uruchom_serwer(host='127.0.0.1', port=8765, magazyn=None, obserwuj=True):
+    """Wczytuje dane do pamięci i obsługuje zapytania do przerwania (Ctrl+C)"""
+    try:
+        asyncio.run(_serwuj(host, port, magazyn or wspolny_magazyn, obserwuj))
+    except KeyboardInterrupt:
+        logger.info("Zatrzymywanie serwera")